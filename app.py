@@ -2,14 +2,29 @@
 """
 
 # Import necessary libraries
-from os.path import normpath
+import os
+import tempfile
+import time
+from os.path import join, normpath
 
 import pandas as pd
 import streamlit as st
 from PIL import Image
 
+from src.components.batch_prediction import BatchPrediction
 from src.components.model_prediction import ModelPrediction
 
+# Rows scored per progress bar update in the bulk scoring tab
+BULK_CHUNK_SIZE = 20_000
+
+# Scored files of all sessions, removed once unused for BULK_RESULT_TTL_S
+BULK_OUTPUT_DIR = join(tempfile.gettempdir(), "wine_quality_bulk_scoring")
+BULK_RESULT_TTL_S = 3600
+
+# Largest scored file offered as a download. Streamlit reads the whole file into
+# memory on every rerun showing the button, so larger files are scored offline.
+BULK_DOWNLOAD_MAX_BYTES = 50 * 2**20
+
 # Configure the Streamlit page
 st.set_page_config(
     page_title="Red Wine Quality Predictor",
@@ -21,93 +36,253 @@ st.set_page_config(
 
 st.title("Red Wine Quality Predictor")
 
-# Define paths for images
-wine_image = Image.open(normpath("./resources/images/wine-image.jpg"))
 
-# Create two columns for layout
-col1, col2 = st.columns([0.45, 0.55], gap="medium")
+@st.cache_resource
+def load_model() -> tuple:
+    """
+    Loads the model once per server process; every session and rerun shares it.
 
-# Populate col1 with image and project information
-with col1:
-    st.image(wine_image, use_column_width=True)
-    st.write(
-        """The application utilizes a machine learning model
-        to assess the quality score of red wine based on a range of input features
-        """
+    Returns:
+        tuple: The ModelPrediction and the BatchPrediction scoring with it.
+    """
+    model_prediction = ModelPrediction()
+    model_prediction.load_artifacts()
+    batch_prediction = BatchPrediction(explain=False, model_prediction=model_prediction)
+    batch_prediction.chunk_size = BULK_CHUNK_SIZE
+    return model_prediction, batch_prediction
+
+
+def prune_results(max_age_s: float) -> None:
+    """
+    Removes the scored files not used for `max_age_s`, such as those of closed
+    sessions. A session showing its result keeps the file in use.
+
+    Args:
+        max_age_s (float): The time since a file was last used.
+    """
+    os.makedirs(BULK_OUTPUT_DIR, exist_ok=True)
+    cutoff = time.time() - max_age_s
+    for name in os.listdir(BULK_OUTPUT_DIR):
+        path = join(BULK_OUTPUT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Removed by another session in the meantime
+            pass
+
+
+def score_upload(uploaded_file, batch_prediction: BatchPrediction) -> dict:
+    """
+    Scores an uploaded CSV or Parquet file chunk by chunk, appending each scored
+    chunk to a temporary CSV file, so only one chunk is held in memory.
+
+    Args:
+        uploaded_file (UploadedFile): The uploaded file.
+        batch_prediction (BatchPrediction): The cached batch scorer.
+
+    Returns:
+        dict: The path of the scored file and the number of rows.
+    """
+    # Only the features with a nonzero coefficient are transformed and multiplied
+    model = batch_prediction.projected_model()
+    required = batch_prediction.features if model is None else model.features
+    is_parquet = batch_prediction.is_parquet(uploaded_file.name)
+    if is_parquet:
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(uploaded_file).metadata
+        columns, total = metadata.schema.names, metadata.num_rows
+    else:
+        columns, total = pd.read_csv(uploaded_file, nrows=0).columns, uploaded_file.size
+    uploaded_file.seek(0)
+    missing = [feature for feature in required if feature not in columns]
+    if missing:
+        raise ValueError(f"The file is missing the columns {missing}")
+
+    progress = st.progress(0.0, text="Scoring...")
+    prune_results(BULK_RESULT_TTL_S)
+    output_file = tempfile.NamedTemporaryFile(
+        suffix=".csv", dir=BULK_OUTPUT_DIR, delete=False
     )
+    output_file.close()
+    row_count = 0
+    try:
+        for chunk_idx, chunk in enumerate(
+            batch_prediction.read_chunks(source=uploaded_file)
+        ):
+            batch_prediction.score_chunk(chunk, model).to_csv(
+                output_file.name,
+                mode="w" if chunk_idx == 0 else "a",
+                header=chunk_idx == 0,
+                index=False,
+            )
+            row_count += len(chunk)
+            done = row_count if is_parquet else uploaded_file.tell()
+            progress.progress(min(done / max(total, 1), 1.0), text=f"{row_count} rows")
+    except Exception:
+        os.remove(output_file.name)
+        raise
+    progress.progress(1.0, text=f"{row_count} rows scored")
+    return {"path": output_file.name, "row_count": row_count}
+
+
+model_pred, batch_pred = load_model()
+single_tab, bulk_tab = st.tabs(["Single wine", "Bulk scoring"])
+
+with single_tab:
+    # Define paths for images
+    wine_image = Image.open(normpath("./resources/images/wine-image.jpg"))
+
+    # Create two columns for layout
+    col1, col2 = st.columns([0.45, 0.55], gap="medium")
+
+    # Populate col1 with image and project information
+    with col1:
+        st.image(wine_image, use_column_width=True)
+        st.write(
+            """The application utilizes a machine learning model
+            to assess the quality score of red wine based on a range of input features
+            """
+        )
+        st.write(
+            """To obtain the desired outcome, input the appropriate values into
+            the designated field.
+            """
+        )
+
+    # working on col2 section
+    with col2:
+        with st.form("user_inputs"):
+            col_3a, col_3b = st.columns([0.5, 0.5], gap="small")
+            with col_3a:
+                fixed_acidity = st.number_input(
+                    label="Fixed Acidity:", min_value=1.00, max_value=25.00, value=7.22
+                )
+                volatile_acidity = st.number_input(
+                    label="Volatile Acidity:",
+                    min_value=0.01,
+                    max_value=5.00,
+                    value=0.34,
+                )
+                citric_acid = st.number_input(
+                    label="Citric Acid:", min_value=0.00, max_value=3.00, value=0.32
+                )
+                residual_sugar = st.number_input(
+                    label="Residual Sugar:", min_value=0.10, max_value=99.99, value=5.44
+                )
+                chlorides = st.number_input(
+                    label="Chlorides:", min_value=0.01, max_value=2.00, value=0.06
+                )
+                free_sulfur_dioxide = st.number_input(
+                    label="Free Sulfur Dioxide:",
+                    min_value=1.00,
+                    max_value=400.00,
+                    value=30.53,
+                )
+
+            with col_3b:
+                total_sulfur_dioxide = st.number_input(
+                    label="Total Sulfur Dioxide:",
+                    min_value=1.00,
+                    max_value=600.00,
+                    value=115.74,
+                )
+                density = st.number_input(
+                    label="Density:", min_value=0.01, max_value=3.00, value=0.99
+                )
+                pH = st.number_input(
+                    label="pH:", min_value=0.01, max_value=9.99, value=3.22
+                )
+                sulphates = st.number_input(
+                    label="Sulphates:", min_value=0.00, max_value=9.00, value=0.53
+                )
+                alcohol = st.number_input(
+                    label="Alcohol:", min_value=5.00, max_value=25.00, value=10.49
+                )
+
+            show_explanation = st.checkbox("Explain the predicted score")
+            submitted = st.form_submit_button()
+
+        # Predict only once the form is submitted, not on every rerun
+        if submitted:
+            user_data = [
+                {
+                    "fixed_acidity": fixed_acidity,
+                    "volatile_acidity": volatile_acidity,
+                    "citric_acid": citric_acid,
+                    "residual_sugar": residual_sugar,
+                    "chlorides": chlorides,
+                    "free_sulfur_dioxide": free_sulfur_dioxide,
+                    "total_sulfur_dioxide": total_sulfur_dioxide,
+                    "density": density,
+                    "pH": pH,
+                    "sulphates": sulphates,
+                    "alcohol": alcohol,
+                }
+            ]
+            user_df = pd.DataFrame(user_data)
+            wine_quality_score = round(model_pred.predict(user_df)[0])
+            st.write(
+                f"With the given input features, the wine quality score predicted"
+                f" by the model is: **:green[{wine_quality_score:0.0f}]**"
+            )
+
+            # Contribution of each feature to the score, relative to the base value
+            if show_explanation:
+                explanation = model_pred.explain(user_df).iloc[0]
+                st.write(
+                    f"Base value: {explanation['base_value']:0.2f}, "
+                    f"predicted value: {explanation['prediction']:0.2f}"
+                )
+                contributions = explanation.drop(["base_value", "prediction"])
+                st.bar_chart(contributions.rename("contribution"))
+
+with bulk_tab:
     st.write(
-        """To obtain the desired outcome, input the appropriate values into
-        the designated field.
+        """Upload a CSV or Parquet file with one wine per row and the feature
+        columns of the form. The file is scored in chunks, and the scored rows
+        are offered as a CSV download.
         """
     )
+    uploaded_file = st.file_uploader(
+        "Wines to score", type=["csv", "parquet", "pq"], accept_multiple_files=False
+    )
 
-# working on col2 section
-with col2:
-    with st.form("user_inputs"):
-        col_3a, col_3b = st.columns([0.5, 0.5], gap="small")
-        with col_3a:
-            fixed_acidity = st.number_input(
-                label="Fixed Acidity:", min_value=1.00, max_value=25.00, value=7.22
-            )
-            volatile_acidity = st.number_input(
-                label="Volatile Acidity:", min_value=0.01, max_value=5.00, value=0.34
-            )
-            citric_acid = st.number_input(
-                label="Citric Acid:", min_value=0.00, max_value=3.00, value=0.32
-            )
-            residual_sugar = st.number_input(
-                label="Residual Sugar:", min_value=0.10, max_value=99.99, value=5.44
-            )
-            chlorides = st.number_input(
-                label="Chlorides:", min_value=0.01, max_value=2.00, value=0.06
-            )
-            free_sulfur_dioxide = st.number_input(
-                label="Free Sulfur Dioxide:",
-                min_value=1.00,
-                max_value=400.00,
-                value=30.53,
-            )
+    # The scored file is kept across reruns, such as the one of the download
+    result = st.session_state.get("bulk_result")
+    if uploaded_file is not None and st.button("Score file"):
+        if result is not None and os.path.exists(result["path"]):
+            os.remove(result["path"])
+        try:
+            result = score_upload(uploaded_file, batch_pred)
+            result["upload"] = (uploaded_file.name, uploaded_file.size)
+            st.session_state["bulk_result"] = result
+        except Exception as e:
+            result = st.session_state["bulk_result"] = None
+            st.error(f"The file could not be scored: {e}")
 
-        with col_3b:
-            total_sulfur_dioxide = st.number_input(
-                label="Total Sulfur Dioxide:",
-                min_value=1.00,
-                max_value=600.00,
-                value=115.74,
-            )
-            density = st.number_input(
-                label="Density:", min_value=0.01, max_value=3.00, value=0.99
-            )
-            pH = st.number_input(
-                label="pH:", min_value=0.01, max_value=9.99, value=3.22
+    if (
+        result is not None
+        and uploaded_file is not None
+        and result["upload"] == (uploaded_file.name, uploaded_file.size)
+        and os.path.exists(result["path"])
+    ):
+        # Mark the file as in use, so that it is not pruned
+        os.utime(result["path"])
+        st.write(f"{result['row_count']} wines scored. First rows:")
+        st.dataframe(pd.read_csv(result["path"], nrows=20))
+        if os.path.getsize(result["path"]) <= BULK_DOWNLOAD_MAX_BYTES:
+            with open(result["path"], "rb") as scored_file:
+                st.download_button(
+                    "Download the scored file",
+                    scored_file,
+                    file_name=f"{os.path.splitext(uploaded_file.name)[0]}_scored.csv",
+                    mime="text/csv",
+                )
+        else:
+            st.warning(
+                "The scored file is larger than "
+                f"{BULK_DOWNLOAD_MAX_BYTES // 2**20} MB and cannot be downloaded "
+                "here; score it with `python -m src.pipelines.batch_prediction`."
             )
-            sulphates = st.number_input(
-                label="Sulphates:", min_value=0.00, max_value=9.00, value=0.53
-            )
-            alcohol = st.number_input(
-                label="Alcohol:", min_value=5.00, max_value=25.00, value=10.49
-            )
-
-        st.form_submit_button()
-        user_data = [
-            {
-                "fixed_acidity": fixed_acidity,
-                "volatile_acidity": volatile_acidity,
-                "citric_acid": citric_acid,
-                "residual_sugar": residual_sugar,
-                "chlorides": chlorides,
-                "free_sulfur_dioxide": free_sulfur_dioxide,
-                "total_sulfur_dioxide": total_sulfur_dioxide,
-                "density": density,
-                "pH": pH,
-                "sulphates": sulphates,
-                "alcohol": alcohol,
-            }
-        ]
-        user_df = pd.DataFrame(user_data)
-        model_pred = ModelPrediction()
-        wine_quality_score = round(model_pred.predict(user_df)[0])
-        st.write(
-            f"With the given input features, the wine quality score predicted"
-            f" by the model is: **:green[{wine_quality_score:0.0f}]**"
-        )
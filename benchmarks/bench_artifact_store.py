@@ -0,0 +1,76 @@
+"""
+Benchmark of the artifact store: write time, stored size and load time of float64
+arrays of increasing size for each available codec, against a plain joblib file.
+Uncompressed arrays are also loaded as memory maps.
+
+The arrays are the committed training array tiled to each size, so the codecs see
+realistic data rather than random noise.
+
+Usage:
+    python -m benchmarks.bench_artifact_store
+"""
+
+import tempfile
+import time
+from os.path import getsize, join
+
+import joblib
+import numpy as np
+
+from src.utils.artifact_store import CODECS, ArtifactStore
+
+TRAIN_ARRAY_PATH = "data/train/train_array.npy"
+SIZES_MB = (1, 10, 100)
+REPEATS = 3
+
+
+def best_time(func) -> float:
+    """Returns the best of a few timings of a function, in milliseconds."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return 1000 * min(timings)
+
+
+def main():
+    """Runs the benchmark and prints one row per size and codec."""
+    train_array = np.load(TRAIN_ARRAY_PATH)
+    print(f"{'size':>7} {'codec':>7} {'stored':>9} {'write':>9} {'load':>9}")
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        # One store per codec, since equal payloads are stored only once
+        stores = {codec: ArtifactStore(join(root_dir, codec)) for codec in CODECS}
+        for size_mb in SIZES_MB:
+            rows = size_mb * 2**20 // train_array[0].nbytes
+            array = np.resize(train_array, (rows, train_array.shape[1]))
+            label = f"{size_mb}MB"
+
+            joblib_path = join(root_dir, f"{label}.joblib")
+            write_ms = best_time(lambda: joblib.dump(array, joblib_path))
+            load_ms = best_time(lambda: joblib.load(joblib_path))
+            stored_mb = getsize(joblib_path) / 2**20
+            print(
+                f"{label:>7} {'joblib':>7} {stored_mb:>7.1f}MB "
+                f"{write_ms:>7.1f}ms {load_ms:>7.1f}ms"
+            )
+
+            for codec, store in stores.items():
+                name = f"array_{label}"
+                start = time.perf_counter()
+                store.put_array(name, array, codec)
+                write_ms = 1000 * (time.perf_counter() - start)
+                load_ms = best_time(lambda: store.get(name))
+                stored_mb = store.manifest(name)["stored_size"] / 2**20
+                print(
+                    f"{label:>7} {codec:>7} {stored_mb:>7.1f}MB "
+                    f"{write_ms:>7.1f}ms {load_ms:>7.1f}ms"
+                )
+                if codec == "none":
+                    mmap_ms = best_time(lambda: store.get(name, mmap=True))
+                    print(f"{label:>7} {'mmap':>7} {'':>9} {'':>9} {mmap_ms:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark of the bootstrap confidence intervals on the committed test set.
+
+Compares the batched implementation for 10,000 resamples against a Python loop
+over `regression_metrics`, which is timed on a few hundred resamples and
+extrapolated.
+
+Usage:
+    python -m benchmarks.bench_bootstrap
+"""
+
+import time
+
+import numpy as np
+
+from src.utils.model_utils import bootstrap_metrics, regression_metrics
+
+TEST_ARRAY_PATH = "data/test/test_array.npy"
+TEST_PREDS_PATH = "models/predictions/elsaticnet_model_test_preds_arr.npy"
+N_RESAMPLES = 10_000
+LOOP_RESAMPLES = 500
+
+
+def main():
+    """Runs the benchmark and prints the timings."""
+    test_array = np.load(TEST_ARRAY_PATH)
+    y_true, y_pred = test_array[:, -1], np.load(TEST_PREDS_PATH)
+    n, n_features = len(y_true), test_array.shape[1] - 1
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(LOOP_RESAMPLES):
+        idx = rng.integers(0, n, n)
+        regression_metrics(y_true[idx], y_pred[idx], (n, n_features))
+    loop_time = (time.perf_counter() - start) * N_RESAMPLES / LOOP_RESAMPLES
+    print(f"python loop (extrapolated): {loop_time:.2f} s for {N_RESAMPLES} resamples")
+
+    for n_jobs in (1, 4):
+        start = time.perf_counter()
+        intervals = bootstrap_metrics(
+            y_true, y_pred, n_features, n_resamples=N_RESAMPLES, n_jobs=n_jobs
+        )
+        batched_time = time.perf_counter() - start
+        print(f"batched, n_jobs={n_jobs}: {batched_time:.2f} s")
+
+    print(f"rows: {n}, RMSE interval: {intervals['RMSE']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of the cold start of the two inference paths: `ModelPrediction` (pandas,
+sklearn, joblib, PyYAML, Box) against the NumPy-only `LiteModel` on the exported
+model. Each run is a fresh interpreter which imports the path, loads the model and
+scores the first rows of the test set. The benchmark reports the import time,
+time to the first prediction, total process time, peak RSS, and whether the
+predictions are identical.
+
+Export the model first:
+    python -m src.pipelines.model_export
+
+Usage:
+    python -m benchmarks.bench_cold_start
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+TEST_DATA_PATH = "data/test/test_data.csv"
+EXPORT_PATH = "models/exported/elasticnet_model.npz"
+N_ROWS = 5
+REPEATS = 5
+
+# Each snippet prints the timings, peak RSS and predictions of one cold start
+CHILD_PREAMBLE = """
+import json, resource, sys, time
+start = time.perf_counter()
+"""
+CHILD_REPORT = """
+end = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_prediction_s": end - start,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "predictions": [float(value) for value in predictions],
+}))
+"""
+CURRENT_PATH = """
+import pandas as pd
+from src.components.model_prediction import ModelPrediction
+imported = time.perf_counter()
+rows = pd.DataFrame(json.loads(sys.argv[1]))
+predictions = ModelPrediction().predict(rows)
+"""
+LITE_PATH = f"""
+from src.utils.lite_inference import LiteModel
+imported = time.perf_counter()
+rows = json.loads(sys.argv[1])
+predictions = LiteModel.load("{EXPORT_PATH}").predict(rows)
+"""
+
+
+def cold_start(snippet: str, rows: dict) -> dict:
+    """Runs one inference path in a fresh interpreter and returns its report."""
+    code = CHILD_PREAMBLE + snippet + CHILD_REPORT
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code, json.dumps(rows)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["process_s"] = time.perf_counter() - start
+    return report
+
+
+def main():
+    """Runs the benchmark and prints the median of each measurement."""
+    features = pd.read_csv(TEST_DATA_PATH, nrows=N_ROWS).drop(columns="quality")
+    rows = features.to_dict("list")
+
+    predictions = {}
+    print(
+        f"{'path':>8} {'import':>9} {'first pred':>11} {'process':>9} {'peak RSS':>10}"
+    )
+    for name, snippet in (("current", CURRENT_PATH), ("lite", LITE_PATH)):
+        reports = [cold_start(snippet, rows) for _ in range(REPEATS)]
+        predictions[name] = reports[0]["predictions"]
+        import_ms = 1000 * statistics.median(r["import_s"] for r in reports)
+        first_ms = 1000 * statistics.median(r["first_prediction_s"] for r in reports)
+        process_ms = 1000 * statistics.median(r["process_s"] for r in reports)
+        rss_mb = statistics.median(r["rss_mb"] for r in reports)
+        print(
+            f"{name:>8} {import_ms:>7.0f}ms {first_ms:>9.0f}ms "
+            f"{process_ms:>7.0f}ms {rss_mb:>8.1f}MB"
+        )
+
+    print(f"identical predictions: {predictions['current'] == predictions['lite']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load generator for the prediction service. Single-row requests arrive as an
+open-loop Poisson process at multiples of the measured capacity, each with a
+deadline, against two configurations of `PredictionService`:
+
+    - unbounded: an unbounded queue, no admission control and no shedding,
+      the behaviour of callers blocking on `ModelPrediction.predict`;
+    - bounded: the configured queue size, admission control and shedding.
+
+For each load the generator reports the goodput (requests answered within their
+deadline per second), the latency percentiles of the answered requests, the
+share of late, rejected and shed requests, and the largest queue depth.
+
+Usage:
+    python -m benchmarks.bench_prediction_service
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_prediction import ModelPrediction
+from src.components.prediction_service import PredictionService, ServiceOverloaded
+
+TEST_DATA_PATH = "data/test/test_data.csv"
+LOAD_FACTORS = (0.5, 0.9, 2.0, 4.0)
+DURATION_S = 3.0
+TIMEOUT_S = 0.05
+SEED = 42
+
+
+def measure_service_time(model_prediction: ModelPrediction, row: pd.DataFrame):
+    """Returns the mean time of a sequential single-row prediction, in seconds."""
+    for _ in range(50):
+        model_prediction.predict(row)
+    start = time.perf_counter()
+    for _ in range(200):
+        model_prediction.predict(row)
+    return (time.perf_counter() - start) / 200
+
+
+def run_load(service: PredictionService, row: pd.DataFrame, rate: float) -> dict:
+    """
+    Submits requests at a Poisson rate for DURATION_S, waits until all of them
+    are answered, and returns the outcome counts and latencies.
+    """
+    rng = np.random.default_rng(SEED)
+    latencies = []
+    outcomes = {"ok": 0, "late": 0, "rejected": 0, "shed": 0}
+    lock = threading.Lock()
+    futures = []
+
+    def on_done(future, submitted_at):
+        latency = time.perf_counter() - submitted_at
+        with lock:
+            if future.exception() is not None:
+                outcomes["shed"] += 1
+            elif latency > TIMEOUT_S:
+                outcomes["late"] += 1
+            else:
+                outcomes["ok"] += 1
+                latencies.append(latency)
+
+    start = time.perf_counter()
+    next_arrival = start
+    while next_arrival < start + DURATION_S:
+        next_arrival += rng.exponential(1 / rate)
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        submitted_at = time.perf_counter()
+        try:
+            future = service.submit(row, TIMEOUT_S)
+        except ServiceOverloaded:
+            outcomes["rejected"] += 1
+            continue
+        future.add_done_callback(lambda f, t=submitted_at: on_done(f, t))
+        futures.append(future)
+
+    for future in futures:
+        future.exception()
+    return {
+        "outcomes": outcomes,
+        "latencies_ms": 1000 * np.array(latencies or [np.nan]),
+        "max_queue_depth": service.metrics()["max_queue_depth"],
+    }
+
+
+def main():
+    """Runs every load against both configurations and prints one row each."""
+    model_prediction = ModelPrediction()
+    model_prediction.event_log = None
+    row = pd.read_csv(TEST_DATA_PATH, nrows=1).drop(columns="quality")
+    service_time_s = measure_service_time(model_prediction, row)
+    capacity = 1 / service_time_s
+    print(
+        f"service time {1000 * service_time_s:.2f}ms, capacity {capacity:.0f} req/s, "
+        f"deadline {1000 * TIMEOUT_S:.0f}ms"
+    )
+    print(
+        f"{'config':>9} {'load':>5} {'offered':>8} {'goodput':>8} {'p50':>8} "
+        f"{'p99':>8} {'late':>6} {'reject':>7} {'shed':>6} {'max q':>6}"
+    )
+
+    settings = {
+        "unbounded": {
+            "queue_size": 0,
+            "admission_control": False,
+            "shed_expired": False,
+        },
+        "bounded": {},
+    }
+    for load_factor in LOAD_FACTORS:
+        for name, overrides in settings.items():
+            service = PredictionService(model_prediction, **overrides)
+            result = run_load(service, row, load_factor * capacity)
+            service.close()
+
+            outcomes = result["outcomes"]
+            total = sum(outcomes.values())
+            latencies_ms = result["latencies_ms"]
+            print(
+                f"{name:>9} {load_factor:>4.1f}x {total / DURATION_S:>6.0f}/s "
+                f"{outcomes['ok'] / DURATION_S:>6.0f}/s "
+                f"{np.percentile(latencies_ms, 50):>6.1f}ms "
+                f"{np.percentile(latencies_ms, 99):>6.1f}ms "
+                f"{outcomes['late'] / total:>6.1%} "
+                f"{outcomes['rejected'] / total:>7.1%} "
+                f"{outcomes['shed'] / total:>6.1%} {result['max_queue_depth']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of the overhead of shadow scoring on the production prediction path.
+`ModelPrediction.predict` is timed on requests of 1 and 100 rows of the test set,
+without a shadow and with a candidate scored in the background. The candidate is
+the committed model with perturbed coefficients, registered in a temporary
+registry with the committed preprocessor, so it reuses the production features.
+
+The benchmark reports the production latency percentiles of each setting, and the
+shadowed and dropped requests and difference statistics of the shadow.
+
+Usage:
+    python -m benchmarks.bench_shadow_scoring
+"""
+
+import tempfile
+import time
+from os.path import join
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.components.model_prediction import ModelPrediction
+from src.utils.artifact_store import ArtifactStore
+from src.utils.model_registry import ModelRegistry, RegistryWatcher
+from src.utils.shadow_scoring import ShadowScorer
+
+TEST_DATA_PATH = "data/test/test_data.csv"
+REQUEST_SIZES = (1, 100)
+N_REQUESTS = 2_000
+WARMUP_REQUESTS = 200
+
+
+def latencies(model_prediction: ModelPrediction, rows: pd.DataFrame) -> np.array:
+    """Returns the latency of each of N_REQUESTS requests, in milliseconds."""
+    for _ in range(WARMUP_REQUESTS):
+        model_prediction.predict(rows)
+    timings = np.empty(N_REQUESTS)
+    for i in range(N_REQUESTS):
+        start = time.perf_counter()
+        model_prediction.predict(rows)
+        timings[i] = time.perf_counter() - start
+    return 1000 * timings
+
+
+def main():
+    """Runs the benchmark and prints one row per request size and setting."""
+    model_prediction = ModelPrediction()
+    model_prediction.event_log = None
+    test_data = pd.read_csv(TEST_DATA_PATH).drop(columns="quality")
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        candidate_model = joblib.load(model_prediction.model_path)
+        rng = np.random.default_rng(42)
+        candidate_model.coef_ = candidate_model.coef_ * rng.uniform(0.9, 1.1)
+        candidate_path = join(root_dir, "candidate.joblib")
+        joblib.dump(candidate_model, candidate_path)
+
+        registry = ModelRegistry(root_dir, ArtifactStore(join(root_dir, "artifacts")))
+        registry.register(
+            model_prediction.preprocessor_path, candidate_path, stage="staging"
+        )
+        candidate = RegistryWatcher(registry, "staging", poll_interval_s=60)
+
+        print(
+            f"{'rows':>5} {'shadow':>7} {'p50':>9} {'p99':>9} {'mean':>9} "
+            f"{'shadowed':>9} {'dropped':>8}"
+        )
+        for size in REQUEST_SIZES:
+            rows = test_data.head(size)
+            for shadow in (False, True):
+                model_prediction.shadow = (
+                    ShadowScorer(candidate, summary_interval_s=3600)
+                    if shadow
+                    else None
+                )
+                timings = latencies(model_prediction, rows)
+                shadowed = dropped = "-"
+                if shadow:
+                    model_prediction.shadow.close()
+                    summary = model_prediction.shadow.summary()
+                    shadowed = summary["submitted_count"]
+                    dropped = summary["dropped_count"]
+                print(
+                    f"{size:>5} {'on' if shadow else 'off':>7} "
+                    f"{np.percentile(timings, 50):>7.3f}ms "
+                    f"{np.percentile(timings, 99):>7.3f}ms "
+                    f"{timings.mean():>7.3f}ms {shadowed:>9} {dropped:>8}"
+                )
+        print(f"difference statistics: {summary['versions']}")
+        candidate.close()
+
+
+if __name__ == "__main__":
+    main()
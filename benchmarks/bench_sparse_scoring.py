@@ -0,0 +1,63 @@
+"""
+Benchmark of column projection in batch scoring. The test set is tiled into a
+large CSV file, which is scored by `BatchPrediction` reading every column and
+reading only the features with a nonzero coefficient. The benchmark reports the
+read, score and total times, the columns read, and whether the predictions of
+both runs are identical.
+
+Usage:
+    python -m benchmarks.bench_sparse_scoring
+"""
+
+import tempfile
+import time
+from os.path import join
+
+import numpy as np
+import pandas as pd
+
+from src.components.batch_prediction import BatchPrediction
+
+TEST_DATA_PATH = "data/test/test_data.csv"
+N_ROWS = 1_000_000
+
+
+def main():
+    """Runs the benchmark and prints one row per setting."""
+    test_data = pd.read_csv(TEST_DATA_PATH)
+    print(f"{'projection':>10} {'columns':>8} {'read':>8} {'score':>8} {'total':>8}")
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        input_path = join(root_dir, "input.csv")
+        repeats = -(-N_ROWS // len(test_data))
+        pd.concat([test_data] * repeats).head(N_ROWS).to_csv(input_path, index=False)
+
+        predictions = {}
+        for projection in (False, True):
+            batch_prediction = BatchPrediction(explain=False)
+            batch_prediction.column_projection = projection
+            batch_prediction.input_filepath = input_path
+            batch_prediction.output_filepath = join(root_dir, f"{projection}.csv")
+            batch_prediction.report_filepath = join(root_dir, f"{projection}.json")
+            batch_prediction.model_prediction.event_log = None
+
+            start = time.perf_counter()
+            batch_prediction.score_file()
+            total_s = time.perf_counter() - start
+            report = pd.read_json(batch_prediction.report_filepath, typ="series")
+            predictions[projection] = pd.read_csv(
+                batch_prediction.output_filepath, usecols=["prediction"]
+            )["prediction"].to_numpy()
+            columns = f"{report['columns_read']}/{report['columns_total']}"
+            print(
+                f"{'on' if projection else 'off':>10} {columns:>8} "
+                f"{report['read_s']:>7.2f}s {report['score_s']:>7.2f}s "
+                f"{total_s:>7.2f}s"
+            )
+
+    identical = np.array_equal(predictions[False], predictions[True])
+    print(f"identical predictions: {identical}")
+
+
+if __name__ == "__main__":
+    main()
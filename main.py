@@ -4,8 +4,18 @@ Data Ingestion, Data Validation, Data Preparation, Data Transformation, Model Tr
 Model Evaluation. Each stage is encapsulated in its own class and has a main method
 that executes the tasks for that stage. If any exceptions occur during the
 execution of a stage, they are logged and re-raised as a CustomException.
+
+Run `python main.py --profile` to write a profile of each stage under `profiles/`.
+Each run executes in an isolated workspace under `runs/`, which lets several runs
+execute in parallel; the trained model and preprocessor are published back to
+`models/` together when the run completes. Run `python main.py --workspace RUN_ID`
+to resume a run, or `python main.py --in-place` to write directly to `models/`,
+where a model server may briefly pair the new preprocessor with the old model.
 """
 
+import argparse
+import os
+
 from src.exception import CustomException
 from src.logger import logger
 from src.pipelines.stage_01_data_ingestion import DataIngestionPipeline
@@ -14,6 +24,30 @@ from src.pipelines.stage_03_data_preparation import DataPreparationPipeline
 from src.pipelines.stage_04_data_transformation import DataTransformPipeline
 from src.pipelines.stage_05_model_trainer import ModelTrainerPipeline
 from src.pipelines.stage_06_model_evaluation import ModelEvaluationPipeline
+from src.utils.profiling import PROFILE_ENV
+from src.utils.workspace import RunWorkspace
+
+parser = argparse.ArgumentParser(description="Run the training pipeline")
+parser.add_argument("--profile", action="store_true", help="profile each stage")
+parser.add_argument(
+    "--workspace",
+    nargs="?",
+    const="",
+    default=None,
+    metavar="RUN_ID",
+    help="resume the workspace of RUN_ID (a new workspace is the default)",
+)
+parser.add_argument(
+    "--in-place", action="store_true", help="run without an isolated workspace"
+)
+args = parser.parse_args()
+if args.profile:
+    os.environ[PROFILE_ENV] = "1"
+
+workspace = None
+if not args.in_place:
+    workspace = RunWorkspace.from_configs(args.workspace or None)
+    os.chdir(workspace.create())
 
 STAGE_NAME = "Data Ingestion stage"
 
@@ -80,3 +114,6 @@ try:
 except Exception as e:
     logger.error(CustomException(e))
     raise CustomException(e) from e
+
+if workspace is not None:
+    workspace.publish()
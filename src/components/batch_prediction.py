@@ -0,0 +1,338 @@
+"""
+This module contains the BatchPrediction class which scores a CSV or Parquet file
+of wines chunk by chunk with the trained model and writes the predictions, and
+optionally the per-feature contributions, to an output CSV file.
+
+The elastic net sets many coefficients to exactly zero. With column projection,
+the scorer reads only the features with a nonzero coefficient (plus the
+configured passthrough columns) and computes the prediction from those alone,
+with the preprocessor's imputation and scaling arrays of the same features. The
+skipped features are never parsed, transformed or multiplied, and the savings are
+written to a scoring report. Projection is opt-in: its output holds only the
+passthrough columns, the active features and the prediction, and its rows are
+scored without `ModelPrediction.predict`, so they are neither sampled into the
+prediction event log nor scored by the shadow candidate.
+"""
+
+import time
+from os.path import dirname, getsize, normpath, splitext
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_export import ModelExport
+from src.components.model_prediction import ModelPrediction
+from src.constants import CONFIGS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import (
+    atomic_path,
+    create_directories,
+    read_yaml,
+    save_as_json,
+)
+from src.utils.lite_inference import LiteModel
+
+
+class BatchPrediction:
+    """
+    A class used to score a CSV or Parquet file of wines in chunks.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for batch prediction.
+    features : list
+        The feature names expected by the preprocessor.
+    chunk_size : int
+        The number of rows read and scored at a time.
+    explain : bool
+        Whether the per-feature contributions are written with the predictions.
+    column_projection : bool
+        Whether only the features with a nonzero coefficient are read.
+    passthrough_columns : list
+        The input columns copied to the output when columns are projected.
+
+    Methods
+    -------
+    projected_model():
+        Returns the model restricted to its active features, if it applies.
+    read_chunks(columns, source):
+        Reads the input file in chunks, optionally only some columns.
+    score_chunk(chunk, model):
+        Adds the predictions, and optionally the contributions, to a chunk.
+    score_file():
+        Scores the input file and writes the output file.
+    """
+
+    def __init__(self, explain: bool = None, model_prediction: ModelPrediction = None):
+        """
+        Constructs all the necessary attributes for the BatchPrediction object.
+
+        Args:
+            explain (bool, optional): Overrides the `explain` configuration.
+            Defaults to None.
+            model_prediction (ModelPrediction, optional): The model to score
+            with, e.g. one already loaded by the app. Defaults to None, meaning a
+            new one.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).batch_prediction
+        self.features = list(read_yaml(SCHEMA).raw_data_schema.features.keys())
+
+        # Scoring parameters
+        self.chunk_size = self.configs.chunk_size
+        self.explain = self.configs.explain if explain is None else explain
+        self.column_projection = self.configs.column_projection
+        self.passthrough_columns = list(self.configs.passthrough_columns)
+
+        # Input and output file paths
+        self.input_filepath = normpath(self.configs.input_path)
+        self.output_filepath = normpath(self.configs.output_path)
+        self.report_filepath = normpath(self.configs.report_path)
+
+        self.model_prediction = model_prediction or ModelPrediction()
+
+    def projected_model(self) -> LiteModel:
+        """
+        Builds the linear model restricted to the features with a nonzero
+        coefficient, from the served preprocessor and model. Projection does not
+        apply when it is disabled, when contributions are explained (every
+        feature has a contribution column), or when the model is not a linear
+        model on the numeric features. The projected model scores rows without
+        `ModelPrediction.predict`, bypassing the event log and shadow scoring.
+
+        Returns:
+            LiteModel: The projected model, or None to score with every column.
+        """
+        if not self.column_projection or self.explain:
+            return None
+        bundle = self.model_prediction.load_artifacts()
+        try:
+            if not hasattr(bundle.model, "coef_"):
+                raise TypeError(f"{type(bundle.model).__name__} has no coefficients")
+            preprocessing = ModelExport().extract_preprocessing(bundle.preprocessor)
+        except (TypeError, ValueError) as e:
+            logger.warning("Column projection disabled: %s", e)
+            return None
+        return LiteModel(
+            preprocessing["features"],
+            preprocessing["impute_values"],
+            np.asarray(preprocessing["mean"], dtype=np.float64),
+            np.asarray(preprocessing["scale"], dtype=np.float64),
+            np.ravel(bundle.model.coef_).astype(np.float64),
+            np.float64(np.ravel(bundle.model.intercept_)[0]),
+            {"model_version": bundle.version},
+        ).project()
+
+    def is_parquet(self, path: str = None) -> bool:
+        """Returns whether a file, by default the input file, is a Parquet file."""
+        return splitext(path or self.input_filepath)[1].lower() in (".parquet", ".pq")
+
+    def input_columns(self) -> list:
+        """Returns the column names of the input file, without reading its rows."""
+        if self.is_parquet():
+            import pyarrow.parquet as pq
+
+            return pq.read_schema(self.input_filepath).names
+        return list(pd.read_csv(self.input_filepath, nrows=0).columns)
+
+    def read_chunks(self, columns: list = None, source=None):
+        """
+        Reads a file in chunks of `chunk_size` rows. Parquet files are read
+        column by column, so unread columns are not even fetched from disk; CSV
+        files are scanned but the unread fields are not parsed.
+
+        Args:
+            columns (list, optional): The columns to read. Defaults to None,
+            meaning every column.
+            source (optional): The path or named file object to read, such as an
+            uploaded file. Defaults to None, meaning the input file.
+
+        Yields:
+            pd.DataFrame: The next chunk.
+        """
+        source = source or self.input_filepath
+        if self.is_parquet(getattr(source, "name", source)):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(source)
+            for batch in parquet_file.iter_batches(
+                batch_size=self.chunk_size, columns=columns
+            ):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(source, chunksize=self.chunk_size, usecols=columns)
+
+    def score_chunk(
+        self, chunk: pd.DataFrame, model: LiteModel = None
+    ) -> pd.DataFrame:
+        """
+        Adds the `prediction` column to a chunk, plus the `base_value` and
+        `contribution_<feature>` columns when explanations are enabled.
+
+        Args:
+            chunk (pd.DataFrame): The input rows.
+            model (LiteModel, optional): The projected model, which only reads
+            the active features. Defaults to None, meaning the full model.
+
+        Returns:
+            pd.DataFrame: The scored chunk.
+        """
+        if model is not None:
+            chunk["prediction"] = model.predict(chunk)
+        elif self.explain:
+            explanation = self.model_prediction.explain(chunk[self.features])
+            chunk["prediction"] = explanation.pop("prediction")
+            chunk["base_value"] = explanation.pop("base_value")
+            chunk = pd.concat([chunk, explanation.add_prefix("contribution_")], axis=1)
+        else:
+            chunk["prediction"] = self.model_prediction.predict(chunk[self.features])
+        return chunk
+
+    def parquet_bytes(self, columns: list) -> tuple:
+        """
+        Sums the compressed size of the column chunks of a Parquet file.
+
+        Args:
+            columns (list): The read columns.
+
+        Returns:
+            tuple: The bytes of the read columns and of all columns.
+        """
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(self.input_filepath).metadata
+        read_bytes = total_bytes = 0
+        for row_group in range(metadata.num_row_groups):
+            group = metadata.row_group(row_group)
+            for column in range(group.num_columns):
+                chunk = group.column(column)
+                total_bytes += chunk.total_compressed_size
+                if chunk.path_in_schema in columns:
+                    read_bytes += chunk.total_compressed_size
+        return read_bytes, total_bytes
+
+    def scoring_report(
+        self, model: LiteModel, row_count: int, read_s: float, score_s: float
+    ) -> dict:
+        """
+        Summarizes the columns, bytes and arithmetic skipped by column projection.
+
+        Args:
+            model (LiteModel): The projected model, or None.
+            row_count (int): The number of scored rows.
+            read_s (float): The time spent reading the input.
+            score_s (float): The time spent scoring.
+
+        Returns:
+            dict: The scoring report.
+        """
+        all_columns = self.input_columns()
+        active_features = self.features if model is None else model.features
+        read_columns = all_columns
+        if model is not None:
+            projected = set(self.passthrough_columns + active_features)
+            read_columns = [column for column in all_columns if column in projected]
+        skipped_features = [f for f in self.features if f not in active_features]
+        report = {
+            "input_path": self.input_filepath,
+            "row_count": row_count,
+            "column_projection": model is not None,
+            "model_version": self.model_prediction.load_artifacts().version,
+            "active_features": active_features,
+            "skipped_features": skipped_features,
+            "columns_read": len(read_columns),
+            "columns_total": len(all_columns),
+            "cells_skipped": row_count * (len(all_columns) - len(read_columns)),
+            # Each skipped feature value is never imputed, scaled or multiplied
+            "feature_values_skipped": row_count * len(skipped_features),
+            "input_bytes": getsize(self.input_filepath),
+            "read_s": read_s,
+            "score_s": score_s,
+        }
+        if self.is_parquet():
+            read_bytes, total_bytes = self.parquet_bytes(read_columns)
+            report["column_bytes_read"] = read_bytes
+            report["column_bytes_total"] = total_bytes
+        return report
+
+    def score_file(self) -> str:
+        """
+        Scores the input file chunk by chunk. Each output row holds the input
+        columns and the prediction, plus the base value and one
+        `contribution_<feature>` column per feature when explanations are
+        enabled. With column projection, the output holds the passthrough
+        columns, the active features and the prediction. An input without rows
+        gives an output with only the header.
+
+        Raises:
+            CustomException: If the file cannot be read, scored or written, or
+            lacks a column to read.
+
+        Returns:
+            str: The path of the output file.
+        """
+        try:
+            create_directories([dirname(self.output_filepath)])
+            model = self.projected_model()
+            columns = None
+            if model is not None:
+                columns = self.passthrough_columns + model.features
+
+            input_columns = self.input_columns()
+            required = self.features if columns is None else columns
+            missing = [column for column in required if column not in input_columns]
+            if missing:
+                raise ValueError(f"The input file is missing the columns {missing}")
+
+            with atomic_path(self.output_filepath) as temp_path:
+                row_count = 0
+                read_s = score_s = 0.0
+                chunks = self.read_chunks(columns)
+                while True:
+                    start = time.perf_counter()
+                    chunk = next(chunks, None)
+                    read_s += time.perf_counter() - start
+                    if chunk is None:
+                        break
+                    if chunk.empty:
+                        continue
+
+                    start = time.perf_counter()
+                    chunk = self.score_chunk(chunk, model)
+                    score_s += time.perf_counter() - start
+
+                    chunk.to_csv(
+                        temp_path,
+                        mode="w" if row_count == 0 else "a",
+                        header=row_count == 0,
+                        index=False,
+                        encoding="utf-8",
+                    )
+                    row_count += len(chunk)
+
+                # Without rows no chunk created the output, so write its header
+                if row_count == 0:
+                    header = list(columns or input_columns) + ["prediction"]
+                    if self.explain:
+                        header += ["base_value"] + [
+                            f"contribution_{feature}" for feature in self.features
+                        ]
+                    pd.DataFrame(columns=header).to_csv(
+                        temp_path, index=False, encoding="utf-8"
+                    )
+
+            report = self.scoring_report(model, row_count, read_s, score_s)
+            save_as_json(self.report_filepath, report)
+            logger.info(
+                "%s rows scored and saved at: %s, read %s of %s columns",
+                row_count,
+                self.output_filepath,
+                report["columns_read"],
+                report["columns_total"],
+            )
+            return self.output_filepath
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
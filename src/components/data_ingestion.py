@@ -13,7 +13,7 @@ from ucimlrepo import fetch_ucirepo
 from src.constants import CONFIGS
 from src.exception import CustomException
 from src.logger import logger
-from src.utils.basic_utils import create_directories, read_yaml
+from src.utils.basic_utils import atomic_path, create_directories, read_yaml
 
 
 class DataIngestion:
@@ -68,9 +68,10 @@ class DataIngestion:
             # Download and save data if required
             if not exists(self.output_filepath) or self.download:
                 wine_data = self.fetch_uci_dataset(uci_id=self.uci_data_id)
-                wine_data.to_csv(
-                    self.output_filepath, index=False, header=True, encoding="utf-8"
-                )
+                with atomic_path(self.output_filepath) as temp_path:
+                    wine_data.to_csv(
+                        temp_path, index=False, header=True, encoding="utf-8"
+                    )
                 logger.info("Data saved at: %s", self.output_filepath)
             else:
                 logger.info(
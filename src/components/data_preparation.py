@@ -11,7 +11,7 @@ from sklearn.model_selection import train_test_split
 from src.constants import CONFIGS
 from src.exception import CustomException
 from src.logger import logger
-from src.utils.basic_utils import create_directories, read_yaml
+from src.utils.basic_utils import atomic_path, create_directories, read_yaml
 
 
 class DataPreparation:
@@ -65,7 +65,8 @@ class DataPreparation:
             raw_df = downloaded_df[red_wine_filter].drop(columns="color")
 
             # Save the raw dataset
-            raw_df.to_csv(self.raw_filepath, index=False, header=True, encoding="utf-8")
+            with atomic_path(self.raw_filepath) as temp_path:
+                raw_df.to_csv(temp_path, index=False, header=True, encoding="utf-8")
 
             # Prepare training and test datasets
             train_set, test_set = train_test_split(
@@ -73,16 +74,14 @@ class DataPreparation:
             )
 
             # Save the training datasets
-            train_set.to_csv(
-                self.train_filepath, index=False, header=True, encoding="utf-8"
-            )
+            with atomic_path(self.train_filepath) as temp_path:
+                train_set.to_csv(temp_path, index=False, header=True, encoding="utf-8")
             logger.info("Training data saved at: %s", self.train_filepath)
             logger.info("Train set shape: %s", train_set.shape)
 
             # Save the training datasets
-            test_set.to_csv(
-                self.test_filepath, index=False, header=True, encoding="utf-8"
-            )
+            with atomic_path(self.test_filepath) as temp_path:
+                test_set.to_csv(temp_path, index=False, header=True, encoding="utf-8")
             logger.info("Test data saved at: %s", self.test_filepath)
             logger.info("Test set shape: %s", test_set.shape)
 
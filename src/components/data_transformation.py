@@ -20,7 +20,14 @@ from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from src.constants import CONFIGS, SCHEMA
 from src.exception import CustomException
 from src.logger import logger
-from src.utils.basic_utils import create_directories, read_yaml, save_as_joblib
+from src.utils.artifact_store import ArtifactStore
+from src.utils.basic_utils import (
+    create_directories,
+    file_lock,
+    read_yaml,
+    save_as_joblib,
+    save_as_npy,
+)
 
 
 class DataTransformation:
@@ -31,6 +38,8 @@ class DataTransformation:
     ----------
     configs : dict
         a dictionary of configurations read from a yaml file
+    artifact_configs : dict
+        a dictionary of artifact store configurations read from a yaml file
     schema : dict
         a dictionary of schema read from a yaml file
     features : dict
@@ -47,6 +56,8 @@ class DataTransformation:
         a string representing the path to the transformed test data
     preprocessor_path : str
         a string representing the path to the preprocessor
+    publish_lock_path : str
+        a string representing the lock file guarding the served model files
 
     Methods
     -------
@@ -65,6 +76,7 @@ class DataTransformation:
         """
         # Read the configuration files
         self.configs = read_yaml(CONFIGS).data_transformation
+        self.artifact_configs = read_yaml(CONFIGS).artifact_store
         self.schema = read_yaml(SCHEMA).raw_data_schema
 
         # Feature and target column names with datatype
@@ -80,6 +92,11 @@ class DataTransformation:
         self.test_array_path = normpath(self.configs.test_array_path)
         self.preprocessor_path = normpath(self.configs.preprocessor_path)
 
+        # Lock taken while the served model files are replaced
+        workspace_configs = read_yaml(CONFIGS).workspace
+        self.publish_lock_path = normpath(workspace_configs.lock_path)
+        self.lock_timeout_s = workspace_configs.lock_timeout_s
+
     def get_features_by_datatype(self) -> tuple[list]:
         """
         Separates the features into numerical and categorical based on their datatypes.
@@ -189,13 +206,21 @@ class DataTransformation:
         logger.info("Shape of normalized test array: %s", test_array.shape)
 
         # Save the arrays
-        np.save(self.train_array_path, train_array)
-        np.save(self.test_array_path, test_array)
+        save_as_npy(self.train_array_path, train_array)
+        save_as_npy(self.test_array_path, test_array)
 
         # Create directory if not exist
         create_directories([dirname(self.preprocessor_path)])
 
-        # Saving the preprocessor object
-        save_as_joblib(self.preprocessor_path, preprocessor)
+        # Saving the preprocessor object, excluding readers of the served model
+        with file_lock(self.publish_lock_path, timeout_s=self.lock_timeout_s):
+            save_as_joblib(self.preprocessor_path, preprocessor)
+
+        # Keep content-addressed copies of the preprocessor and arrays
+        if self.artifact_configs.enabled:
+            store = ArtifactStore.from_configs(self.artifact_configs)
+            store.put_object("preprocessor", preprocessor)
+            store.put_array("train_array", train_array)
+            store.put_array("test_array", test_array)
 
         return (train_array, test_array)
@@ -0,0 +1,293 @@
+"""
+This module contains the IncrementalTrainer class which retrains the ElasticNet
+model when new labeled rows are appended to the external dataset. A persisted
+watermark records the byte offset already consumed, so only the appended rows are
+read. The preprocessor's scaling statistics are updated with the new rows, the
+model is warm-started from the previous coefficients and refitted on the new rows
+plus a bounded replay sample of past rows, and a new model version is published.
+"""
+
+import io
+import json
+from datetime import datetime
+from os.path import exists, getsize, join, normpath
+
+import numpy as np
+import pandas as pd
+
+from src.constants import CONFIGS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import (
+    file_lock,
+    load_joblib,
+    read_yaml,
+    save_as_joblib,
+    save_as_json,
+    save_as_npy,
+)
+
+
+class IncrementalTrainer:
+    """
+    A class used to incrementally retrain the ElasticNet model on appended data.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for incremental training.
+    features : list
+        The names of the feature columns.
+    target : str
+        The name of the target column.
+    replay_size : int
+        The maximum number of past rows kept for replay.
+    watermark_path : str
+        The path of the persisted watermark.
+    publish_lock_path : str
+        The lock file guarding the served preprocessor and model.
+
+    Methods
+    -------
+    read_new_rows(watermark):
+        Reads the rows appended to the external dataset after the watermark.
+    update_preprocessor(preprocessor, x_new):
+        Updates the running scaling statistics with the new rows.
+    retrain():
+        Retrains the model on the new rows and publishes a new version.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the IncrementalTrainer object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).incremental_trainer
+        self.schema = read_yaml(SCHEMA).raw_data_schema
+
+        # Feature and target column names
+        self.features = list(self.schema.features.keys())
+        self.target = list(self.schema.target.keys())[0]
+
+        # Replay parameters
+        self.replay_size = self.configs.replay_size
+        self.random_seed = self.configs.random_seed
+        self.lock_timeout_s = self.configs.lock_timeout_s
+
+        # Input file paths
+        self.external_filepath = normpath(self.configs.external_path)
+        self.train_filepath = normpath(self.configs.train_path)
+
+        # Input & output file paths
+        self.preprocessor_path = normpath(self.configs.preprocessor_path)
+        self.model_path = normpath(self.configs.model_path)
+        self.watermark_path = normpath(self.configs.watermark_path)
+        self.replay_path = normpath(self.configs.replay_path)
+        self.versions_dir = normpath(self.configs.versions_dir)
+
+        # Lock under which the served preprocessor and model are replaced
+        self.publish_lock_path = normpath(read_yaml(CONFIGS).workspace.lock_path)
+
+    def initialize_watermark(self) -> dict:
+        """
+        Creates the first watermark at the current end of the external dataset,
+        so the rows already in the file are never read as new rows. The current
+        model was trained on the training split only, not on the whole file, so
+        the replay sample is seeded from the training rows and `samples_seen`
+        counts those rows: it is the population the replay sample is drawn from.
+
+        Returns:
+            dict: The initial watermark.
+        """
+        train_df = pd.read_csv(self.train_filepath)
+        rng = np.random.default_rng(self.random_seed)
+        replay_rows = train_df[self.features + [self.target]].to_numpy(dtype=float)
+        if len(replay_rows) > self.replay_size:
+            replay_rows = replay_rows[
+                rng.choice(len(replay_rows), self.replay_size, replace=False)
+            ]
+
+        save_as_npy(self.replay_path, replay_rows)
+
+        watermark = {
+            "byte_offset": getsize(self.external_filepath),
+            # Rows the replay sample represents, not the rows before the offset
+            "samples_seen": len(train_df),
+            "model_version": 0,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        save_as_json(self.watermark_path, watermark)
+        logger.info("Watermark initialized at byte %s", watermark["byte_offset"])
+        return watermark
+
+    def read_new_rows(self, watermark: dict) -> tuple[pd.DataFrame, int]:
+        """
+        Reads only the complete lines appended after the watermark's byte offset.
+
+        Args:
+            watermark (dict): The persisted watermark.
+
+        Returns:
+            tuple[pd.DataFrame, int]: The new red wine rows and the byte offset
+            up to which the file has been consumed.
+        """
+        with open(self.external_filepath, "rb") as f:
+            header = f.readline()
+            f.seek(max(watermark["byte_offset"], len(header)))
+            appended = f.read()
+
+        # Ignore a trailing line that is still being written
+        complete = appended[: appended.rfind(b"\n") + 1]
+        new_offset = max(watermark["byte_offset"], len(header)) + len(complete)
+        if not complete.strip():
+            return pd.DataFrame(columns=self.features + [self.target]), new_offset
+
+        new_df = pd.read_csv(io.BytesIO(header + complete))
+
+        # Only keep red wine data
+        new_df = new_df[new_df["color"] == "red"].drop(columns="color")
+        return new_df, new_offset
+
+    def update_replay_rows(
+        self, replay_rows: np.array, new_rows: np.array, samples_seen: int
+    ) -> np.array:
+        """
+        Updates the replay sample with reservoir sampling so that it stays a
+        uniform sample of every row seen so far. The given sample is not
+        modified, and the updated one is not saved: the caller saves it once the
+        new rows are consumed.
+
+        Args:
+            replay_rows (np.array): The replay sample before the new rows.
+            new_rows (np.array): The new raw rows, features followed by target.
+            samples_seen (int): The number of rows seen before the new ones.
+
+        Returns:
+            np.array: The updated replay sample.
+        """
+        rng = np.random.default_rng(self.random_seed + samples_seen)
+
+        # Fill the reservoir first if it is not full yet
+        free_slots = max(self.replay_size - len(replay_rows), 0)
+        replay_rows = np.vstack([replay_rows, new_rows[:free_slots]])
+        remaining = new_rows[free_slots:]
+
+        # Replace existing rows with decreasing probability
+        positions = samples_seen + free_slots + np.arange(len(remaining))
+        slots = rng.integers(0, positions + 1)
+        for row_idx in np.flatnonzero(slots < self.replay_size):
+            replay_rows[slots[row_idx]] = remaining[row_idx]
+
+        return replay_rows
+
+    @staticmethod
+    def update_preprocessor(preprocessor, x_new: pd.DataFrame) -> tuple[np.array]:
+        """
+        Updates the running mean and variance of the numerical scaler with the
+        new rows. The median imputer keeps its statistics.
+
+        Args:
+            preprocessor: The fitted ColumnTransformer.
+            x_new (pd.DataFrame): The new feature rows.
+
+        Returns:
+            tuple[np.array]: The scaler mean and scale before and after the update.
+        """
+        num_pipeline = preprocessor.named_transformers_["num_pipeline"]
+        imputer = num_pipeline.named_steps["imputer"]
+        scaler = num_pipeline.named_steps["scalar"]
+
+        old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+        scaler.partial_fit(imputer.transform(x_new))
+        return (old_mean, old_scale, scaler.mean_, scaler.scale_)
+
+    def retrain(self):
+        """
+        Retrains the model on the rows appended since the last watermark and
+        publishes the result as a new model version. Does nothing if there are
+        no new rows.
+
+        Raises:
+            CustomException: If there is an error during retraining.
+
+        Returns:
+            The retrained model, or None when there was nothing to retrain on.
+        """
+        try:
+            # One retrain at a time reads and moves the watermark
+            lock_path = f"{self.watermark_path}.lock"
+            with file_lock(lock_path, timeout_s=self.lock_timeout_s):
+                if not exists(self.watermark_path):
+                    self.initialize_watermark()
+                    return None
+
+                with open(self.watermark_path, "r", encoding="utf-8") as f:
+                    watermark = json.load(f)
+
+                new_df, new_offset = self.read_new_rows(watermark)
+                logger.info("Found %s new rows since the watermark", len(new_df))
+
+                if new_df.empty:
+                    watermark["byte_offset"] = new_offset
+                    save_as_json(self.watermark_path, watermark)
+                    return None
+
+                # Fit on the previous replay sample, so new rows are not fitted
+                # twice; the updated sample is saved with the watermark
+                columns = self.features + [self.target]
+                new_rows = new_df[columns].to_numpy(dtype=float)
+                replay_rows = np.load(self.replay_path)
+                updated_replay_rows = self.update_replay_rows(
+                    replay_rows, new_rows, watermark["samples_seen"]
+                )
+
+                # Update the preprocessor statistics
+                preprocessor = load_joblib(self.preprocessor_path)
+                old_mean, old_scale, new_mean, new_scale = self.update_preprocessor(
+                    preprocessor, new_df[self.features]
+                )
+
+                # Re-express the previous solution in the updated scaling
+                en_model = load_joblib(self.model_path)
+                coef = en_model.coef_
+                en_model.intercept_ = en_model.intercept_ + np.sum(
+                    coef * (new_mean - old_mean) / old_scale
+                )
+                en_model.coef_ = coef * new_scale / old_scale
+
+                # Warm-start from the previous coefficients
+                fit_rows = np.vstack([new_rows, replay_rows])
+                fit_df = pd.DataFrame(fit_rows, columns=self.features + [self.target])
+                x_fit = preprocessor.transform(fit_df[self.features])
+                y_fit = fit_rows[:, -1]
+
+                en_model.set_params(warm_start=True)
+                en_model.fit(x_fit, y_fit)
+                logger.info("Model warm-started on %s rows", len(fit_rows))
+
+                # Publish the new version
+                version = watermark["model_version"] + 1
+                version_dir = join(self.versions_dir, f"v{version}")
+                save_as_joblib(join(version_dir, "preprocessor.joblib"), preprocessor)
+                save_as_joblib(join(version_dir, "model.joblib"), en_model)
+                with file_lock(self.publish_lock_path, timeout_s=self.lock_timeout_s):
+                    save_as_joblib(self.preprocessor_path, preprocessor)
+                    save_as_joblib(self.model_path, en_model)
+
+                # Move the watermark only after the new version is published,
+                # then the replay sample, so a failed retrain reads the same new
+                # rows against the same sample
+                watermark.update(
+                    byte_offset=new_offset,
+                    samples_seen=watermark["samples_seen"] + len(new_rows),
+                    model_version=version,
+                    updated_at=datetime.now().isoformat(timespec="seconds"),
+                )
+                save_as_json(self.watermark_path, watermark)
+                save_as_npy(self.replay_path, updated_replay_rows)
+                logger.info("Published model version %s", version)
+
+                return en_model
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
@@ -1,20 +1,29 @@
 """
 wip
 """
+import hashlib
+import json
 import os
-from os.path import basename, join, normpath
-from urllib.parse import urlparse
+import time
+from os.path import basename, exists, join, normpath
 
-import mlflow
-import mlflow.sklearn
 import numpy as np
 from dotenv import load_dotenv
 
 from src.constants import CONFIGS, PARAMS
 from src.exception import CustomException
 from src.logger import logger
-from src.utils.basic_utils import create_directories, load_joblib, read_yaml
-from src.utils.model_utils import log_scores, regression_metrics
+from src.utils.basic_utils import (
+    create_directories,
+    file_fingerprint,
+    load_joblib,
+    read_yaml,
+    save_as_joblib,
+    save_as_npy,
+)
+from src.utils.model_utils import bootstrap_metrics, log_scores, regression_metrics
+from src.utils.score_registry import ScoreRegistry
+from src.utils.tracking import AsyncMlflowLogger
 
 load_dotenv()
 
@@ -40,6 +49,22 @@ class ModelEvaluation:
         # Output file path
         self.scores_dir = normpath(self.configs.scores_dir)
         self.preds_dir = normpath(self.configs.predictions_dir)
+        self.cache_dir = normpath(self.configs.cache_dir)
+        self.registry_path = normpath(self.configs.registry_path)
+
+        # Bootstrap confidence interval options
+        self.bootstrap = self.configs.bootstrap
+
+        # MLflow tracking options; the background logger is started on first use
+        self.tracking_configs = read_yaml(CONFIGS).mlflow_tracking
+        self.tracker = None
+
+        # Arrays, model, fingerprint and results loaded or computed only once
+        self.arrays = None
+        self.predictions = None
+        self.eval_fingerprint = None
+        self.input_fingerprints = {}
+        self.eval_results = {}
 
     def get_features_and_labels(self) -> tuple[np.array]:
         """_summary_
@@ -53,6 +78,8 @@ class ModelEvaluation:
         Returns:
             _type_: _description_
         """
+        if self.arrays is not None:
+            return self.arrays
         try:
             # Load the training & test set array
             train_array = np.load(self.train_array_path)
@@ -67,7 +94,8 @@ class ModelEvaluation:
             logger.info("The shape of y_train: %s", y_train.shape)
             logger.info("The shape of x_test: %s", x_test.shape)
             logger.info("The shape of y_test: %s", y_test.shape)
-            return (x_train, y_train, x_test, y_test)
+            self.arrays = (x_train, y_train, x_test, y_test)
+            return self.arrays
         except Exception as e:
             logger.error(CustomException(e))
             raise CustomException(e) from e
@@ -101,7 +129,8 @@ class ModelEvaluation:
         Returns:
             _type_: _description_
         """
-
+        if self.predictions is not None:
+            return self.predictions
         try:
             # Load the model
             en_model = load_joblib(self.model_path)
@@ -118,12 +147,72 @@ class ModelEvaluation:
             logger.info("Shape of y_train_preds:%s", {y_train_preds.shape})
             logger.info("Shape of y_test_preds:%s", {y_test_preds.shape})
 
-            return (y_train_preds, y_test_preds, en_model)
+            self.predictions = (y_train_preds, y_test_preds, en_model)
+            return self.predictions
         except Exception as e:
             logger.error(CustomException(e))
             raise CustomException(e) from e
 
+    def get_fingerprint(self) -> str:
+        """
+        Computes the key of an evaluation from the contents of the model and the
+        train/test arrays, the hyperparameters and the bootstrap options. It
+        changes whenever any of them changes, and is computed once per instance.
+
+        Returns:
+            str: The SHA-256 hex digest identifying the evaluation.
+        """
+        if self.eval_fingerprint is None:
+            input_paths = {
+                "model": self.model_path,
+                "train": self.train_array_path,
+                "test": self.test_array_path,
+            }
+            self.input_fingerprints = {
+                name: file_fingerprint(path) for name, path in input_paths.items()
+            }
+            parts = list(self.input_fingerprints.values())
+            options = {
+                "hyperparameters": self.params.hyperparameters.to_dict(),
+                "bootstrap": self.bootstrap.to_dict(),
+            }
+            parts.append(json.dumps(options, sort_keys=True))
+            self.eval_fingerprint = hashlib.sha256("|".join(parts).encode()).hexdigest()
+        return self.eval_fingerprint
+
     def evaluate_model(self) -> dict:
+        """
+        Returns the evaluation results for the current model and data. They are
+        computed once per model version: later calls are served from memory, and
+        later runs from the on-disk cache keyed on the fingerprint.
+
+        Raises:
+            CustomException: If the evaluation cannot be computed or loaded.
+
+        Returns:
+            dict: The train/test metrics, predictions, model, model info and
+            hyperparameters.
+        """
+        try:
+            fingerprint = self.get_fingerprint()
+            if fingerprint in self.eval_results:
+                return self.eval_results[fingerprint]
+
+            cache_path = join(self.cache_dir, f"{fingerprint}.joblib")
+            if exists(cache_path):
+                logger.info("Evaluation results found in cache: %s", cache_path)
+                eval_details = load_joblib(cache_path)
+            else:
+                eval_details = self.compute_evaluation()
+                save_as_joblib(cache_path, eval_details)
+
+            self.eval_results[fingerprint] = eval_details
+            return eval_details
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def compute_evaluation(self) -> dict:
         """_summary_
 
         Raises:
@@ -133,6 +222,8 @@ class ModelEvaluation:
             dict: _description_
         """
         try:
+            start = time.perf_counter()
+
             # load train and test labels
             x_train, y_train, x_test, y_test = self.get_features_and_labels()
 
@@ -148,12 +239,34 @@ class ModelEvaluation:
             )
             test_eval_metrics = regression_metrics(y_test, y_test_preds, x_test.shape)
 
+            # Bootstrap confidence intervals of the metrics
+            metrics_ci = {}
+            if self.bootstrap.enabled:
+                for split, y_true, y_pred in (
+                    ("train", y_train, y_train_preds),
+                    ("test", y_test, y_test_preds),
+                ):
+                    metrics_ci[split] = bootstrap_metrics(
+                        y_true,
+                        y_pred,
+                        n_features=x_train.shape[1],
+                        n_resamples=self.bootstrap.n_resamples,
+                        confidence_level=self.bootstrap.confidence_level,
+                        batch_memory_mb=self.bootstrap.batch_memory_mb,
+                        n_jobs=self.bootstrap.n_jobs,
+                        random_seed=self.bootstrap.random_seed,
+                    )
+                logger.info(
+                    "Bootstrap intervals computed from %s resamples",
+                    self.bootstrap.n_resamples,
+                )
+
             # Additional Model info:
             model_info = {
                 "estimator_type": en_model._estimator_type,
                 "coefficients": en_model.coef_.tolist(),
-                "intercept": en_model.intercept_,
-                "dual_gap": en_model.dual_gap_,
+                "intercept": float(np.ravel(en_model.intercept_)[0]),
+                "dual_gap": getattr(en_model, "dual_gap_", None),
                 "input_features_count": en_model.n_features_in_,
                 "iteration_count": en_model.n_iter_,
                 "all_params": en_model.get_params(),
@@ -167,16 +280,22 @@ class ModelEvaluation:
                 "en_model": en_model,
                 "model_info": model_info,
                 "hyperparameters": hyperparameters,
+                "metrics_ci": metrics_ci,
+                "eval_duration_s": time.perf_counter() - start,
             }
         except Exception as e:
             logger.info(CustomException(e))
             raise CustomException(e) from e
 
     def log_into_mlflow(self):
-        """_summary_
+        """
+        Queues the hyperparameters, test metrics and model for MLflow. The writes
+        happen on a background thread in batches, so this returns immediately;
+        if the tracking server is unreachable, the run is kept in the local
+        fallback store.
 
         Raises:
-            CustomException: _description_
+            CustomException: If the logging events cannot be queued.
         """
         eval_details = self.evaluate_model()
         try:
@@ -186,22 +305,29 @@ class ModelEvaluation:
 
             logger.info("Started logging information to MLFlow")
 
-            mlflow.set_registry_uri(MLFLOW_TRACKING_URI)
-            tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
-
-            with mlflow.start_run():
-                mlflow.log_params(hyperparameters)
-                mlflow.log_metrics(test_eval_metrics)
-
-                if tracking_url_type_store != "file":
-                    mlflow.sklearn.log_model(
-                        en_model,
-                        "model",
-                        registered_model_name="ElasticNetModel",
-                    )
-                else:
-                    mlflow.sklearn.log_model(en_model, "model")
-                logger.info("MLFlow logging completed")
+            if self.tracker is None:
+                self.tracker = AsyncMlflowLogger(
+                    MLFLOW_TRACKING_URI,
+                    self.tracking_configs.fallback_uri,
+                    experiment_name=self.tracking_configs.experiment_name,
+                    max_retries=self.tracking_configs.max_retries,
+                    retry_backoff_s=self.tracking_configs.retry_backoff_s,
+                    close_timeout_s=self.tracking_configs.close_timeout_s,
+                    http_max_retries=self.tracking_configs.http_max_retries,
+                    http_timeout_s=self.tracking_configs.http_timeout_s,
+                )
+
+            run = self.tracker.start_run()
+            self.tracker.log_params(run, hyperparameters)
+            self.tracker.log_metrics(run, test_eval_metrics)
+            self.tracker.log_model(
+                run,
+                en_model,
+                "model",
+                registered_model_name=self.tracking_configs.registered_model_name,
+            )
+            self.tracker.end_run(run)
+            logger.info("MLFlow logging queued")
         except Exception as e:
             logger.info(CustomException(e))
             raise CustomException(e) from e
@@ -215,6 +341,7 @@ class ModelEvaluation:
         y_train_preds = eval_details.get("y_train_preds")
         y_test_preds = eval_details.get("y_test_preds")
         model_info = eval_details.get("model_info")
+        metrics_ci = eval_details.get("metrics_ci")
         model_name = "ElasticNet"
 
         # Create directory to save predictions & model score
@@ -233,11 +360,11 @@ class ModelEvaluation:
         y_test_preds_filepath = normpath(join(self.preds_dir, y_test_preds_filename))
 
         # save the training predictions
-        np.save(y_train_preds_filepath, y_train_preds)
+        save_as_npy(y_train_preds_filepath, y_train_preds)
         logger.info("training predictions saved at: %s", y_train_preds_filepath)
 
         # save the training predictions
-        np.save(y_test_preds_filepath, y_test_preds)
+        save_as_npy(y_test_preds_filepath, y_test_preds)
         logger.info("test predictions saved at: %s", y_test_preds_filepath)
 
         # Create filename and filepath to log scores
@@ -251,7 +378,25 @@ class ModelEvaluation:
             train_eval_metrics,
             test_eval_metrics,
             model_name,
-            **model_info
+            **model_info,
+            **({"metrics_ci": metrics_ci} if metrics_ci else {})
         )
 
         logger.info("Scores recorded in: %s", scores_filepath)
+
+        # Append the evaluation to the score registry for cross-run comparison
+        ScoreRegistry(self.registry_path).record_run(
+            model_name,
+            hyperparameters.to_dict(),
+            {"train": train_eval_metrics, "test": test_eval_metrics},
+            record={
+                "model_name": model_name,
+                "hyperparameters": hyperparameters.to_dict(),
+                "train_metrics": train_eval_metrics,
+                "test_metrics": test_eval_metrics,
+                "model_info": model_info,
+                "metrics_ci": metrics_ci,
+            },
+            duration_s=eval_details.get("eval_duration_s"),
+            fingerprints={"eval": self.get_fingerprint(), **self.input_fingerprints},
+        )
@@ -0,0 +1,158 @@
+"""
+This module contains the ModelExport class which exports the fitted preprocessor
+and linear model to a plain NumPy `.npz` file plus JSON metadata, the format read
+by the NumPy-only runtime in `src/utils/lite_inference.py`.
+"""
+
+import json
+from datetime import datetime
+from os.path import normpath
+
+import numpy as np
+import sklearn
+
+from src.constants import CONFIGS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import (
+    atomic_path,
+    file_fingerprint,
+    load_joblib,
+    read_yaml,
+    save_as_json,
+)
+from src.utils.lite_inference import FORMAT_VERSION
+
+
+class ModelExport:
+    """
+    A class used to export the trained model for the NumPy-only runtime.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for the model export.
+    features : list
+        The feature names, in model input order.
+    preprocessor_path : str
+        The path of the fitted preprocessor.
+    model_path : str
+        The path of the trained model.
+    export_path : str
+        The path of the exported `.npz` arrays.
+    metadata_path : str
+        The path of the exported `.json` metadata.
+
+    Methods
+    -------
+    extract_preprocessing(preprocessor):
+        Extracts the imputation and standardization arrays of the preprocessor.
+    export_model():
+        Writes the exported arrays and metadata.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the ModelExport object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).model_export
+        self.features = list(read_yaml(SCHEMA).raw_data_schema.features.keys())
+
+        # Input file paths
+        self.preprocessor_path = normpath(self.configs.preprocessor_path)
+        self.model_path = normpath(self.configs.model_path)
+
+        # Output file paths
+        self.export_path = normpath(self.configs.export_path)
+        self.metadata_path = normpath(self.configs.metadata_path)
+
+    def extract_preprocessing(self, preprocessor) -> dict:
+        """
+        Extracts the imputation values, means and scales of the numeric pipeline,
+        in model input order.
+
+        Args:
+            preprocessor (ColumnTransformer): The fitted preprocessor.
+
+        Raises:
+            ValueError: If the preprocessor transforms categorical features or
+            does not use every feature, which the runtime does not support.
+
+        Returns:
+            dict: The `features`, `impute_values`, `mean` and `scale` arrays.
+        """
+        features = None
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or not len(columns):
+                continue
+            if name != "num_pipeline":
+                raise ValueError(f"Unsupported transformer {name} on {columns}")
+            features = list(columns)
+            imputer = transformer.named_steps["imputer"]
+            scaler = transformer.named_steps["scalar"]
+
+        if features is None or sorted(features) != sorted(self.features):
+            raise ValueError(f"The preprocessor does not use the features {features}")
+
+        n_features = len(features)
+        return {
+            "features": features,
+            "impute_values": np.asarray(imputer.statistics_, dtype=np.float64),
+            "mean": (
+                np.zeros(n_features) if scaler.mean_ is None else scaler.mean_
+            ),
+            "scale": (
+                np.ones(n_features) if scaler.scale_ is None else scaler.scale_
+            ),
+        }
+
+    def export_model(self) -> dict:
+        """
+        Exports the preprocessor and model arrays to the `.npz` file and the
+        feature names, versions and fingerprints to the `.json` metadata.
+
+        Raises:
+            CustomException: If the model is not linear or cannot be exported.
+
+        Returns:
+            dict: The export metadata.
+        """
+        try:
+            preprocessor = load_joblib(self.preprocessor_path)
+            model = load_joblib(self.model_path)
+            if not hasattr(model, "coef_"):
+                raise TypeError(f"{type(model).__name__} has no coefficients")
+
+            preprocessing = self.extract_preprocessing(preprocessor)
+            arrays = {
+                "impute_values": preprocessing["impute_values"],
+                "mean": np.asarray(preprocessing["mean"], dtype=np.float64),
+                "scale": np.asarray(preprocessing["scale"], dtype=np.float64),
+                "coef": np.ravel(model.coef_).astype(np.float64),
+                "intercept": np.asarray(np.ravel(model.intercept_)[0], np.float64),
+            }
+            with atomic_path(self.export_path) as temp_path:
+                np.savez(temp_path, **arrays)
+
+            metadata = {
+                "format_version": FORMAT_VERSION,
+                "model_type": type(model).__name__,
+                "features": preprocessing["features"],
+                "model_version": file_fingerprint(self.model_path)[:12],
+                "preprocessor_version": file_fingerprint(self.preprocessor_path)[:12],
+                "export_sha256": file_fingerprint(self.export_path),
+                "sklearn_version": sklearn.__version__,
+                "numpy_version": np.__version__,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            save_as_json(self.metadata_path, metadata)
+            logger.info(
+                "Model exported at: %s\n%s",
+                self.export_path,
+                json.dumps(metadata, indent=4),
+            )
+            return metadata
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
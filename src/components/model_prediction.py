@@ -5,14 +5,27 @@ wip
 - preprocess it with preprocessor
 - predict with the model
 - output score
+- explain the score as per-feature contributions
 """
 
+import os
+import threading
+import time
 from os.path import normpath
 
+import numpy as np
 import pandas as pd
 
 from src.constants import CONFIGS
-from src.utils.basic_utils import load_joblib, read_yaml
+from src.exception import CustomException
+from src.logger import get_logger
+from src.utils.basic_utils import file_fingerprint, file_lock, load_joblib, read_yaml
+from src.utils.model_registry import ModelBundle, RegistryWatcher
+from src.utils.prediction_events import PredictionEventLog
+from src.utils.profiling import profiled
+from src.utils.shadow_scoring import ShadowScorer
+
+logger = get_logger("prediction")
 
 
 class ModelPrediction:
@@ -26,6 +39,93 @@ class ModelPrediction:
         self.preprocessor_path = normpath(self.configs.preprocessor_path)
         self.model_path = normpath(self.configs.model_path)
 
+        # Lock taken while a pipeline run publishes a new model
+        self.publish_lock_path = normpath(read_yaml(CONFIGS).workspace.lock_path)
+
+        # Serve the configured files, or the bundle of a registry stage
+        self.source = self.configs.source
+        self.registry_stage = self.configs.registry_stage
+        self.watcher = None
+
+        # Preprocessor and model files, loaded on first use and reloaded when
+        # their modification times or sizes change
+        self.bundle = None
+        self.bundle_stamps = None
+        self.bundle_lock = threading.Lock()
+
+        # Sampled prediction event log, shared by all instances
+        event_configs = read_yaml(CONFIGS).prediction_events
+        self.event_log = (
+            PredictionEventLog.from_configs(event_configs)
+            if event_configs.enabled
+            else None
+        )
+
+        # Candidate scored in the background on the served requests, if enabled
+        shadow_configs = read_yaml(CONFIGS).shadow_scoring
+        self.shadow = None
+        if shadow_configs.enabled:
+            try:
+                self.shadow = ShadowScorer.from_configs(shadow_configs, self.event_log)
+            except FileNotFoundError as e:
+                logger.warning("Shadow scoring disabled: %s", e)
+
+    def load_artifacts(self) -> ModelBundle:
+        """
+        Returns the preprocessor and model to serve a request with. From the
+        registry, this is the bundle of the configured stage, which is swapped
+        when a new version is promoted. From files, both are loaded under a
+        shared lock so that both come from the same published run, and are
+        reloaded when a run publishes different files, which is detected by
+        their modification times and sizes. Callers read the bundle once per
+        request.
+
+        Returns:
+            ModelBundle: The preprocessor, the model and their version.
+        """
+        if self.source == "registry":
+            if self.watcher is None:
+                self.watcher = RegistryWatcher.from_configs(self.registry_stage)
+            return self.watcher.bundle
+        if self.bundle is not None and self.file_stamps() == self.bundle_stamps:
+            return self.bundle
+
+        with self.bundle_lock:
+            with file_lock(self.publish_lock_path, shared=True):
+                stamps = self.file_stamps()
+                if self.bundle is not None and stamps == self.bundle_stamps:
+                    return self.bundle
+
+                manifest = {
+                    "preprocessor": file_fingerprint(self.preprocessor_path),
+                    "model": file_fingerprint(self.model_path),
+                }
+                # Files rewritten with the same contents keep the loaded bundle
+                if self.bundle is None or manifest != self.bundle.manifest:
+                    self.bundle = ModelBundle(
+                        manifest["model"][:12],
+                        load_joblib(self.preprocessor_path),
+                        load_joblib(self.model_path),
+                        manifest,
+                    )
+                    logger.info("Loaded model version %s", self.bundle.version)
+                self.bundle_stamps = stamps
+        return self.bundle
+
+    def file_stamps(self) -> tuple:
+        """
+        Returns the modification times and sizes of the preprocessor and model
+        files, which change whenever a run publishes them.
+
+        Returns:
+            tuple: One (mtime_ns, size) pair per file.
+        """
+        return tuple(
+            (stat.st_mtime_ns, stat.st_size)
+            for stat in map(os.stat, (self.preprocessor_path, self.model_path))
+        )
+
+    @profiled("model_prediction", write_on_exit=True)
     def predict(self, data: pd.DataFrame) -> float:
         """_summary_
 
@@ -35,9 +135,67 @@ class ModelPrediction:
         Returns:
             float: _description_
         """
-        preprocessor = load_joblib(self.preprocessor_path)
-        en_model = load_joblib(self.model_path)
+        start = time.perf_counter()
+        bundle = self.load_artifacts()
+
+        try:
+            normalized_data_array = bundle.preprocessor.transform(data)
+            predicted_value = bundle.model.predict(normalized_data_array)
+        except Exception as e:
+            if self.event_log is not None:
+                self.event_log.record(
+                    data, None, time.perf_counter() - start, bundle.version, str(e)
+                )
+            raise
 
-        normalized_data_array = preprocessor.transform(data)
-        predicted_value = en_model.predict(normalized_data_array)
+        if self.event_log is not None:
+            self.event_log.record(
+                data, predicted_value, time.perf_counter() - start, bundle.version
+            )
+        if self.shadow is not None:
+            self.shadow.submit(data, normalized_data_array, predicted_value, bundle)
         return predicted_value
+
+    def explain(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Explains the predictions of a batch of rows. For the linear model the
+        contribution of a feature is its coefficient times its standardized
+        value, so the contributions of a row plus the base value (the intercept)
+        add up exactly to its prediction. All rows are explained with one
+        transform and one element-wise product.
+
+        Args:
+            data (pd.DataFrame): The input features, one row per wine.
+
+        Raises:
+            CustomException: If the model is not linear or the data cannot be
+            transformed.
+
+        Returns:
+            pd.DataFrame: One contribution column per feature, followed by the
+            `base_value` and `prediction` columns, with the index of `data`.
+        """
+        try:
+            bundle = self.load_artifacts()
+            preprocessor, en_model = bundle.preprocessor, bundle.model
+            if not hasattr(en_model, "coef_"):
+                raise TypeError(f"{type(en_model).__name__} has no coefficients")
+
+            normalized_data_array = preprocessor.transform(data)
+            contributions = normalized_data_array * np.ravel(en_model.coef_)
+            base_value = float(np.ravel(en_model.intercept_)[0])
+
+            # Drop the transformer prefix, e.g. "num_pipeline__alcohol"
+            feature_names = [
+                name.split("__", 1)[-1]
+                for name in preprocessor.get_feature_names_out()
+            ]
+            explanation = pd.DataFrame(
+                contributions, columns=feature_names, index=data.index
+            )
+            explanation["base_value"] = base_value
+            explanation["prediction"] = contributions.sum(axis=1) + base_value
+            return explanation
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
@@ -0,0 +1,278 @@
+"""
+This module contains the ModelSweep class which runs a hyperparameter sweep
+(hyperparameters x seeds x feature subsets) through the SQLite-backed job queue.
+Each task holds a trainer configuration and references to the training and test
+arrays, so any number of workers sharing the filesystem can execute the sweep.
+"""
+
+import itertools
+import os
+import socket
+import threading
+import time
+from multiprocessing import Process
+from os.path import normpath
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_zoo_trainer import build_estimator
+from src.constants import CONFIGS, PARAMS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import atomic_path, read_yaml
+from src.utils.job_queue import JobQueue
+from src.utils.model_utils import regression_metrics
+
+
+def execute_task(payload: dict, array_cache: dict) -> dict:
+    """
+    Trains and evaluates one sweep configuration.
+
+    Args:
+        payload (dict): The task payload with the estimator, hyperparameters,
+        seed, feature subset and array paths.
+        array_cache (dict): Arrays already opened by this worker, keyed by path.
+
+    Returns:
+        dict: The train and test metrics and the fit time.
+    """
+    for path in (payload["train_array_path"], payload["test_array_path"]):
+        if path not in array_cache:
+            array_cache[path] = np.load(normpath(path), mmap_mode="r")
+    train_array = array_cache[payload["train_array_path"]]
+    test_array = array_cache[payload["test_array_path"]]
+
+    columns = payload["feature_indices"]
+    x_train, y_train = train_array[:, columns], train_array[:, -1]
+    x_test, y_test = test_array[:, columns], test_array[:, -1]
+
+    model = build_estimator(
+        payload["estimator"], payload["hyperparameters"], payload["random_seed"]
+    )
+    fit_start = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_time = time.perf_counter() - fit_start
+
+    return {
+        "train_metrics": regression_metrics(
+            y_train, model.predict(x_train), x_train.shape
+        ),
+        "test_metrics": regression_metrics(y_test, model.predict(x_test), x_test.shape),
+        "fit_time_s": fit_time,
+    }
+
+
+class ModelSweep:
+    """
+    A class used to enqueue, execute and collect a model sweep.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for the sweep.
+    params : dict
+        A dictionary containing the sweep grid.
+    queue : JobQueue
+        The job queue holding the sweep tasks.
+    results_path : str
+        The path where the collected results table will be saved.
+
+    Methods
+    -------
+    enqueue_tasks():
+        Expands the sweep grid into tasks and adds them to the queue.
+    run_worker():
+        Claims and executes tasks until the queue is drained.
+    run_workers(worker_count):
+        Runs several local worker processes.
+    collect_results():
+        Gathers every result into one table.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the ModelSweep object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).model_sweep
+        self.params = read_yaml(PARAMS).sweep
+        self.features = list(read_yaml(SCHEMA).raw_data_schema.features.keys())
+
+        # Queue parameters
+        self.max_attempts = self.configs.max_attempts
+        self.poll_interval = self.configs.poll_interval_s
+        self.queue = JobQueue(
+            self.configs.queue_path,
+            lease_s=self.configs.lease_s,
+            retry_backoff_s=self.configs.retry_backoff_s,
+        )
+
+        # Data references
+        self.train_array_path = self.configs.train_array_path
+        self.test_array_path = self.configs.test_array_path
+
+        # Output file path
+        self.results_path = normpath(self.configs.results_path)
+
+    def build_tasks(self) -> list[dict]:
+        """
+        Expands the grid of hyperparameters, seeds and feature subsets.
+
+        Returns:
+            list[dict]: One task payload per combination.
+        """
+        grid = self.params.hyperparameters
+        names = list(grid.keys())
+
+        tasks = []
+        for values, seed, (subset_name, subset) in itertools.product(
+            itertools.product(*(grid[name] for name in names)),
+            self.params.random_seeds,
+            self.params.feature_subsets.items(),
+        ):
+            subset = list(subset or self.features)
+            tasks.append(
+                {
+                    "estimator": self.params.estimator,
+                    "hyperparameters": dict(zip(names, values)),
+                    "random_seed": seed,
+                    "feature_subset": subset_name,
+                    "feature_indices": [self.features.index(f) for f in subset],
+                    "train_array_path": self.train_array_path,
+                    "test_array_path": self.test_array_path,
+                }
+            )
+        return tasks
+
+    def enqueue_tasks(self) -> int:
+        """
+        Adds the sweep tasks to the queue. Re-running it does not duplicate tasks.
+
+        Returns:
+            int: The number of tasks added.
+        """
+        try:
+            tasks = self.build_tasks()
+            logger.info("The sweep expands into %s tasks", len(tasks))
+            return self.queue.enqueue(tasks, max_attempts=self.max_attempts)
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def keep_lease_alive(self, task_id: int, worker_id: str, stop: threading.Event):
+        """
+        Renews the lease of a running task until the task finishes.
+
+        Args:
+            task_id (int): The id of the running task.
+            worker_id (str): The identifier of the worker holding the lease.
+            stop (threading.Event): Set when the task has finished.
+        """
+        while not stop.wait(self.queue.lease_s / 3):
+            if not self.queue.heartbeat(task_id, worker_id):
+                logger.warning(
+                    "Worker %s lost the lease on task %s", worker_id, task_id
+                )
+                return
+
+    def run_worker(self, max_tasks: int = None) -> int:
+        """
+        Claims and executes tasks until no task is pending or running, or until
+        `max_tasks` tasks have been processed.
+
+        Args:
+            max_tasks (int, optional): The maximum number of tasks to process.
+            Defaults to None, meaning no limit.
+
+        Returns:
+            int: The number of tasks processed by this worker.
+        """
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        array_cache = {}
+        processed = 0
+        logger.info("Sweep worker %s started", worker_id)
+
+        while max_tasks is None or processed < max_tasks:
+            task = self.queue.claim(worker_id)
+            if task is None:
+                counts = self.queue.status_counts()
+                if not counts.get("pending") and not counts.get("running"):
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=self.keep_lease_alive,
+                args=(task["task_id"], worker_id, stop),
+                daemon=True,
+            )
+            heartbeat.start()
+            start = time.perf_counter()
+            try:
+                result = execute_task(task["payload"], array_cache)
+                self.queue.complete(
+                    task["task_id"], worker_id, result, time.perf_counter() - start
+                )
+            except Exception as e:
+                logger.error(CustomException(e))
+                self.queue.fail(task["task_id"], worker_id, str(e))
+            finally:
+                stop.set()
+                heartbeat.join()
+            processed += 1
+
+        logger.info("Sweep worker %s processed %s tasks", worker_id, processed)
+        return processed
+
+    def run_workers(self, worker_count: int) -> None:
+        """
+        Runs several worker processes on this machine and waits for them.
+
+        Args:
+            worker_count (int): The number of worker processes.
+        """
+        workers = [Process(target=self.run_worker) for _ in range(worker_count)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def collect_results(self) -> pd.DataFrame:
+        """
+        Gathers every finished task into one results table, one row per task
+        with its configuration and flattened train and test metrics, and saves
+        it as CSV.
+
+        Returns:
+            pd.DataFrame: The results table.
+        """
+        try:
+            rows = []
+            for record in self.queue.results():
+                payload, result = record["payload"], record["result"]
+                row = {
+                    "task_id": record["task_id"],
+                    "worker_id": record["worker_id"],
+                    "estimator": payload["estimator"],
+                    "random_seed": payload["random_seed"],
+                    "feature_subset": payload["feature_subset"],
+                    **payload["hyperparameters"],
+                    "fit_time_s": result["fit_time_s"],
+                    "duration_s": record["duration_s"],
+                }
+                for split in ("train", "test"):
+                    for metric, value in result[f"{split}_metrics"].items():
+                        row[f"{split}_{metric}"] = value
+                rows.append(row)
+
+            results_df = pd.DataFrame(rows)
+            with atomic_path(self.results_path) as temp_path:
+                results_df.to_csv(temp_path, index=False, encoding="utf-8")
+            logger.info("Sweep results saved at: %s", self.results_path)
+            logger.info("Task status counts: %s", self.queue.status_counts())
+            return results_df
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
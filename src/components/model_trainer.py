@@ -13,7 +13,13 @@ from sklearn.linear_model import ElasticNet
 from src.constants import CONFIGS, PARAMS
 from src.exception import CustomException
 from src.logger import logger
-from src.utils.basic_utils import create_directories, read_yaml, save_as_joblib
+from src.utils.artifact_store import ArtifactStore
+from src.utils.basic_utils import (
+    create_directories,
+    file_lock,
+    read_yaml,
+    save_as_joblib,
+)
 
 
 class ModelTrainer:
@@ -26,6 +32,8 @@ class ModelTrainer:
     ----------
     configs : dict
         A dictionary containing the configurations for the model trainer.
+    artifact_configs : dict
+        A dictionary containing the configurations for the artifact store.
     params : dict
         A dictionary containing the parameters for the ElasticNet model.
     random_seed : int
@@ -36,6 +44,8 @@ class ModelTrainer:
         The path to the training dataset.
     model_path : str
         The path where the trained model will be saved.
+    publish_lock_path : str
+        The lock file guarding the served model files.
 
     Methods
     -------
@@ -49,6 +59,7 @@ class ModelTrainer:
         """
         # Read the configuration files
         self.configs = read_yaml(CONFIGS).model_trainer
+        self.artifact_configs = read_yaml(CONFIGS).artifact_store
         self.params = read_yaml(PARAMS).elasticnet
 
         # Model Parameters
@@ -61,6 +72,11 @@ class ModelTrainer:
         # Output file path
         self.model_path = normpath(self.configs.model_path)
 
+        # Lock taken while the served model files are replaced
+        workspace_configs = read_yaml(CONFIGS).workspace
+        self.publish_lock_path = normpath(workspace_configs.lock_path)
+        self.lock_timeout_s = workspace_configs.lock_timeout_s
+
     def train_model(self) -> ElasticNet:
         """
         Trains the ElasticNet model on the training dataset and saves the trained model.
@@ -100,8 +116,14 @@ class ModelTrainer:
             # Create directory if not exist
             create_directories([dirname(self.model_path)])
 
-            # Saving the preprocessor object
-            save_as_joblib(self.model_path, en_model)
+            # Saving the model, excluding readers of the served model
+            with file_lock(self.publish_lock_path, timeout_s=self.lock_timeout_s):
+                save_as_joblib(self.model_path, en_model)
+
+            # Keep a content-addressed copy of every trained version
+            if self.artifact_configs.enabled:
+                store = ArtifactStore.from_configs(self.artifact_configs)
+                store.put_object("elasticnet_model", en_model)
 
             return en_model
         except Exception as e:
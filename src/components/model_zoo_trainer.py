@@ -0,0 +1,346 @@
+"""
+This module contains the ModelZooTrainer class which trains several candidate
+regressors concurrently under a per-model and a global wall-clock budget.
+Candidates are trained on growing fractions of the training set (successive
+halving) so that clearly losing candidates are dropped early, and the winner is
+picked on a configurable trade-off between accuracy and predict latency.
+
+In each rung, a candidate may use what is left of its per-model budget after
+the earlier rungs, within the global budget, and is timed out at that deadline.
+Each rung runs in its own process pool, which is terminated at the end of the
+rung, so a timed out candidate is killed rather than left running in the
+background: the budgets bound the wall-clock time of the whole search.
+
+The winner is saved to `model_zoo.model_path` with the leaderboard, for
+comparison. It is not read by the evaluation or prediction stages, which expect
+the linear model at `model_trainer.model_path`, so evaluation is skipped in this
+training mode; to serve the winner, point `model_registry.model_path` at it and
+register it as a new version.
+"""
+
+import time
+from math import ceil
+from multiprocessing import Pool
+from os.path import dirname, normpath
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import ElasticNet, Lasso, Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+
+from src.constants import CONFIGS, PARAMS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import (
+    create_directories,
+    read_yaml,
+    save_as_joblib,
+    save_as_json,
+)
+
+ESTIMATORS = {
+    "ridge": Ridge,
+    "lasso": Lasso,
+    "elasticnet": ElasticNet,
+    "hist_gradient_boosting": HistGradientBoostingRegressor,
+    "random_forest": RandomForestRegressor,
+}
+
+
+def build_estimator(name: str, params: dict, random_seed: int):
+    """
+    Builds an unfitted estimator from its short name and hyperparameters.
+
+    Args:
+        name (str): The short name of the estimator, one of the ESTIMATORS keys.
+        params (dict): The hyperparameters passed to the estimator.
+        random_seed (int): The seed used when the estimator accepts one.
+
+    Returns:
+        The unfitted scikit-learn estimator.
+    """
+    estimator = ESTIMATORS[name](**params)
+    if "random_state" in estimator.get_params():
+        estimator.set_params(random_state=random_seed)
+    return estimator
+
+
+def fit_candidate(
+    name: str,
+    params: dict,
+    random_seed: int,
+    train_set: tuple[np.array],
+    validation_set: tuple[np.array],
+) -> dict:
+    """
+    Fits one candidate and measures its validation accuracy, fit time and
+    predict latency. Defined at module level so that it can run in a worker process.
+
+    Args:
+        name (str): The short name of the estimator.
+        params (dict): The hyperparameters passed to the estimator.
+        random_seed (int): The seed used when the estimator accepts one.
+        train_set (tuple[np.array]): The (features, target) used for fitting.
+        validation_set (tuple[np.array]): The (features, target) used for scoring.
+
+    Returns:
+        dict: The fitted model alongside its timing and accuracy details.
+    """
+    x_train, y_train = train_set
+    x_val, y_val = validation_set
+
+    model = build_estimator(name, params, random_seed)
+
+    fit_start = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_time = time.perf_counter() - fit_start
+
+    predict_start = time.perf_counter()
+    y_val_preds = model.predict(x_val)
+    predict_time = time.perf_counter() - predict_start
+
+    return {
+        "model": model,
+        "train_rows": len(x_train),
+        "fit_time_s": fit_time,
+        "predict_latency_us": predict_time / len(x_val) * 1e6,
+        "val_rmse": float(np.sqrt(mean_squared_error(y_val, y_val_preds))),
+        "val_r2": float(r2_score(y_val, y_val_preds)),
+    }
+
+
+class ModelZooTrainer:
+    """
+    A class used to train a zoo of candidate regressors and select the best one.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for the model zoo.
+    params : dict
+        A dictionary containing the candidates and their hyperparameters.
+    random_seed : int
+        The seed for the random number generator.
+    candidates : dict
+        The short estimator names mapped to their hyperparameters.
+    train_array_path : str
+        The path to the training dataset.
+    model_path : str
+        The path where the winning model will be saved.
+    leaderboard_path : str
+        The path where the leaderboard will be saved.
+
+    Methods
+    -------
+    train_models():
+        Trains all candidates within budget, saves the leaderboard and the winner.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the ModelZooTrainer object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).model_zoo
+        self.params = read_yaml(PARAMS).model_zoo
+
+        # Model Parameters
+        self.random_seed = self.params.random_seed
+        self.candidates = self.params.candidates
+
+        # Budget and selection parameters
+        self.validation_size = self.configs.validation_size_pct
+        self.max_workers = self.configs.max_workers
+        self.per_model_budget = self.configs.per_model_budget_s
+        self.global_budget = self.configs.global_budget_s
+        self.rung_fractions = sorted(self.configs.rung_fractions)
+        self.early_stop_margin = self.configs.early_stop_margin_pct
+        self.latency_weight = self.configs.latency_weight
+
+        # Input file path
+        self.train_array_path = normpath(self.configs.train_array_path)
+
+        # Output file path
+        self.model_path = normpath(self.configs.model_path)
+        self.leaderboard_path = normpath(self.configs.leaderboard_path)
+
+    def split_train_validation(self) -> tuple[np.array]:
+        """
+        Loads the training array and splits it into a shuffled fitting part and
+        a validation part.
+
+        Returns:
+            tuple[np.array]: x_fit, y_fit, x_val and y_val arrays.
+        """
+        train_array = np.load(self.train_array_path)
+
+        rng = np.random.default_rng(self.random_seed)
+        shuffled = train_array[rng.permutation(len(train_array))]
+
+        val_rows = max(1, round(len(shuffled) * self.validation_size))
+        fit_part, val_part = shuffled[val_rows:], shuffled[:val_rows]
+
+        logger.info("The shape of the fitting part: %s", fit_part.shape)
+        logger.info("The shape of the validation part: %s", val_part.shape)
+        return (fit_part[:, :-1], fit_part[:, -1], val_part[:, :-1], val_part[:, -1])
+
+    def select_winner(self, leaderboard: list[dict]) -> list[dict]:
+        """
+        Scores every finished candidate on the accuracy/latency trade-off and
+        sorts the leaderboard so that the winner comes first.
+
+        The score is a weighted sum of the validation RMSE and the predict latency,
+        each relative to the best value among the candidates; lower is better.
+
+        Args:
+            leaderboard (list[dict]): The candidate results.
+
+        Returns:
+            list[dict]: The leaderboard sorted by score.
+        """
+        scored = [entry for entry in leaderboard if entry.get("val_rmse") is not None]
+        if not scored:
+            return leaderboard
+
+        # Only candidates that reached the largest completed rung compete
+        top_rung = max(entry["train_rows"] for entry in scored)
+        finalists = [entry for entry in scored if entry["train_rows"] == top_rung]
+
+        best_rmse = max(min(entry["val_rmse"] for entry in finalists), 1e-12)
+        best_latency = max(
+            min(entry["predict_latency_us"] for entry in finalists), 1e-12
+        )
+        for entry in finalists:
+            entry["selection_score"] = round(
+                (1 - self.latency_weight) * entry["val_rmse"] / best_rmse
+                + self.latency_weight * entry["predict_latency_us"] / best_latency,
+                4,
+            )
+
+        return sorted(
+            leaderboard,
+            key=lambda entry: entry.get("selection_score", float("inf")),
+        )
+
+    def train_models(self) -> list[dict]:
+        """
+        Trains the candidates concurrently on growing fractions of the training
+        set. After each rung, candidates whose validation RMSE is worse than the
+        leader by more than the configured margin are dropped. A candidate still
+        running when the rest of its per-model budget or the global budget runs
+        out stops at its last completed rung, and its worker process is
+        terminated.
+
+        Raises:
+            CustomException: If there is an error during training or selection.
+
+        Returns:
+            list[dict]: The leaderboard sorted by selection score.
+        """
+        try:
+            x_fit, y_fit, x_val, y_val = self.split_train_validation()
+
+            logger.info("The candidates are:\n%s", list(self.candidates.keys()))
+
+            results = {name: {"model_name": name} for name in self.candidates}
+            spent = dict.fromkeys(self.candidates, 0.0)
+            survivors = list(self.candidates.keys())
+            models = {}
+            deadline = time.monotonic() + self.global_budget
+
+            for fraction in self.rung_fractions:
+                remaining = deadline - time.monotonic()
+                if not survivors or remaining <= 0:
+                    break
+
+                rung_rows = max(1, ceil(len(x_fit) * fraction))
+                logger.info(
+                    "Training %s candidates on %s rows", len(survivors), rung_rows
+                )
+                # Each candidate may use what is left of its own budget
+                rung_start = time.monotonic()
+                deadlines = {
+                    name: rung_start
+                    + min(remaining, self.per_model_budget - spent[name])
+                    for name in survivors
+                }
+
+                # Leaving the pool terminates the workers of unfinished candidates
+                with Pool(min(self.max_workers, len(survivors))) as pool:
+                    pending = {
+                        name: pool.apply_async(
+                            fit_candidate,
+                            (
+                                name,
+                                dict(self.candidates[name] or {}),
+                                self.random_seed,
+                                (x_fit[:rung_rows], y_fit[:rung_rows]),
+                                (x_val, y_val),
+                            ),
+                        )
+                        for name in survivors
+                    }
+                    # Check each candidate at its deadline, earliest first
+                    outcomes = {}
+                    for name in sorted(pending, key=deadlines.get):
+                        async_result = pending[name]
+                        async_result.wait(max(0.0, deadlines[name] - time.monotonic()))
+                        if async_result.ready():
+                            outcomes[name] = async_result.get()
+
+                for name in pending:
+                    if name not in outcomes:
+                        results[name]["status"] = "timed_out"
+                        survivors.remove(name)
+                        logger.warning("Candidate %s ran out of time", name)
+
+                for name, outcome in outcomes.items():
+                    models[name] = outcome.pop("model")
+                    spent[name] += outcome["fit_time_s"]
+                    results[name].update(outcome, status="finished")
+
+                    if spent[name] > self.per_model_budget:
+                        results[name]["status"] = "budget_exhausted"
+                        survivors.remove(name)
+
+                # Stop early on candidates that are clearly losing
+                rung_results = [results[name] for name in outcomes]
+                if rung_results:
+                    leader_rmse = min(entry["val_rmse"] for entry in rung_results)
+                    cutoff = leader_rmse * (1 + self.early_stop_margin)
+                    for entry in rung_results:
+                        name = entry["model_name"]
+                        if entry["val_rmse"] > cutoff and name in survivors:
+                            entry["status"] = "pruned"
+                            survivors.remove(name)
+                            logger.info("Candidate %s pruned", name)
+
+            leaderboard = self.select_winner(list(results.values()))
+            winner = leaderboard[0]
+            if "selection_score" not in winner:
+                raise ValueError("No candidate finished within the time budget")
+
+            logger.info(
+                "The winning model is %s with validation RMSE %.4f",
+                winner["model_name"],
+                winner["val_rmse"],
+            )
+
+            # Create directory if not exist
+            create_directories([dirname(self.model_path)])
+
+            # Save the winning model and the leaderboard
+            save_as_joblib(self.model_path, models[winner["model_name"]])
+            save_as_json(
+                self.leaderboard_path,
+                {
+                    "winner": winner["model_name"],
+                    "latency_weight": self.latency_weight,
+                    "leaderboard": leaderboard,
+                },
+            )
+
+            return leaderboard
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
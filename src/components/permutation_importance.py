@@ -0,0 +1,308 @@
+"""
+This module contains the PermutationImportance class which measures how much each
+feature contributes to the trained model: the test metric is recomputed after
+shuffling one feature column, and the importance is the loss in score. Every
+(feature, repeat) permutation runs as a task on a process pool that memory-maps
+the test array, and all tasks reuse one baseline prediction, so the step scales to
+large evaluation sets and many repeats.
+"""
+
+import tempfile
+import time
+from multiprocessing import Pool
+from os.path import basename, join, normpath
+
+import joblib
+import numpy as np
+
+from src.constants import CONFIGS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import create_directories, read_yaml, save_as_json
+from src.utils.model_utils import RegressionMetricsAccumulator
+
+# Metrics where a lower value is better; the importance is then the increase
+LOWER_IS_BETTER = {"MAE", "MSE", "RMSE", "MAPE"}
+
+WORKER_STATE = {}
+
+
+def init_permutation_worker(
+    model_path: str, array_path: str, baseline_path: str, rows_path: str | None
+) -> None:
+    """
+    Loads the model and memory-maps the test array, the baseline prediction and
+    the evaluated rows once per worker process.
+
+    Args:
+        model_path (str): The path to the trained model.
+        array_path (str): The path to the test array of features followed by target.
+        baseline_path (str): The path to the baseline prediction of the rows.
+        rows_path (str | None): The path to the evaluated row numbers, or None
+        when every row is evaluated.
+    """
+    WORKER_STATE["model"] = joblib.load(normpath(model_path))
+    WORKER_STATE["array"] = np.load(normpath(array_path), mmap_mode="r")
+    WORKER_STATE["baseline"] = np.load(baseline_path, mmap_mode="r")
+    WORKER_STATE["rows"] = np.load(rows_path) if rows_path else None
+
+
+def read_rows(start: int, stop: int, columns=slice(None)) -> np.array:
+    """
+    Reads a block of the evaluated rows from the memory-mapped test array.
+
+    Args:
+        start (int): The first evaluated row of the block.
+        stop (int): The evaluated row after the last row of the block.
+        columns (optional): The columns to read. Defaults to every column.
+
+    Returns:
+        np.array: The block of rows.
+    """
+    array, rows = WORKER_STATE["array"], WORKER_STATE["rows"]
+    if rows is None:
+        return np.array(array[start:stop, columns])
+    return np.array(array[rows[start:stop]][:, columns])
+
+
+def permute_feature(
+    feature_idx: int, repeat: int, random_seed: int, chunk_size: int
+) -> tuple:
+    """
+    Scores the model with one feature column shuffled, chunk by chunk.
+
+    For a linear model the shuffled prediction is the baseline prediction plus
+    the coefficient times the change in the feature, so the model is not called
+    again. Other models predict each chunk with the shuffled column.
+
+    Args:
+        feature_idx (int): The column of the shuffled feature.
+        repeat (int): The repeat number, which selects the permutation.
+        random_seed (int): The base seed of the permutations.
+        chunk_size (int): The number of rows scored at a time.
+
+    Returns:
+        tuple: The feature index, the repeat and the unrounded metrics.
+    """
+    model, baseline = WORKER_STATE["model"], WORKER_STATE["baseline"]
+    row_count = len(baseline)
+    target_idx = WORKER_STATE["array"].shape[1] - 1
+
+    column = read_rows(0, row_count, feature_idx)
+    rng = np.random.default_rng([random_seed, feature_idx, repeat])
+    shuffled = column[rng.permutation(row_count)]
+    coef = getattr(model, "coef_", None)
+
+    accumulator = RegressionMetricsAccumulator()
+    for start in range(0, row_count, chunk_size):
+        stop = min(start + chunk_size, row_count)
+        if coef is not None:
+            y_true = read_rows(start, stop, target_idx)
+            delta = shuffled[start:stop] - column[start:stop]
+            y_pred = baseline[start:stop] + np.ravel(coef)[feature_idx] * delta
+        else:
+            chunk = read_rows(start, stop)
+            y_true, features = chunk[:, -1], chunk[:, :-1]
+            features[:, feature_idx] = shuffled[start:stop]
+            y_pred = model.predict(features)
+        accumulator.update(y_true, y_pred)
+
+    return feature_idx, repeat, accumulator.compute(target_idx, decimals=None)
+
+
+class PermutationImportance:
+    """
+    A class used to compute the permutation feature importance of the trained model
+    on the test set.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for permutation importance.
+    features : list
+        The feature names, in the column order of the arrays.
+    n_repeats : int
+        The number of permutations per feature.
+    max_rows : int
+        The maximum number of test rows evaluated; larger test sets are sampled.
+    time_budget_s : float
+        The time after which unfinished permutations are terminated.
+
+    Methods
+    -------
+    select_rows(row_count):
+        Picks the evaluated rows, sampling when the test set is large.
+    predict_baseline(model, array, rows):
+        Predicts the evaluated rows once.
+    compute_importance():
+        Runs every permutation and saves the importances.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the PermutationImportance object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).permutation_importance
+        self.features = list(read_yaml(SCHEMA).raw_data_schema.features.keys())
+
+        # Permutation parameters
+        self.metric = self.configs.metric
+        self.n_repeats = self.configs.n_repeats
+        self.chunk_size = self.configs.chunk_size
+        self.max_rows = self.configs.max_rows
+        self.max_workers = self.configs.max_workers
+        self.time_budget_s = self.configs.time_budget_s
+        self.random_seed = self.configs.random_seed
+
+        # Input file paths
+        self.model_path = normpath(self.configs.model_path)
+        self.test_array_path = normpath(self.configs.test_array_path)
+
+        # Output file path
+        self.scores_dir = normpath(self.configs.scores_dir)
+
+    def select_rows(self, row_count: int) -> np.array:
+        """
+        Picks the evaluated rows. Test sets larger than `max_rows` are sampled
+        without replacement; the sample is sorted so reads stay sequential.
+
+        Args:
+            row_count (int): The number of rows in the test set.
+
+        Returns:
+            np.array: The sorted row numbers, or None to evaluate every row.
+        """
+        if not self.max_rows or row_count <= self.max_rows:
+            return None
+        rng = np.random.default_rng(self.random_seed)
+        return np.sort(rng.choice(row_count, size=self.max_rows, replace=False))
+
+    def predict_baseline(self, model, array: np.array, rows: np.array) -> np.array:
+        """
+        Predicts the evaluated rows once, chunk by chunk.
+
+        Args:
+            model: The trained model.
+            array (np.array): The memory-mapped test array.
+            rows (np.array): The evaluated rows, or None for every row.
+
+        Returns:
+            np.array: The baseline prediction of the evaluated rows.
+        """
+        row_count = len(array) if rows is None else len(rows)
+        baseline = np.empty(row_count)
+        for start in range(0, row_count, self.chunk_size):
+            stop = min(start + self.chunk_size, row_count)
+            chunk = array[start:stop] if rows is None else array[rows[start:stop]]
+            baseline[start:stop] = model.predict(np.asarray(chunk)[:, :-1])
+        return baseline
+
+    def compute_importance(self) -> dict:
+        """
+        Computes the importance of every feature as the loss in the test metric
+        when the feature is shuffled, averaged over the repeats. The time budget
+        is a hard bound: permutations still running when it runs out are
+        terminated with their worker processes, and each feature reports how
+        many repeats finished.
+
+        Raises:
+            CustomException: If the importances cannot be computed or saved.
+
+        Returns:
+            dict: The baseline metrics and the importance of each feature.
+        """
+        try:
+            start_time = time.perf_counter()
+            model = joblib.load(self.model_path)
+            array = np.load(self.test_array_path, mmap_mode="r")
+            rows = self.select_rows(len(array))
+            n_features = array.shape[1] - 1
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # Predict the evaluated rows once and share them with the workers
+                baseline = self.predict_baseline(model, array, rows)
+                baseline_path = join(tmp_dir, "baseline.npy")
+                np.save(baseline_path, baseline)
+                rows_path = None
+                if rows is not None:
+                    rows_path = join(tmp_dir, "rows.npy")
+                    np.save(rows_path, rows)
+
+                y_true = array[:, -1] if rows is None else array[rows, -1]
+                baseline_metrics = (
+                    RegressionMetricsAccumulator()
+                    .update(y_true, baseline)
+                    .compute(n_features, decimals=None)
+                )
+
+                scores = {idx: [] for idx in range(n_features)}
+
+                # Leaving the pool terminates the workers of unfinished permutations
+                with Pool(
+                    self.max_workers,
+                    initializer=init_permutation_worker,
+                    initargs=(
+                        self.model_path,
+                        self.test_array_path,
+                        baseline_path,
+                        rows_path,
+                    ),
+                ) as pool:
+                    tasks = [
+                        pool.apply_async(
+                            permute_feature,
+                            (feature_idx, repeat, self.random_seed, self.chunk_size),
+                        )
+                        for repeat in range(self.n_repeats)
+                        for feature_idx in range(n_features)
+                    ]
+                    deadline = start_time + self.time_budget_s
+                    for task in tasks:
+                        task.wait(max(0.0, deadline - time.perf_counter()))
+                    finished = [task.get() for task in tasks if task.ready()]
+
+                for feature_idx, _, metrics in finished:
+                    scores[feature_idx].append(metrics[self.metric])
+                if len(finished) < len(tasks):
+                    logger.warning(
+                        "Time budget reached, %s permutations terminated",
+                        len(tasks) - len(finished),
+                    )
+
+            sign = 1 if self.metric in LOWER_IS_BETTER else -1
+            baseline_score = baseline_metrics[self.metric]
+            importances = {}
+            for feature_idx, values in scores.items():
+                losses = sign * (np.array(values) - baseline_score)
+                importances[self.features[feature_idx]] = {
+                    "importance_mean": float(losses.mean()) if len(losses) else None,
+                    "importance_std": float(losses.std()) if len(losses) else None,
+                    "repeats_completed": len(losses),
+                }
+
+            results = {
+                "metric": self.metric,
+                "baseline_metrics": baseline_metrics,
+                "rows_evaluated": len(baseline),
+                "n_repeats": self.n_repeats,
+                "duration_s": time.perf_counter() - start_time,
+                "importances": dict(
+                    sorted(
+                        importances.items(),
+                        key=lambda item: -(item[1]["importance_mean"] or 0),
+                    )
+                ),
+            }
+
+            create_directories([self.scores_dir])
+            model_name = basename(self.model_path).split(".")[0]
+            save_path = join(
+                self.scores_dir, f"{model_name}_permutation_importance.json"
+            )
+            save_as_json(save_path, results)
+            logger.info("Permutation importance saved at: %s", save_path)
+            return results
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
@@ -0,0 +1,364 @@
+"""
+This module contains the PredictionService class which puts admission control
+and back-pressure in front of `ModelPrediction.predict`.
+
+Requests wait in a bounded queue and are served by a fixed number of worker
+threads, so a traffic spike costs at most `queue_size` pending requests instead
+of an unbounded pile of blocked callers. Each request carries a deadline:
+
+    - a request is rejected at once when the queue is full, or when the queue
+      ahead of it, at the current service time, would make it miss its deadline;
+    - a queued request whose deadline has passed when a worker picks it up is
+      dropped without being scored.
+
+Rejections are raised to the caller immediately, which can retry elsewhere or
+return an overload error, and the capacity goes to requests that can still be
+answered in time. Queue depth, rejections, drops and latencies are counted in
+`metrics()`.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_prediction import ModelPrediction
+from src.constants import CONFIGS
+from src.logger import get_logger
+from src.utils.basic_utils import read_yaml
+from src.utils.prediction_events import LATENCY_BUCKETS_MS
+
+logger = get_logger("prediction")
+
+# Weight of the latest request in the moving average of the service time
+SERVICE_TIME_SMOOTHING = 0.1
+
+
+class ServiceOverloaded(Exception):
+    """Raised when a request is rejected by admission control."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's deadline passed before it was served."""
+
+
+class ServiceMetrics:
+    """
+    Counters and latency histograms of the prediction service.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.accepted_count = 0
+        self.rejected_full_count = 0
+        self.rejected_deadline_count = 0
+        self.shed_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+        self.max_queue_depth = 0
+        self.queue_wait_histogram = [0] * len(LATENCY_BUCKETS_MS)
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record_served(self, queue_wait_s: float, latency_s: float, failed: bool):
+        """Adds one served request."""
+        with self.lock:
+            self.completed_count += not failed
+            self.failed_count += failed
+            for histogram, seconds in (
+                (self.queue_wait_histogram, queue_wait_s),
+                (self.latency_histogram, latency_s),
+            ):
+                histogram[int(np.searchsorted(LATENCY_BUCKETS_MS, 1000 * seconds))] += 1
+
+    def to_dict(self) -> dict:
+        """Returns the counters and histograms."""
+        with self.lock:
+            return {
+                "accepted_count": self.accepted_count,
+                "rejected_full_count": self.rejected_full_count,
+                "rejected_deadline_count": self.rejected_deadline_count,
+                "shed_count": self.shed_count,
+                "completed_count": self.completed_count,
+                "failed_count": self.failed_count,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_wait_histogram_ms": dict(
+                    zip(map(str, LATENCY_BUCKETS_MS), self.queue_wait_histogram)
+                ),
+                "latency_histogram_ms": dict(
+                    zip(map(str, LATENCY_BUCKETS_MS), self.latency_histogram)
+                ),
+            }
+
+
+class PredictionService:
+    """
+    A class used to serve predictions with bounded queueing and deadlines.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for the prediction service.
+    model_prediction : ModelPrediction
+        The model which scores the requests.
+    max_concurrency : int
+        The number of requests scored at the same time.
+    default_timeout_s : float
+        The time budget of a request submitted without one.
+    admission_control : bool
+        Whether requests which would miss their deadline are rejected on arrival.
+    shed_expired : bool
+        Whether queued requests past their deadline are dropped.
+    service_time_s : float
+        The moving average of the time to score a request.
+
+    Methods
+    -------
+    submit(data, timeout_s):
+        Queues a request and returns the future of its predictions.
+    predict(data, timeout_s):
+        Scores a request and waits for its predictions.
+    metrics():
+        Returns the counters, the queue depth and the latency histograms.
+    close():
+        Serves the queued requests and stops the workers.
+    """
+
+    def __init__(
+        self,
+        model_prediction: ModelPrediction = None,
+        max_concurrency: int = None,
+        queue_size: int = None,
+        default_timeout_s: float = None,
+        admission_control: bool = None,
+        shed_expired: bool = None,
+    ):
+        """
+        Constructs all the necessary attributes for the PredictionService object
+        and starts the workers. Every argument defaults to None, meaning the
+        configured value.
+
+        Args:
+            model_prediction (ModelPrediction, optional): The model.
+            max_concurrency (int, optional): The number of worker threads.
+            queue_size (int, optional): The most queued requests, 0 is unbounded.
+            default_timeout_s (float, optional): The default time budget.
+            admission_control (bool, optional): Reject requests on arrival
+            which would miss their deadline.
+            shed_expired (bool, optional): Drop queued requests past their
+            deadline.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).prediction_service
+
+        def configured(value, name):
+            return self.configs[name] if value is None else value
+
+        self.model_prediction = model_prediction or ModelPrediction()
+        self.max_concurrency = configured(max_concurrency, "max_concurrency")
+        self.default_timeout_s = configured(default_timeout_s, "default_timeout_s")
+        self.admission_control = configured(admission_control, "admission_control")
+        self.shed_expired = configured(shed_expired, "shed_expired")
+        self.service_time_s = None
+
+        self.queue = queue.Queue(maxsize=configured(queue_size, "queue_size"))
+        self.in_flight_count = 0
+        self.service_metrics = ServiceMetrics()
+
+        # Guards `closed`, so no request is queued behind the stop sentinels
+        self.state_lock = threading.Lock()
+        self.closed = False
+        self.workers = [
+            threading.Thread(
+                target=self.serve, name=f"PredictionWorker-{i}", daemon=True
+            )
+            for i in range(self.max_concurrency)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def expected_wait_s(self) -> float:
+        """
+        Estimates the time until a request submitted now is answered, from the
+        requests ahead of it and the moving average of the service time.
+
+        Returns:
+            float: The expected wait, or 0 before the first request is served.
+        """
+        if self.service_time_s is None:
+            return 0.0
+        # A request counts as unfinished from the time it is queued until it is
+        # answered, shed or skipped, so none is missed while moving from the
+        # queue to a worker
+        with self.queue.mutex:
+            ahead = self.queue.unfinished_tasks
+        return (ahead // self.max_concurrency + 1) * self.service_time_s
+
+    def submit(self, data: pd.DataFrame, timeout_s: float = None) -> Future:
+        """
+        Queues a request without blocking.
+
+        Args:
+            data (pd.DataFrame): The input features.
+            timeout_s (float, optional): The time budget of the request. Defaults
+            to None, meaning the configured default.
+
+        Raises:
+            ServiceOverloaded: If the queue is full, or the request would miss its
+            deadline at the current queue depth.
+            RuntimeError: If the service is closed.
+
+        Returns:
+            Future: The future predictions. It raises `DeadlineExceeded` if the
+            deadline passed while the request was queued.
+        """
+        submitted_at = time.monotonic()
+        timeout_s = self.default_timeout_s if timeout_s is None else timeout_s
+        deadline = submitted_at + timeout_s
+
+        metrics = self.service_metrics
+        if self.admission_control and self.expected_wait_s() > timeout_s:
+            with metrics.lock:
+                metrics.rejected_deadline_count += 1
+            raise ServiceOverloaded("The request would miss its deadline")
+
+        future = Future()
+        try:
+            with self.state_lock:
+                if self.closed:
+                    raise RuntimeError("The prediction service is closed")
+                self.queue.put_nowait((future, data, deadline, submitted_at))
+        except queue.Full as e:
+            with metrics.lock:
+                metrics.rejected_full_count += 1
+            raise ServiceOverloaded("The prediction queue is full") from e
+
+        with metrics.lock:
+            metrics.accepted_count += 1
+            metrics.max_queue_depth = max(metrics.max_queue_depth, self.queue.qsize())
+        return future
+
+    def predict(self, data: pd.DataFrame, timeout_s: float = None) -> np.array:
+        """
+        Scores a request and waits for its predictions, at most until its
+        deadline.
+
+        Args:
+            data (pd.DataFrame): The input features.
+            timeout_s (float, optional): The time budget of the request.
+
+        Raises:
+            ServiceOverloaded: If the request is rejected.
+            DeadlineExceeded: If the request was not answered before its deadline.
+
+        Returns:
+            np.array: The predictions.
+        """
+        started_at = time.monotonic()
+        timeout_s = self.default_timeout_s if timeout_s is None else timeout_s
+        future = self.submit(data, timeout_s)
+        try:
+            return future.result(timeout=started_at + timeout_s - time.monotonic())
+        except DeadlineExceeded:
+            raise
+        except FutureTimeout as e:
+            # A request still queued is skipped by the workers
+            future.cancel()
+            raise DeadlineExceeded("The request was not answered in time") from e
+
+    def serve(self) -> None:
+        """Scores queued requests until a None item is received."""
+        metrics = self.service_metrics
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+
+            with metrics.lock:
+                self.in_flight_count += 1
+            try:
+                self.serve_request(*item)
+            finally:
+                with metrics.lock:
+                    self.in_flight_count -= 1
+                # The request no longer counts toward the expected wait
+                self.queue.task_done()
+
+    def serve_request(
+        self, future: Future, data: pd.DataFrame, deadline: float, submitted_at: float
+    ) -> None:
+        """
+        Scores a dequeued request, unless it was cancelled or, when shedding,
+        its deadline already passed.
+
+        Args:
+            future (Future): The future of the request.
+            data (pd.DataFrame): The input features.
+            deadline (float): The monotonic time by which it must be answered.
+            submitted_at (float): The monotonic time it was submitted at.
+        """
+        metrics = self.service_metrics
+        if not future.set_running_or_notify_cancel():
+            return
+
+        started_at = time.monotonic()
+        if self.shed_expired and started_at > deadline:
+            with metrics.lock:
+                metrics.shed_count += 1
+            future.set_exception(
+                DeadlineExceeded("The deadline passed while the request was queued")
+            )
+            return
+
+        failed = False
+        try:
+            future.set_result(self.model_prediction.predict(data))
+        except Exception as e:
+            failed = True
+            future.set_exception(e)
+        finished_at = time.monotonic()
+
+        service_time_s = finished_at - started_at
+        with metrics.lock:
+            self.service_time_s = (
+                service_time_s
+                if self.service_time_s is None
+                else self.service_time_s
+                + SERVICE_TIME_SMOOTHING * (service_time_s - self.service_time_s)
+            )
+        metrics.record_served(
+            started_at - submitted_at, finished_at - submitted_at, failed
+        )
+
+    def metrics(self) -> dict:
+        """
+        Returns the service metrics.
+
+        Returns:
+            dict: The counters, the current queue depth and requests in flight,
+            the moving average of the service time and the latency histograms.
+        """
+        return {
+            "queue_depth": self.queue.qsize(),
+            "in_flight_count": self.in_flight_count,
+            "service_time_ms": (
+                None if self.service_time_s is None else 1000 * self.service_time_s
+            ),
+            **self.service_metrics.to_dict(),
+        }
+
+    def close(self) -> None:
+        """Serves the queued requests, stops the workers and logs the metrics."""
+        with self.state_lock:
+            if self.closed:
+                return
+            self.closed = True
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        logger.info("Prediction service metrics: %s", self.metrics())
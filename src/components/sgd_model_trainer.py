@@ -0,0 +1,167 @@
+"""
+This module contains a class for training an elastic-net-penalized linear model
+with mini-batch stochastic gradient descent. The training array is memory-mapped
+and consumed chunk by chunk through `partial_fit`, so the memory footprint stays
+constant regardless of the size of the training set. The saved model exposes the
+same `predict`, `coef_` and `intercept_` interface as the ElasticNet model.
+"""
+
+from os.path import dirname, normpath
+
+import numpy as np
+from sklearn.linear_model import SGDRegressor
+
+from src.constants import CONFIGS, PARAMS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import (
+    create_directories,
+    file_lock,
+    read_yaml,
+    save_as_joblib,
+)
+
+
+class SGDModelTrainer:
+    """
+    A class used to train an elastic-net-penalized linear model with mini-batch SGD.
+
+    ...
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for the SGD trainer.
+    params : dict
+        A dictionary containing the parameters for the ElasticNet model.
+    random_seed : int
+        The seed for the random number generator.
+    hyperparams : dict
+        A dictionary containing the elastic-net penalty hyperparameters.
+    sgd_params : dict
+        A dictionary containing the learning rate schedule and number of epochs.
+    chunk_size : int
+        The number of rows read from the training array per `partial_fit` call.
+    train_array_path : str
+        The path to the training dataset.
+    model_path : str
+        The path where the trained model will be saved.
+    publish_lock_path : str
+        The lock file guarding the served model files.
+
+    Methods
+    -------
+    train_model():
+        Trains the model over shuffled chunks for several epochs and saves it.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the SGDModelTrainer object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).sgd_trainer
+        self.params = read_yaml(PARAMS).elasticnet
+
+        # Model Parameters
+        self.random_seed = self.params.random_seed
+        self.hyperparams = self.params.hyperparameters
+        self.sgd_params = self.params.sgd
+        self.chunk_size = self.configs.chunk_size
+
+        # Input file path
+        self.train_array_path = normpath(self.configs.train_array_path)
+
+        # Output file path
+        self.model_path = normpath(self.configs.model_path)
+
+        # Lock taken while the served model files are replaced
+        workspace_configs = read_yaml(CONFIGS).workspace
+        self.publish_lock_path = normpath(workspace_configs.lock_path)
+        self.lock_timeout_s = workspace_configs.lock_timeout_s
+
+    def prepare_model(self) -> SGDRegressor:
+        """
+        Prepares an SGDRegressor whose objective matches the ElasticNet one
+        for the same alpha and l1_ratio.
+
+        Returns:
+            SGDRegressor: The unfitted model.
+        """
+        return SGDRegressor(
+            loss="squared_error",
+            penalty="elasticnet",
+            alpha=self.hyperparams.alpha,
+            l1_ratio=self.hyperparams.l1_ratio,
+            learning_rate=self.sgd_params.learning_rate,
+            eta0=self.sgd_params.eta0,
+            power_t=self.sgd_params.power_t,
+            random_state=self.random_seed,
+        )
+
+    def train_model(self) -> SGDRegressor:
+        """
+        Trains the model over the memory-mapped training array. Every epoch
+        visits the chunks in a new random order and shuffles the rows within
+        each chunk. Only one chunk is held in memory at a time.
+
+        Raises:
+            CustomException: If there is an error during training.
+
+        Returns:
+            SGDRegressor: The trained model.
+        """
+        try:
+            # Memory-map the training set array instead of loading it
+            train_array = np.load(self.train_array_path, mmap_mode="r")
+            row_count = train_array.shape[0]
+            chunk_starts = np.arange(0, row_count, self.chunk_size)
+
+            # Log the shapes
+            logger.info("The shape of the training array: %s", train_array.shape)
+            logger.info("Number of chunks per epoch: %s", len(chunk_starts))
+
+            # Log the hyperparameters
+            logger.info("The hyperparameters used are:\n%s", self.hyperparams)
+            logger.info("The SGD parameters used are:\n%s", self.sgd_params)
+
+            # Prepare the model
+            sgd_model = self.prepare_model()
+            rng = np.random.default_rng(self.random_seed)
+            logger.info("SGD ElasticNet model prepared")
+
+            for epoch in range(1, self.sgd_params.epochs + 1):
+                squared_error, scored_rows = 0.0, 0
+                for start in rng.permutation(chunk_starts):
+                    # Copy a single chunk out of the memory-mapped array
+                    chunk = np.asarray(train_array[start : start + self.chunk_size])
+                    chunk = chunk[rng.permutation(len(chunk))]
+                    x_chunk, y_chunk = chunk[:, :-1], chunk[:, -1]
+
+                    # Progressive validation: score the chunk before learning it
+                    if hasattr(sgd_model, "coef_"):
+                        residuals = y_chunk - sgd_model.predict(x_chunk)
+                        squared_error += float(residuals @ residuals)
+                        scored_rows += len(residuals)
+
+                    sgd_model.partial_fit(x_chunk, y_chunk)
+
+                if scored_rows:
+                    logger.info(
+                        "Epoch %s progressive RMSE: %.4f",
+                        epoch,
+                        np.sqrt(squared_error / scored_rows),
+                    )
+            logger.info("SGD ElasticNet model fitted on training set")
+
+            # Create directory if not exist
+            create_directories([dirname(self.model_path)])
+
+            # Saving the model, excluding readers of the served model
+            with file_lock(self.publish_lock_path, timeout_s=self.lock_timeout_s):
+                save_as_joblib(self.model_path, sgd_model)
+
+            return sgd_model
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
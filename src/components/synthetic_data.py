@@ -0,0 +1,246 @@
+"""
+This module contains the SyntheticDataGenerator class which fits the joint
+feature/target distribution of the external wine dataset with a Gaussian copula
+per wine color, and streams arbitrarily large, reproducible synthetic datasets in
+CSV or Parquet format. The output has the same columns as the external dataset, so
+it can be used in place of it in `configs.yaml` for scaling benchmarks.
+"""
+
+from math import ceil
+from os.path import dirname, normpath
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from src.constants import CONFIGS, SCHEMA
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import atomic_path, create_directories, read_yaml
+
+QUANTILE_GRID_SIZE = 1001
+
+
+class SyntheticDataGenerator:
+    """
+    A class used to fit a Gaussian copula to the wine dataset and generate
+    synthetic data from it.
+
+    Attributes
+    ----------
+    configs : dict
+        A dictionary containing the configurations for synthetic data generation.
+    schema : dict
+        The external data schema with column names and datatypes.
+    row_count : int
+        The number of synthetic rows to generate.
+    chunk_size : int
+        The number of rows generated and written at a time.
+    random_seed : int
+        The seed for the random number generator.
+
+    Methods
+    -------
+    fit_copula(dataframe):
+        Fits the marginals and the correlation of the normal scores.
+    sample(copula, row_count, rng):
+        Draws synthetic rows from a fitted copula.
+    generate_dataset():
+        Fits the source data and writes the synthetic dataset chunk by chunk.
+    """
+
+    def __init__(self):
+        """
+        Constructs all the necessary attributes for the SyntheticDataGenerator object.
+        """
+        # Read the configuration files
+        self.configs = read_yaml(CONFIGS).synthetic_data
+        self.schema = read_yaml(SCHEMA).external_data_schema
+
+        # Generation parameters
+        self.row_count = self.configs.row_count
+        self.chunk_size = self.configs.chunk_size
+        self.random_seed = self.configs.random_seed
+        self.file_format = self.configs.file_format
+
+        # Input file path
+        self.source_filepath = normpath(self.configs.source_path)
+
+        # Output file path
+        self.output_filepath = normpath(self.configs.output_path)
+
+    @staticmethod
+    def count_decimals(series: pd.Series) -> int:
+        """
+        Finds the largest number of decimals used in a numerical column.
+
+        Args:
+            series (pd.Series): The numerical column.
+
+        Returns:
+            int: The number of decimals.
+        """
+        decimals = series.dropna().astype(str).str.partition(".")[2].str.len()
+        return int(decimals.max()) if len(decimals) else 0
+
+    def fit_copula(self, dataframe: pd.DataFrame) -> dict:
+        """
+        Fits a Gaussian copula to the numerical columns. Continuous marginals are
+        stored as a quantile grid, integer marginals as their values and
+        cumulative probabilities, and the dependence as the correlation matrix
+        of the normal scores.
+
+        Args:
+            dataframe (pd.DataFrame): The numerical columns of one wine color.
+
+        Returns:
+            dict: The fitted marginals and the Cholesky factor of the correlation.
+        """
+        probabilities = np.linspace(0, 1, QUANTILE_GRID_SIZE)
+        marginals = {}
+        for column in dataframe.columns:
+            values = dataframe[column].dropna().to_numpy()
+            if self.schema[column] == "int64":
+                levels, counts = np.unique(values, return_counts=True)
+                marginals[column] = {
+                    "levels": levels,
+                    "cumulative": np.cumsum(counts) / counts.sum(),
+                }
+            else:
+                marginals[column] = {
+                    "grid": np.quantile(values, probabilities),
+                    "decimals": self.count_decimals(dataframe[column]),
+                }
+
+        # Normal scores from the ranks of every column
+        ranks = dataframe.rank(method="average").to_numpy()
+        normal_scores = ndtri(ranks / (len(dataframe) + 1))
+        correlation = np.corrcoef(normal_scores, rowvar=False)
+
+        # Keep the matrix positive definite before the decomposition
+        correlation += np.eye(len(correlation)) * 1e-9
+        return {
+            "columns": list(dataframe.columns),
+            "marginals": marginals,
+            "cholesky": np.linalg.cholesky(correlation),
+        }
+
+    @staticmethod
+    def sample(copula: dict, row_count: int, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Draws synthetic rows from a fitted copula.
+
+        Args:
+            copula (dict): The fitted copula.
+            row_count (int): The number of rows to draw.
+            rng (np.random.Generator): The random number generator.
+
+        Returns:
+            pd.DataFrame: The synthetic rows.
+        """
+        normal_draws = rng.standard_normal((row_count, len(copula["columns"])))
+        uniforms = ndtr(normal_draws @ copula["cholesky"].T)
+        probabilities = np.linspace(0, 1, QUANTILE_GRID_SIZE)
+
+        synthetic = {}
+        for idx, column in enumerate(copula["columns"]):
+            marginal = copula["marginals"][column]
+            if "levels" in marginal:
+                positions = np.searchsorted(marginal["cumulative"], uniforms[:, idx])
+                positions = np.minimum(positions, len(marginal["levels"]) - 1)
+                synthetic[column] = marginal["levels"][positions]
+            else:
+                values = np.interp(uniforms[:, idx], probabilities, marginal["grid"])
+                synthetic[column] = values.round(marginal["decimals"])
+        return pd.DataFrame(synthetic)
+
+    def generate_chunks(self, copulas: dict, color_shares: pd.Series, columns: list):
+        """
+        Yields the synthetic dataset chunk by chunk. Every chunk has its own
+        generator seeded from the base seed and the chunk number, so the output
+        is reproducible.
+
+        Args:
+            copulas (dict): The fitted copula for each wine color.
+            color_shares (pd.Series): The share of each wine color.
+            columns (list): The column order of the source dataset.
+
+        Yields:
+            pd.DataFrame: A chunk of synthetic rows in the source column order.
+        """
+        colors = color_shares.index.to_numpy()
+        shares = color_shares.to_numpy()
+        for chunk_idx in range(ceil(self.row_count / self.chunk_size)):
+            rng = np.random.default_rng([self.random_seed, chunk_idx])
+            chunk_rows = min(
+                self.chunk_size, self.row_count - chunk_idx * self.chunk_size
+            )
+
+            chunk_colors = rng.choice(colors, size=chunk_rows, p=shares)
+            parts = []
+            for color in colors:
+                positions = np.flatnonzero(chunk_colors == color)
+                rows = self.sample(copulas[color], len(positions), rng)
+                rows.index = positions
+                rows["color"] = color
+                parts.append(rows)
+            yield pd.concat(parts).sort_index()[columns]
+
+    def generate_dataset(self) -> str:
+        """
+        Fits a copula for each wine color in the source dataset and writes the
+        synthetic dataset chunk by chunk, so memory use depends on the chunk
+        size rather than the number of rows.
+
+        Raises:
+            CustomException: If there is an error during fitting or writing.
+
+        Returns:
+            str: The path of the synthetic dataset.
+        """
+        try:
+            source_df = pd.read_csv(self.source_filepath)
+            numerical_columns = [col for col in self.schema if col != "color"]
+
+            color_shares = source_df["color"].value_counts(normalize=True)
+            copulas = {
+                color: self.fit_copula(group[numerical_columns])
+                for color, group in source_df.groupby("color")
+            }
+            logger.info("Copulas fitted for colors: %s", list(copulas.keys()))
+
+            create_directories([dirname(self.output_filepath)])
+
+            with atomic_path(self.output_filepath) as temp_path:
+                writer = None
+                for chunk_idx, chunk in enumerate(
+                    self.generate_chunks(
+                        copulas, color_shares, list(source_df.columns)
+                    )
+                ):
+                    if self.file_format == "parquet":
+                        import pyarrow as pa
+                        import pyarrow.parquet as pq
+
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        if writer is None:
+                            writer = pq.ParquetWriter(temp_path, table.schema)
+                        writer.write_table(table)
+                    else:
+                        chunk.to_csv(
+                            temp_path,
+                            mode="w" if chunk_idx == 0 else "a",
+                            header=chunk_idx == 0,
+                            index=False,
+                            encoding="utf-8",
+                        )
+                if writer is not None:
+                    writer.close()
+
+            logger.info(
+                "%s synthetic rows saved at: %s", self.row_count, self.output_filepath
+            )
+            return self.output_filepath
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
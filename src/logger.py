@@ -1,10 +1,26 @@
 """wip
+
+Log records are put on a bounded in-memory queue and written to the log file and
+stdout by a background listener thread, so logging calls do not wait on disk or
+console I/O. When the queue is full, records below WARNING are dropped under the
+`drop` policy, while warnings and errors (and every record under the `block`
+policy) wait for space for at most `block_timeout_s`. Dropped records are counted
+and reported by the listener. Levels are set per subsystem in the `logging`
+section of `conf/configs.yaml`, and `get_logger` returns the logger of a
+subsystem.
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+import yaml
+
+from src.constants import CONFIGS
 
 # Setup logs directory in the current working directory
 logs_dir_path = os.path.join(os.getcwd(), "logs")
@@ -20,17 +36,161 @@ LOG_FILE_PATH = os.path.join(logs_dir_path, logs_filename)
 # Create logging string
 LOGGING_STR = "[%(asctime)s]:%(name)s %(levelname)s: %(module)s %(lineno)d - %(message)s"
 
-# Creates logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    encoding="utf-8",
-    format=LOGGING_STR,
-    datefmt="%Y-%m-%d %I:%M:%S %p",
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Defaults used when the configuration file has no logging section
+DEFAULT_LOGGING_CONFIGS = {
+    "queue_size": 10000,
+    "overflow_policy": "drop",
+    "block_timeout_s": 1.0,
+    "levels": {"ProjectLogger": "INFO"},
+}
+
+
+def read_logging_configs() -> dict:
+    """
+    Reads the logging section of the configuration file. The file is read with
+    yaml directly because `read_yaml` itself logs through this module.
+
+    Returns:
+        dict: The logging configuration merged over the defaults.
+    """
+    try:
+        with open(CONFIGS, encoding="utf-8") as yaml_file:
+            configs = (yaml.safe_load(yaml_file) or {}).get("logging") or {}
+    except OSError:
+        configs = {}
+    return {**DEFAULT_LOGGING_CONFIGS, **configs}
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    A queue handler that never blocks indefinitely on a full queue.
+
+    Args:
+        log_queue (queue.Queue): The bounded queue read by the listener.
+        overflow_policy (str): `drop` to discard records below WARNING when the
+        queue is full, or `block` to wait for space for every record.
+        block_timeout_s (float): The longest wait for space in the queue.
+    """
+
+    def __init__(
+        self, log_queue: queue.Queue, overflow_policy: str, block_timeout_s: float
+    ):
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.block_timeout_s = block_timeout_s
+        self.dropped_count = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Puts a record on the queue, dropping it if the queue stays full.
+
+        Args:
+            record (logging.LogRecord): The prepared log record.
+        """
+        try:
+            if self.overflow_policy == "block" or record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout_s)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_count += 1
+
+
+class DropReportingListener(QueueListener):
+    """
+    A queue listener that reports, through the next record it writes, how many
+    records were dropped since the last report.
+    """
+
+    def __init__(self, log_queue, queue_handler: BoundedQueueHandler, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.reported_count = 0
+
+    def handle(self, record: logging.LogRecord) -> None:
+        dropped_count = self.queue_handler.dropped_count
+        if dropped_count > self.reported_count:
+            report = logging.makeLogRecord(
+                {
+                    "name": "ProjectLogger",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "module": "logger",
+                    "msg": f"{dropped_count - self.reported_count} log records "
+                    "dropped because the logging queue was full",
+                }
+            )
+            self.reported_count = dropped_count
+            super().handle(report)
+        super().handle(record)
+
+
+def configure_logging() -> DropReportingListener:
+    """
+    Routes every log record through the bounded queue to a background listener
+    which writes to the log file and stdout, and applies the subsystem levels.
+
+    Returns:
+        DropReportingListener: The started listener.
+    """
+    configs = read_logging_configs()
+
+    formatter = logging.Formatter(LOGGING_STR, datefmt="%Y-%m-%d %I:%M:%S %p")
+    file_handler = logging.FileHandler(LOG_FILE_PATH, encoding="utf-8")
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=configs["queue_size"])
+    queue_handler = BoundedQueueHandler(
+        log_queue, configs["overflow_policy"], configs["block_timeout_s"]
+    )
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers = [queue_handler]
+    for name, level in configs["levels"].items():
+        logging.getLogger(name).setLevel(level)
+
+    def start_listener() -> DropReportingListener:
+        queue_listener = DropReportingListener(
+            queue_handler.queue, queue_handler, file_handler, stream_handler
+        )
+        queue_listener.start()
+
+        # Write the records still in the queue before the interpreter exits
+        atexit.register(queue_listener.stop)
+        return queue_listener
+
+    def restart_in_child() -> None:
+        # A forked worker inherits the queue but not the listener thread
+        queue_handler.queue = queue.Queue(maxsize=configs["queue_size"])
+        queue_handler.dropped_count = 0
+        start_listener()
+
+    os.register_at_fork(after_in_child=restart_in_child)
+    return start_listener()
+
+
+def get_logger(subsystem: str = None) -> logging.Logger:
+    """
+    Returns the project logger, or the logger of one of its subsystems, whose
+    level can be set in the `logging.levels` configuration as
+    `ProjectLogger.<subsystem>`.
+
+    Args:
+        subsystem (str, optional): The subsystem name, e.g. `prediction`.
+        Defaults to None, meaning the project logger.
+
+    Returns:
+        logging.Logger: The logger.
+    """
+    if subsystem is None:
+        return logging.getLogger("ProjectLogger")
+    return logging.getLogger(f"ProjectLogger.{subsystem}")
+
+
+listener = configure_logging()
 
 # Create the logger object
-logger = logging.getLogger("ProjectLogger")
+logger = get_logger()
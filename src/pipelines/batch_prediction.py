@@ -0,0 +1,65 @@
+"""
+This module scores the batch prediction input file with the trained model.
+
+Usage:
+    python -m src.pipelines.batch_prediction
+    python -m src.pipelines.batch_prediction --explain
+"""
+
+import argparse
+
+from src.components.batch_prediction import BatchPrediction
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.profiling import profiled
+
+
+class BatchPredictionPipeline:
+    """
+    Pipeline to score a file of wines in chunks.
+    """
+
+    def __init__(self):
+        pass
+
+    @profiled("batch_prediction")
+    def main(self, explain: bool = None):
+        """
+        Scores the configured input file.
+
+        Args:
+            explain (bool, optional): Whether to write per-feature contributions.
+            Defaults to None, meaning the configured value.
+
+        Raises:
+            CustomException: If scoring fails.
+        """
+        try:
+            logger.info("Batch prediction started")
+            BatchPrediction(explain=explain).score_file()
+            logger.info("Batch prediction completed successfully")
+        except Exception as excp:
+            logger.error(CustomException(excp))
+            raise CustomException(excp) from excp
+
+
+if __name__ == "__main__":
+    STAGE_NAME = "Batch Prediction stage"
+
+    parser = argparse.ArgumentParser(description="Score a file of wines")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        default=None,
+        help="write per-feature contributions with the predictions",
+    )
+    args = parser.parse_args()
+
+    try:
+        logger.info(">>>>>> %s started <<<<<<", STAGE_NAME)
+        obj = BatchPredictionPipeline()
+        obj.main(args.explain)
+        logger.info(">>>>>> %s completed <<<<<<\n\nx==========x", STAGE_NAME)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
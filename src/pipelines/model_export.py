@@ -0,0 +1,49 @@
+"""
+This module exports the trained model for the NumPy-only inference runtime.
+
+Usage:
+    python -m src.pipelines.model_export
+"""
+
+from src.components.model_export import ModelExport
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.profiling import profiled
+
+
+class ModelExportPipeline:
+    """
+    Pipeline to export the preprocessor and model as NumPy arrays.
+    """
+
+    def __init__(self):
+        pass
+
+    @profiled("model_export")
+    def main(self):
+        """
+        Exports the configured preprocessor and model.
+
+        Raises:
+            CustomException: If the export fails.
+        """
+        try:
+            logger.info("Model export started")
+            ModelExport().export_model()
+            logger.info("Model export completed successfully")
+        except Exception as excp:
+            logger.error(CustomException(excp))
+            raise CustomException(excp) from excp
+
+
+if __name__ == "__main__":
+    STAGE_NAME = "Model Export stage"
+
+    try:
+        logger.info(">>>>>> %s started <<<<<<", STAGE_NAME)
+        obj = ModelExportPipeline()
+        obj.main()
+        logger.info(">>>>>> %s completed <<<<<<\n\nx==========x", STAGE_NAME)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
@@ -0,0 +1,96 @@
+"""
+This module manages the local model registry. The `register` action adds the
+configured preprocessor and model as a new version, optionally promoting it to a
+stage, `promote` points a stage at a version (which is also how a model is rolled
+back), and `list` logs the versions and stages.
+
+Serving processes configured with `model_prediction.source: registry` switch to
+a newly promoted version within `model_registry.poll_interval_s`.
+
+Usage:
+    python -m src.pipelines.model_registry register --stage staging
+    python -m src.pipelines.model_registry promote 3 production
+    python -m src.pipelines.model_registry list
+"""
+
+import argparse
+
+from src.constants import CONFIGS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import read_yaml
+from src.utils.model_registry import ModelRegistry
+from src.utils.profiling import profiled
+
+
+class ModelRegistryPipeline:
+    """
+    Pipeline to register and promote model versions.
+    """
+
+    def __init__(self):
+        pass
+
+    @profiled("model_registry")
+    def main(self, action: str, version: int = None, stage: str = None):
+        """
+        Runs the requested registry action.
+
+        Args:
+            action (str): One of `register`, `promote` or `list`.
+            version (int, optional): The version promoted by `promote`.
+            stage (str, optional): The stage set by `register` or `promote`.
+
+        Raises:
+            CustomException: If the action fails.
+        """
+        try:
+            logger.info("Model registry %s started", action)
+            configs = read_yaml(CONFIGS).model_registry
+            registry = ModelRegistry.from_configs(configs)
+            if action == "register":
+                registry.register(
+                    configs.preprocessor_path, configs.model_path, stage=stage
+                )
+            elif action == "promote":
+                registry.promote(version, stage)
+            else:
+                for registered in registry.versions():
+                    manifest = registry.manifest(registered)
+                    logger.info(
+                        "v%s: model %s, created at %s",
+                        registered,
+                        manifest["model_version"],
+                        manifest["created_at"],
+                    )
+                for name in registry.stages:
+                    logger.info("%s: v%s", name, registry.stage_version(name))
+            logger.info("Model registry %s completed successfully", action)
+        except Exception as excp:
+            logger.error(CustomException(excp))
+            raise CustomException(excp) from excp
+
+
+if __name__ == "__main__":
+    STAGE_NAME = "Model Registry stage"
+
+    parser = argparse.ArgumentParser(description="Manage the model registry")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    register_parser = subparsers.add_parser("register")
+    register_parser.add_argument("--stage", help="stage to point at the new version")
+    promote_parser = subparsers.add_parser("promote")
+    promote_parser.add_argument("version", type=int)
+    promote_parser.add_argument("stage")
+    subparsers.add_parser("list")
+    args = parser.parse_args()
+
+    try:
+        logger.info(">>>>>> %s started <<<<<<", STAGE_NAME)
+        obj = ModelRegistryPipeline()
+        obj.main(
+            args.action, getattr(args, "version", None), getattr(args, "stage", None)
+        )
+        logger.info(">>>>>> %s completed <<<<<<\n\nx==========x", STAGE_NAME)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
@@ -0,0 +1,71 @@
+"""
+This module runs the model sweep. The `enqueue` action adds the sweep tasks to
+the queue, `work` starts worker processes on this machine (run it on every
+machine sharing the queue), and `collect` writes the results table.
+
+Usage:
+    python -m src.pipelines.model_sweep enqueue
+    python -m src.pipelines.model_sweep work --workers 4
+    python -m src.pipelines.model_sweep collect
+"""
+
+import argparse
+
+from src.components.model_sweep import ModelSweep
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.profiling import profiled
+
+
+class ModelSweepPipeline:
+    """
+    Pipeline to enqueue, execute and collect the model sweep.
+    """
+
+    def __init__(self):
+        pass
+
+    @profiled("model_sweep")
+    def main(self, action: str, workers: int = 1):
+        """
+        Runs the requested sweep action.
+
+        Args:
+            action (str): One of `enqueue`, `work` or `collect`.
+            workers (int, optional): The number of local worker processes used
+            by the `work` action. Defaults to 1.
+
+        Raises:
+            CustomException: If the action fails.
+        """
+        try:
+            logger.info("Model sweep %s started", action)
+            model_sweep = ModelSweep()
+            if action == "enqueue":
+                model_sweep.enqueue_tasks()
+            elif action == "work":
+                model_sweep.run_workers(workers)
+            else:
+                model_sweep.collect_results()
+            logger.info("Model sweep %s completed successfully", action)
+        except Exception as excp:
+            logger.error(CustomException(excp))
+            raise CustomException(excp) from excp
+
+
+if __name__ == "__main__":
+    STAGE_NAME = "Model Sweep stage"
+
+    parser = argparse.ArgumentParser(description="Run the model sweep")
+    parser.add_argument("action", choices=["enqueue", "work", "collect"])
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        logger.info(">>>>>> %s started <<<<<<", STAGE_NAME)
+        obj = ModelSweepPipeline()
+        obj.main(args.action, args.workers)
+        logger.info(">>>>>> %s completed <<<<<<\n\nx==========x", STAGE_NAME)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
@@ -3,6 +3,7 @@
 from src.components.data_ingestion import DataIngestion
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.profiling import profiled
 
 
 class DataIngestionPipeline:
@@ -11,6 +12,7 @@ class DataIngestionPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_01_data_ingestion")
     def main(self):
         """_summary_
 
@@ -4,6 +4,7 @@
 from src.components.data_validation import DataValidation
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.profiling import profiled
 
 
 class DataValidationPipeline:
@@ -13,6 +14,7 @@ class DataValidationPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_02_data_validation")
     def main(self):
         """_summary_
 
@@ -4,6 +4,7 @@
 from src.components.data_preparation import DataPreparation
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.profiling import profiled
 
 
 class DataPreparationPipeline:
@@ -13,6 +14,7 @@ class DataPreparationPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_03_data_preparation")
     def main(self):
         """_summary_
 
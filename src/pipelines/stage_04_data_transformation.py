@@ -4,6 +4,7 @@
 from src.components.data_transformation import DataTransformation
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.profiling import profiled
 
 
 class DataTransformPipeline:
@@ -12,6 +13,7 @@ class DataTransformPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_04_data_transformation")
     def main(self):
         """_summary_
 
@@ -1,9 +1,15 @@
 """WIP
 """
 
+from src.components.incremental_trainer import IncrementalTrainer
 from src.components.model_trainer import ModelTrainer
+from src.components.model_zoo_trainer import ModelZooTrainer
+from src.components.sgd_model_trainer import SGDModelTrainer
+from src.constants import CONFIGS
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.basic_utils import read_yaml
+from src.utils.profiling import profiled
 
 
 class ModelTrainerPipeline:
@@ -12,6 +18,7 @@ class ModelTrainerPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_05_model_trainer")
     def main(self):
         """_summary_
 
@@ -20,8 +27,20 @@ class ModelTrainerPipeline:
         """
         try:
             logger.info("Model Training started")
-            model_trainer = ModelTrainer()
-            model_trainer.train_model()
+            training_mode = read_yaml(CONFIGS).model_trainer.training_mode
+            logger.info("Training mode: %s", training_mode)
+            if training_mode == "model_zoo":
+                model_zoo_trainer = ModelZooTrainer()
+                model_zoo_trainer.train_models()
+            elif training_mode == "sgd":
+                sgd_model_trainer = SGDModelTrainer()
+                sgd_model_trainer.train_model()
+            elif training_mode == "incremental":
+                incremental_trainer = IncrementalTrainer()
+                incremental_trainer.retrain()
+            else:
+                model_trainer = ModelTrainer()
+                model_trainer.train_model()
             logger.info("Model training completed successfully")
         except Exception as excp:
             logger.error(CustomException(excp))
@@ -2,8 +2,12 @@
 """
 
 from src.components.model_evaluation import ModelEvaluation
+from src.components.permutation_importance import PermutationImportance
+from src.constants import CONFIGS
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.basic_utils import read_yaml
+from src.utils.profiling import profiled
 
 
 class ModelEvaluationPipeline:
@@ -12,6 +16,7 @@ class ModelEvaluationPipeline:
     def __init__(self):
         pass
 
+    @profiled("stage_06_model_evaluation")
     def main(self):
         """_summary_
 
@@ -20,9 +25,20 @@ class ModelEvaluationPipeline:
         """
         try:
             logger.info("Model Evaluation started")
+            configs = read_yaml(CONFIGS)
+            if configs.model_trainer.training_mode == "model_zoo":
+                # The zoo winner is not the served model this stage evaluates
+                logger.warning(
+                    "Model evaluation skipped in model_zoo mode, see the "
+                    "leaderboard at: %s",
+                    configs.model_zoo.leaderboard_path,
+                )
+                return
             model_eval = ModelEvaluation()
             model_eval.save_evaluation_results()
             model_eval.log_into_mlflow()
+            if configs.permutation_importance.enabled:
+                PermutationImportance().compute_importance()
             logger.info("Model evaluation completed successfully")
         except Exception as excp:
             logger.error(CustomException(excp))
@@ -0,0 +1,47 @@
+"""
+This module generates the synthetic wine dataset used for scaling benchmarks.
+"""
+
+from src.components.synthetic_data import SyntheticDataGenerator
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.profiling import profiled
+
+
+class SyntheticDataPipeline:
+    """
+    Pipeline to generate the synthetic wine dataset.
+    """
+
+    def __init__(self):
+        pass
+
+    @profiled("synthetic_data_generation")
+    def main(self):
+        """
+        Fits the source dataset and writes the synthetic dataset.
+
+        Raises:
+            CustomException: If the generation fails.
+        """
+        try:
+            logger.info("Synthetic data generation started")
+            data_generator = SyntheticDataGenerator()
+            data_generator.generate_dataset()
+            logger.info("Synthetic data generation completed successfully")
+        except Exception as excp:
+            logger.error(CustomException(excp))
+            raise CustomException(excp) from excp
+
+
+if __name__ == "__main__":
+    STAGE_NAME = "Synthetic Data Generation stage"
+
+    try:
+        logger.info(">>>>>> %s started <<<<<<", STAGE_NAME)
+        obj = SyntheticDataPipeline()
+        obj.main()
+        logger.info(">>>>>> %s completed <<<<<<\n\nx==========x", STAGE_NAME)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
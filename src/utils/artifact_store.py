@@ -0,0 +1,273 @@
+"""
+This module provides the ArtifactStore class, a content-addressed store for models,
+preprocessors and arrays under `models/artifacts/`.
+
+Each artifact is stored once under the SHA-256 hash of its serialized payload, as
+`objects/<hash[:2]>/<hash>` with a small JSON manifest next to it (kind, codec,
+sizes, dtype and shape). Named references in `refs/` point at a hash and are
+replaced atomically, so readers see either the previous or the new artifact,
+never a partial write, and earlier versions stay loadable by hash.
+
+Payloads are compressed with a codec chosen per artifact: `none`, `zlib`, or
+`lz4` when the lz4 package is installed. Arrays stored with `none` are plain
+`.npy` files which load as read-only memory maps, without copying.
+"""
+
+import hashlib
+import io
+import json
+import zlib
+from datetime import datetime
+from os.path import exists, join, normpath
+from typing import Any
+
+import joblib
+import numpy as np
+
+from src.constants import CONFIGS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import read_yaml, write_atomically
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Codec name: (compress, decompress). zlib level 1 compresses the model arrays
+# about as well as the default level 6, twice as fast.
+CODECS = {
+    "none": (lambda data: data, lambda data: data),
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if lz4 is not None:
+    CODECS["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+
+
+class ArtifactStore:
+    """
+    A content-addressed store of serialized objects and numpy arrays.
+
+    Attributes
+    ----------
+    root_dir : str
+        The directory holding the `objects/` and `refs/` directories.
+    default_codec : str
+        The codec used when an artifact has no configured codec.
+    codecs : dict
+        The codec configured for each artifact name.
+
+    Methods
+    -------
+    put_object(name, obj, codec):
+        Stores a Python object and points the reference `name` at it.
+    put_array(name, array, codec):
+        Stores a numpy array and points the reference `name` at it.
+    get(name_or_hash, mmap):
+        Loads an artifact by reference name or hash.
+    """
+
+    def __init__(
+        self, root_dir: str, default_codec: str = "none", codecs: dict = None
+    ):
+        self.root_dir = normpath(root_dir)
+        self.default_codec = default_codec
+        self.codecs = dict(codecs or {})
+
+    @classmethod
+    def from_configs(cls, configs: dict = None) -> "ArtifactStore":
+        """
+        Creates the store described by the `artifact_store` configuration.
+
+        Args:
+            configs (dict, optional): The configuration. Defaults to None, meaning
+            it is read from the configuration file.
+
+        Returns:
+            ArtifactStore: The store.
+        """
+        configs = configs or read_yaml(CONFIGS).artifact_store
+        return cls(configs.root_dir, configs.default_codec, configs.codecs)
+
+    def object_path(self, digest: str) -> str:
+        """Returns the path of the payload of a hash."""
+        return join(self.root_dir, "objects", digest[:2], digest)
+
+    def ref_path(self, name: str) -> str:
+        """Returns the path of a named reference."""
+        return join(self.root_dir, "refs", f"{name}.json")
+
+    def codec_for(self, name: str, codec: str = None) -> str:
+        """
+        Picks the codec of an artifact: the explicit one, else the configured one,
+        falling back to zlib when lz4 is configured but not installed.
+        """
+        codec = codec or self.codecs.get(name, self.default_codec)
+        if codec == "lz4" and "lz4" not in CODECS:
+            logger.warning("lz4 is not installed, storing %s with zlib", name)
+            codec = "zlib"
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec}, expected one of {list(CODECS)}")
+        return codec
+
+    def put(self, name: str, payload: bytes, codec: str, manifest: dict) -> str:
+        """
+        Stores a serialized payload under its hash, unless it is already stored,
+        and atomically points the reference `name` at it.
+
+        Args:
+            name (str): The reference name, or None to store the payload without
+            a reference, for callers that keep the hash themselves.
+            payload (bytes): The serialized artifact.
+            codec (str): The codec name.
+            manifest (dict): The kind-specific manifest fields.
+
+        Returns:
+            str: The hash of the payload.
+        """
+        codec = self.codec_for(name, codec)
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.object_path(digest)
+        if not exists(path):
+            stored = CODECS[codec][0](payload)
+            manifest = {
+                **manifest,
+                "hash": digest,
+                "codec": codec,
+                "size": len(payload),
+                "stored_size": len(stored),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            # The manifest is written first, so a visible payload always has one
+            write_atomically(f"{path}.json", json.dumps(manifest, indent=4).encode())
+            write_atomically(path, stored)
+
+        if name is not None:
+            ref = {"hash": digest, "updated_at": datetime.now().isoformat()}
+            write_atomically(self.ref_path(name), json.dumps(ref).encode())
+        logger.info("Artifact %s stored as %s", name or manifest["kind"], digest[:12])
+        return digest
+
+    def put_object(self, name: str, obj: Any, codec: str = None) -> str:
+        """
+        Stores a Python object, serialized with joblib.
+
+        Args:
+            name (str): The reference name, e.g. `elasticnet_model`.
+            obj (Any): The object.
+            codec (str, optional): The codec. Defaults to the configured codec.
+
+        Raises:
+            CustomException: If the object cannot be stored.
+
+        Returns:
+            str: The hash of the artifact.
+        """
+        try:
+            buffer = io.BytesIO()
+            joblib.dump(obj, buffer)
+            manifest = {"kind": "object", "type": type(obj).__name__}
+            return self.put(name, buffer.getvalue(), codec, manifest)
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def put_array(self, name: str, array: np.array, codec: str = None) -> str:
+        """
+        Stores a numpy array in the `.npy` format.
+
+        Args:
+            name (str): The reference name, e.g. `train_array`.
+            array (np.array): The array.
+            codec (str, optional): The codec. Defaults to the configured codec;
+            use `none` to load the array as a memory map.
+
+        Raises:
+            CustomException: If the array cannot be stored.
+
+        Returns:
+            str: The hash of the artifact.
+        """
+        try:
+            array = np.ascontiguousarray(array)
+            buffer = io.BytesIO()
+            np.save(buffer, array, allow_pickle=False)
+            manifest = {
+                "kind": "array",
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+            return self.put(name, buffer.getvalue(), codec, manifest)
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def resolve(self, name_or_hash: str) -> str:
+        """
+        Resolves a reference name, or returns a hash unchanged.
+
+        Args:
+            name_or_hash (str): The reference name or the hash.
+
+        Returns:
+            str: The hash.
+        """
+        ref_path = self.ref_path(name_or_hash)
+        if exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                return json.load(f)["hash"]
+        if exists(self.object_path(name_or_hash)):
+            return name_or_hash
+        raise FileNotFoundError(f"No artifact named or hashed {name_or_hash}")
+
+    def manifest(self, name_or_hash: str) -> dict:
+        """
+        Reads the manifest of an artifact.
+
+        Args:
+            name_or_hash (str): The reference name or the hash.
+
+        Returns:
+            dict: The manifest.
+        """
+        path = f"{self.object_path(self.resolve(name_or_hash))}.json"
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, name_or_hash: str, mmap: bool = False, verify: bool = False) -> Any:
+        """
+        Loads an artifact.
+
+        Args:
+            name_or_hash (str): The reference name or the hash.
+            mmap (bool, optional): Load an uncompressed array as a read-only memory
+            map. Defaults to False.
+            verify (bool, optional): Check the payload against its hash.
+            Defaults to False.
+
+        Raises:
+            CustomException: If the artifact cannot be found or loaded.
+
+        Returns:
+            Any: The object or array.
+        """
+        try:
+            manifest = self.manifest(name_or_hash)
+            path = self.object_path(manifest["hash"])
+            if manifest["kind"] == "array" and manifest["codec"] == "none":
+                # Uncompressed arrays are `.npy` files, read without a copy
+                if mmap:
+                    return np.load(path, mmap_mode="r", allow_pickle=False)
+                if not verify:
+                    return np.load(path, allow_pickle=False)
+
+            with open(path, "rb") as f:
+                payload = CODECS[manifest["codec"]][1](f.read())
+            if verify and hashlib.sha256(payload).hexdigest() != manifest["hash"]:
+                raise ValueError(f"Artifact {manifest['hash']} is corrupted")
+            if manifest["kind"] == "array":
+                return np.load(io.BytesIO(payload), allow_pickle=False)
+            return joblib.load(io.BytesIO(payload))
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
@@ -1,18 +1,36 @@
 """
 This module provides utility functions for handling files and directories. It includes
-functions for reading YAML files, creating directories, saving data as JSON or
-joblib files, and calculating the size of a file or directory. The functions are
-designed to handle exceptions and log relevant information for debugging purposes.
+functions for reading YAML files, creating directories, saving data as JSON, joblib
+or npy files, fingerprinting file contents, and calculating the size of a file or
+directory. The functions are designed to handle exceptions and log relevant
+information for debugging purposes.
+
+Every save function writes to a temporary file in the target directory and renames
+it over the target, so concurrent readers never see a half-written file. Writers
+that update shared files in several steps hold an advisory `file_lock`.
 """
+import hashlib
 import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
 from os import makedirs
-from os.path import dirname, getsize, normpath
+from os.path import basename, dirname, exists, getsize, normpath, splitext
 from typing import Any
 
 import joblib
+import numpy as np
 import yaml
 from box import Box
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    import msvcrt
+
+    fcntl = None
+
 from src.exception import CustomException
 from src.logger import logger
 
@@ -60,6 +78,101 @@ def create_directories(dir_paths: list, verbose=True) -> None:
             logger.info("created directory at: %s", path)
 
 
+@contextmanager
+def atomic_path(file_path: str):
+    """
+    This function yields a temporary path next to the target to write to, and
+    renames it over the target when the block succeeds. The rename is atomic, so
+    readers see either the previous file or the new one. The temporary path keeps
+    the target's extension, which `np.save` and `joblib.dump` act on.
+
+    Args:
+        file_path (str): The path of the file to write.
+
+    Yields:
+        str: The temporary path to write to.
+    """
+    target_path = normpath(file_path)
+    makedirs(dirname(target_path) or ".", exist_ok=True)
+    temp_path = os.path.join(
+        dirname(target_path),
+        f".{basename(target_path)}.{uuid.uuid4().hex}{splitext(target_path)[1]}",
+    )
+    try:
+        yield temp_path
+        os.replace(temp_path, target_path)
+    finally:
+        if exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_atomically(file_path: str, data: bytes) -> None:
+    """
+    This function writes bytes to a file atomically and flushes them to disk.
+
+    Args:
+        file_path (str): The path of the file.
+        data (bytes): The file contents.
+    """
+    with atomic_path(file_path) as temp_path:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@contextmanager
+def file_lock(
+    lock_path: str,
+    shared: bool = False,
+    timeout_s: float = 60,
+    poll_interval_s: float = 0.05,
+):
+    """
+    This function holds an advisory lock on a lock file for the duration of the
+    block: `fcntl.flock` on POSIX, where shared locks let readers overlap, and
+    `msvcrt.locking` on Windows, where every lock is exclusive. The lock is
+    released if the process dies, and the lock file is left in place.
+
+    Args:
+        lock_path (str): The path of the lock file, created if missing.
+        shared (bool, optional): Take a shared (read) lock. Defaults to False.
+        timeout_s (float, optional): The longest wait for the lock. Defaults to 60.
+        poll_interval_s (float, optional): The wait between attempts.
+
+    Raises:
+        TimeoutError: If the lock is not acquired within the timeout.
+
+    Yields:
+        None
+    """
+    lock_path = normpath(lock_path)
+    makedirs(dirname(lock_path) or ".", exist_ok=True)
+    deadline = time.monotonic() + timeout_s
+    with open(lock_path, "a+b") as lock_file:
+        while True:
+            try:
+                if fcntl is not None:
+                    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                    fcntl.flock(lock_file.fileno(), mode | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for {lock_path}") from e
+                time.sleep(poll_interval_s)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def save_as_json(file_path: str, data: dict) -> None:
     """
     This function saves a dictionary as a JSON file at the specified file path.
@@ -74,10 +187,10 @@ def save_as_json(file_path: str, data: dict) -> None:
         a CustomException will be raised with the original exception as its argument.
     """
     save_path = normpath(file_path)
-    makedirs(dirname(save_path), exist_ok=True)
     try:
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        with atomic_path(save_path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
 
         logger.info("json file saved at: %s", save_path)
     except Exception as e:
@@ -97,15 +210,36 @@ def save_as_joblib(file_path: str, serialized_object: Any) -> None:
         CustomException: If there is an error during the saving process.
     """
     save_path = normpath(file_path)
-    makedirs(dirname(save_path), exist_ok=True)
     try:
-        joblib.dump(serialized_object, save_path)
+        with atomic_path(save_path) as temp_path:
+            joblib.dump(serialized_object, temp_path)
         logger.info("object saved at: %s", save_path)
     except Exception as e:
         logger.error(CustomException(e))
         raise CustomException(e) from e
 
 
+def save_as_npy(file_path: str, array: np.array) -> None:
+    """
+    Save a numpy array in the npy format.
+
+    Args:
+        file_path (str): The file path where the array will be saved.
+        array (np.array): The array to be saved.
+
+    Raises:
+        CustomException: If there is an error during the saving process.
+    """
+    save_path = normpath(file_path)
+    try:
+        with atomic_path(save_path) as temp_path:
+            np.save(temp_path, array)
+        logger.info("array saved at: %s", save_path)
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
+
+
 def load_joblib(file_path: str) -> joblib:
     """
     This function loads a joblib file from a specified file path.
@@ -130,6 +264,33 @@ def load_joblib(file_path: str) -> joblib:
         raise CustomException(e) from e
 
 
+def file_fingerprint(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    This function computes a fingerprint of a file's contents. The file is read
+    in blocks, so memory use does not depend on the file size.
+
+    Args:
+        file_path (str): The path of the file to fingerprint.
+        block_size (int, optional): The number of bytes read at a time.
+        Defaults to 1 MiB.
+
+    Raises:
+        CustomException: If the file cannot be read.
+
+    Returns:
+        str: The SHA-256 hex digest of the file contents.
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(normpath(file_path), "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except Exception as e:
+        logger.error(CustomException(e))
+        raise CustomException(e) from e
+
+
 def get_size(path: str) -> str:
     """
     This function calculates the size of the file or directory at the given path.
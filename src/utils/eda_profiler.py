@@ -0,0 +1,383 @@
+"""
+This module provides the EDAProfiler class which profiles a CSV file of any size
+in one chunked pass: structure, field counts per datatype, nulls, memory footprint,
+distinct counts, summary statistics, correlations and distributions. Each chunk is
+reduced to a small mergeable summary, with quantile and distinct count sketches
+from `src/utils/sketches.py` in place of raw values, chunks are summarized in
+parallel worker processes, and a sampling mode skips rows while parsing for very
+large files. Every output table is a flat dictionary that renders with
+`dict_to_table`.
+"""
+
+import random
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from os.path import normpath
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.sketches import HyperLogLog, KLLSketch
+
+
+def summarize_chunk(
+    chunk: pd.DataFrame,
+    numeric_columns: list,
+    shift: np.array,
+    quantile_k: int,
+    distinct_precision: int,
+    max_categories: int,
+    seed: list,
+) -> dict:
+    """
+    Reduces one chunk to a mergeable summary.
+
+    Args:
+        chunk (pd.DataFrame): The chunk of rows.
+        numeric_columns (list): The columns used for moments and correlations.
+        shift (np.array): A per-column offset subtracted before the correlation
+        sums, the same for every chunk, which keeps the sums numerically stable.
+        quantile_k (int): The accuracy parameter of the quantile sketches.
+        distinct_precision (int): The precision of the distinct count sketches.
+        max_categories (int): The most distinct values counted per text column.
+        seed (list): The seed of the quantile sketches of this chunk.
+
+    Returns:
+        dict: The summary of the chunk.
+    """
+    memory_usage = chunk.memory_usage(deep=True, index=False)
+    null_counts = chunk.isnull().sum()
+    summary = {
+        "rows": len(chunk),
+        "numeric_columns": numeric_columns,
+        "columns": {
+            column: {
+                "dtype": str(chunk[column].dtype),
+                "nulls": int(null_counts[column]),
+                "memory": int(memory_usage[column]),
+            }
+            for column in chunk.columns
+        },
+        "moments": {},
+        "quantiles": {},
+        "distinct": {},
+        "categories": {},
+    }
+    for column in chunk.columns:
+        summary["distinct"][column] = HyperLogLog(distinct_precision)
+        summary["distinct"][column].update(chunk[column])
+
+    # Moments and a quantile sketch of every numeric column
+    # Values that fail to parse in a later chunk count as missing
+    values = (
+        chunk[numeric_columns]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=float)
+    )
+    present = ~np.isnan(values)
+    for idx, column in enumerate(numeric_columns):
+        column_values = values[present[:, idx], idx]
+        if not len(column_values):
+            continue
+        mean = column_values.mean()
+        deviations = column_values - mean
+        summary["moments"][column] = {
+            "count": len(column_values),
+            "mean": mean,
+            "m2": deviations @ deviations,
+            "min": column_values.min(),
+            "max": column_values.max(),
+        }
+        summary["quantiles"][column] = KLLSketch(quantile_k, seed=seed + [idx])
+        summary["quantiles"][column].update(column_values)
+
+    # Pairwise-complete co-moment sums for the correlation matrix
+    mask = present.astype(float)
+    shifted = np.where(present, values - shift, 0.0)
+    summary["correlation_sums"] = {
+        "n": mask.T @ mask,
+        "sx": shifted.T @ mask,
+        "sxx": (shifted**2).T @ mask,
+        "sxy": shifted.T @ shifted,
+    }
+
+    # Value counts of the text columns
+    for column in chunk.columns.difference(numeric_columns):
+        counts = chunk[column].value_counts()
+        summary["categories"][column] = Counter(
+            counts.head(max_categories).to_dict()
+        )
+        summary["columns"][column]["truncated"] = len(counts) > max_categories
+    return summary
+
+
+def merge_summaries(total: dict, summary: dict) -> dict:
+    """
+    Folds one chunk summary into the running summary.
+
+    Args:
+        total (dict): The running summary, or None for the first chunk.
+        summary (dict): The chunk summary.
+
+    Returns:
+        dict: The updated running summary.
+    """
+    if total is None:
+        return summary
+
+    total["rows"] += summary["rows"]
+    for column, details in summary["columns"].items():
+        running = total["columns"][column]
+        if running["dtype"] != details["dtype"]:
+            numeric = {running["dtype"], details["dtype"]} <= {"int64", "float64"}
+            running["dtype"] = "float64" if numeric else "object"
+        running["nulls"] += details["nulls"]
+        running["memory"] += details["memory"]
+        running["truncated"] = running.get("truncated") or details.get("truncated")
+
+    for column, moments in summary["moments"].items():
+        running = total["moments"].get(column)
+        if running is None:
+            total["moments"][column] = moments
+            continue
+        # Chan's parallel update of the count, mean and squared deviations
+        count = running["count"] + moments["count"]
+        delta = moments["mean"] - running["mean"]
+        running["m2"] += moments["m2"] + delta**2 * (
+            running["count"] * moments["count"] / count
+        )
+        running["mean"] += delta * moments["count"] / count
+        running["count"] = count
+        running["min"] = min(running["min"], moments["min"])
+        running["max"] = max(running["max"], moments["max"])
+
+    for kind in ("quantiles", "distinct"):
+        for column, sketch in summary[kind].items():
+            if column in total[kind]:
+                total[kind][column].merge(sketch)
+            else:
+                total[kind][column] = sketch
+
+    for name, matrix in summary["correlation_sums"].items():
+        total["correlation_sums"][name] += matrix
+
+    for column, counts in summary["categories"].items():
+        total["categories"].setdefault(column, Counter()).update(counts)
+    return total
+
+
+class EDAProfiler:
+    """
+    A chunked, parallel profiler of a CSV file.
+
+    Args:
+        chunk_size (int): The number of rows parsed and summarized at a time.
+        max_workers (int): The number of worker processes; 1 summarizes the
+        chunks in this process.
+        sample_fraction (float): The fraction of rows read; below 1, the other
+        rows are skipped while parsing and counts are scaled up as estimates.
+        quantile_k (int): The accuracy parameter of the quantile sketches behind
+        the quantiles and histograms; the rank error is about 1.7 / k.
+        distinct_precision (int): The precision of the distinct count sketches;
+        the relative error is about 1.04 / sqrt(2**precision).
+        max_categories (int): The most distinct values counted per text column.
+        histogram_bins (int): The number of histogram bins per numeric column.
+        random_seed (int): The seed for row sampling and the quantile sketches.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 100_000,
+        max_workers: int = 1,
+        sample_fraction: float = 1.0,
+        quantile_k: int = 200,
+        distinct_precision: int = 12,
+        max_categories: int = 1_000,
+        histogram_bins: int = 10,
+        random_seed: int = 42,
+    ):
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.sample_fraction = sample_fraction
+        self.quantile_k = quantile_k
+        self.distinct_precision = distinct_precision
+        self.max_categories = max_categories
+        self.histogram_bins = histogram_bins
+        self.random_seed = random_seed
+
+    def read_chunks(self, file_path: str):
+        """
+        Parses the file chunk by chunk, skipping rows in sampling mode.
+
+        Args:
+            file_path (str): The path to the CSV file.
+
+        Returns:
+            Iterator[pd.DataFrame]: The chunks of the file.
+        """
+        skiprows = None
+        if self.sample_fraction < 1:
+            rng = random.Random(self.random_seed)
+            fraction = self.sample_fraction
+            skiprows = lambda row: row > 0 and rng.random() >= fraction  # noqa: E731
+        return pd.read_csv(
+            normpath(file_path), chunksize=self.chunk_size, skiprows=skiprows
+        )
+
+    def summarize_file(self, file_path: str) -> dict:
+        """
+        Summarizes every chunk of the file and merges the summaries. At most
+        two chunks per worker are in flight, which bounds memory use.
+
+        Args:
+            file_path (str): The path to the CSV file.
+
+        Returns:
+            dict: The merged summary.
+        """
+        chunks = self.read_chunks(file_path)
+        first_chunk = next(chunks)
+        numeric_columns = list(first_chunk.select_dtypes("number").columns)
+        shift = first_chunk[numeric_columns].mean().fillna(0).to_numpy()
+        options = (
+            numeric_columns,
+            shift,
+            self.quantile_k,
+            self.distinct_precision,
+            self.max_categories,
+        )
+
+        total = summarize_chunk(first_chunk, *options, [self.random_seed, 0])
+        if self.max_workers <= 1:
+            for chunk_idx, chunk in enumerate(chunks, start=1):
+                seed = [self.random_seed, chunk_idx]
+                summary = summarize_chunk(chunk, *options, seed)
+                total = merge_summaries(total, summary)
+            return total
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for chunk_idx, chunk in enumerate(chunks, start=1):
+                pending.add(
+                    executor.submit(
+                        summarize_chunk, chunk, *options, [self.random_seed, chunk_idx]
+                    )
+                )
+                if len(pending) >= 2 * self.max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        total = merge_summaries(total, future.result())
+            for future in pending:
+                total = merge_summaries(total, future.result())
+        return total
+
+    def correlations(self, summary: dict) -> pd.DataFrame:
+        """
+        Computes the Pearson correlation of every pair of numeric columns over
+        the rows where both are present.
+
+        Args:
+            summary (dict): The merged summary.
+
+        Returns:
+            pd.DataFrame: The correlation matrix.
+        """
+        sums = summary["correlation_sums"]
+        n, sx, sxx, sxy = sums["n"], sums["sx"], sums["sxx"], sums["sxy"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = n * sxy - sx * sx.T
+            variance_x = n * sxx - sx**2
+            correlation = covariance / np.sqrt(variance_x * variance_x.T)
+        columns = summary["numeric_columns"]
+        return pd.DataFrame(correlation, index=columns, columns=columns).round(3)
+
+    def profile(self, file_path: str) -> dict:
+        """
+        Profiles a CSV file in one chunked pass.
+
+        Args:
+            file_path (str): The path to the CSV file.
+
+        Raises:
+            CustomException: If the file cannot be read or profiled.
+
+        Returns:
+            dict: The `structure`, `datatypes`, `nulls`, `memory`, `distinct`,
+            `statistics` and `distributions` tables as flat dictionaries for
+            `dict_to_table`, the `top_values` of text columns, and the
+            `correlations` DataFrame.
+        """
+        try:
+            summary = self.summarize_file(file_path)
+            scale = 1 / self.sample_fraction
+            columns = summary["columns"]
+            row_count = summary["rows"]
+            null_count = sum(details["nulls"] for details in columns.values())
+            memory = sum(details["memory"] for details in columns.values())
+
+            structure = {
+                "Sampled": self.sample_fraction < 1,
+                "Row Count": round(row_count * scale),
+                "Rows Read": row_count,
+                "Column Count": len(columns),
+                "Total Datapoints": round(row_count * len(columns) * scale),
+                "Null Datapoints": round(null_count * scale),
+                "Non-Null Datapoints": round(
+                    (row_count * len(columns) - null_count) * scale
+                ),
+                "Total Memory Usage": round(memory * scale),
+                "Average Memory Usage": round(memory * scale / len(columns)),
+            }
+            datatypes = dict(Counter(details["dtype"] for details in columns.values()))
+            nulls = {
+                column: f"{details['nulls'] * scale:.0f} "
+                f"({100 * details['nulls'] / max(row_count, 1):.2f}%)"
+                for column, details in columns.items()
+            }
+            memory_usage = {
+                column: round(details["memory"] * scale)
+                for column, details in columns.items()
+            }
+            # Distinct counts do not scale with the rows, so they cover the rows read
+            distinct = {
+                column: sketch.count() for column, sketch in summary["distinct"].items()
+            }
+
+            statistics, distributions = {}, {}
+            for column, moments in summary["moments"].items():
+                std = np.sqrt(moments["m2"] / max(moments["count"] - 1, 1))
+                statistics[column] = (
+                    f"mean {moments['mean']:.4g} | std {std:.4g} | "
+                    f"min {moments['min']:.4g} | max {moments['max']:.4g}"
+                )
+                sketch = summary["quantiles"][column]
+                quantiles = sketch.quantile([0.25, 0.5, 0.75])
+                fractions, _ = sketch.histogram(self.histogram_bins)
+                distributions[column] = (
+                    f"p25 {quantiles[0]:.4g} | p50 {quantiles[1]:.4g} | "
+                    f"p75 {quantiles[2]:.4g} | histogram "
+                    f"{fractions.round(3).tolist()}"
+                )
+
+            top_values = {
+                column: dict(counts.most_common(10))
+                for column, counts in summary["categories"].items()
+            }
+
+            logger.info("Profiled %s rows of: %s", row_count, file_path)
+            return {
+                "structure": structure,
+                "datatypes": datatypes,
+                "nulls": nulls,
+                "memory": memory_usage,
+                "distinct": distinct,
+                "statistics": statistics,
+                "distributions": distributions,
+                "top_values": top_values,
+                "correlations": self.correlations(summary),
+            }
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
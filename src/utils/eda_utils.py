@@ -11,7 +11,9 @@ Functions include:
 - dataframe_structure: Returns various attributes associated with the dataframe
 - dict_to_table: Generate a pretty looking structure of the output
 - datatype_details: Prints the details of the datatype available in the dataframe
-- regression_metrics: Calculates various regression metrics.
+
+For files that do not fit in memory, use `EDAProfiler` in `src/utils/eda_profiler.py`,
+whose output tables also render with `dict_to_table`.
 """
 import pandas as pd
 from tabulate import tabulate
@@ -32,16 +34,18 @@ def dataframe_structure(dataframe: pd.DataFrame) -> dict:
     Returns:
         dict: A dictionary containing the structure details of the input DataFrame
     """
+    memory_usage = dataframe.memory_usage(deep=True)
+    null_count = int(dataframe.isnull().to_numpy().sum())
     structure_details = {
         "Dimensions": dataframe.ndim,
         "Shape": dataframe.shape,
         "Row Count": len(dataframe),
         "Column Count": len(dataframe.columns),
         "Total Datapoints": dataframe.size,
-        "Null Datapoints": dataframe.isnull().sum().sum(),
-        "Non-Null Datapoints": dataframe.notnull().sum().sum(),
-        "Total Memory Usage": dataframe.memory_usage(deep=True).sum(),
-        "Average Memory Usage": dataframe.memory_usage(deep=True).mean().round(),
+        "Null Datapoints": null_count,
+        "Non-Null Datapoints": dataframe.size - null_count,
+        "Total Memory Usage": memory_usage.sum(),
+        "Average Memory Usage": memory_usage.mean().round(),
     }
 
     return structure_details
@@ -75,10 +79,11 @@ def datatype_details(df: pd.DataFrame) -> str:
         to be determined.
 
     Returns:
-        str: A string message indicating the number of fields for each datatype
-        in the input DataFrame.
+        str: One line per datatype indicating the number of fields with that
+        datatype in the input DataFrame.
     """
-    available_dtypes = list(set([str(dt) for dt in df.dtypes]))
-    for dt in available_dtypes:
-        field_count = df.select_dtypes(dt).dtypes.count()
-        return f"There are {field_count} fields with {dt} datatype"
+    dtype_counts = df.dtypes.astype(str).value_counts()
+    return "\n".join(
+        f"There are {field_count} fields with {dt} datatype"
+        for dt, field_count in dtype_counts.items()
+    )
@@ -0,0 +1,307 @@
+"""
+This module provides a SQLite-backed job queue for running training and evaluation
+tasks from any number of worker processes, on one machine or on several machines
+sharing a filesystem. Tasks are claimed atomically with a lease; a task whose lease
+expires is handed to another worker, and a failed task is retried with exponential
+backoff until it runs out of attempts. Results are collected into one table.
+
+The database uses the rollback journal rather than WAL, because WAL relies on
+shared memory and does not work across machines on a network filesystem.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from os import makedirs
+from os.path import dirname, normpath
+
+from src.logger import logger
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim
+    ON tasks (status, available_at, lease_expires_at);
+CREATE TABLE IF NOT EXISTS results (
+    task_id INTEGER PRIMARY KEY REFERENCES tasks (task_id),
+    worker_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+"""
+
+
+class JobQueue:
+    """
+    A job queue stored in a single SQLite database file.
+
+    Args:
+        db_path (str): The path to the SQLite database file.
+        lease_s (float): How long a claimed task stays reserved for its worker.
+        retry_backoff_s (float): The base delay before a failed task is retried.
+    """
+
+    def __init__(self, db_path: str, lease_s: float = 300, retry_backoff_s: float = 5):
+        self.db_path = normpath(db_path)
+        self.lease_s = lease_s
+        self.retry_backoff_s = retry_backoff_s
+
+        makedirs(dirname(self.db_path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(SCHEMA_SQL)
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens a connection in autocommit mode so that transactions are started
+        explicitly with BEGIN IMMEDIATE.
+
+        Yields:
+            sqlite3.Connection: The open connection.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs a write transaction which holds the database write lock from the
+        start, so that concurrent claims cannot pick the same task.
+
+        Yields:
+            sqlite3.Connection: The connection inside the transaction.
+        """
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def task_key(payload: dict) -> str:
+        """
+        Computes a stable key for a task so that enqueueing is idempotent.
+
+        Args:
+            payload (dict): The task payload.
+
+        Returns:
+            str: The SHA-256 hex digest of the canonical JSON payload.
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def enqueue(self, payloads: list[dict], max_attempts: int = 3) -> int:
+        """
+        Adds tasks to the queue. Tasks that are already queued are skipped.
+
+        Args:
+            payloads (list[dict]): The task payloads.
+            max_attempts (int, optional): How many times a task may be tried.
+            Defaults to 3.
+
+        Returns:
+            int: The number of tasks added.
+        """
+        now = time.time()
+        rows = [
+            (self.task_key(payload), json.dumps(payload), max_attempts, now, now, now)
+            for payload in payloads
+        ]
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (task_key, payload, max_attempts, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = conn.total_changes - before
+        logger.info("%s tasks added to the queue at: %s", added, self.db_path)
+        return added
+
+    def claim(self, worker_id: str) -> dict | None:
+        """
+        Atomically claims the next available task: a pending task whose retry
+        delay has passed, or a running task whose lease has expired. Expired
+        tasks that have used all their attempts are marked as failed instead.
+
+        Args:
+            worker_id (str): The identifier of the claiming worker.
+
+        Returns:
+            dict | None: The task id, attempt number and payload, or None if no
+            task is available.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', last_error = 'lease expired', "
+                "updated_at = ? WHERE status = 'running' AND lease_expires_at < ? "
+                "AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT task_id, attempts, payload FROM tasks "
+                "WHERE (status = 'pending' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_expires_at < ?) "
+                "ORDER BY task_id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = 'running', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires_at = ?, updated_at = ? "
+                "WHERE task_id = ?",
+                (worker_id, now + self.lease_s, now, row["task_id"]),
+            )
+        return {
+            "task_id": row["task_id"],
+            "attempt": row["attempts"] + 1,
+            "payload": json.loads(row["payload"]),
+        }
+
+    def heartbeat(self, task_id: int, worker_id: str) -> bool:
+        """
+        Extends the lease of a task still owned by the worker.
+
+        Args:
+            task_id (int): The id of the claimed task.
+            worker_id (str): The identifier of the worker holding the lease.
+
+        Returns:
+            bool: False if the worker no longer owns the task.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires_at = ?, updated_at = ? "
+                "WHERE task_id = ? AND lease_owner = ? AND status = 'running'",
+                (now + self.lease_s, now, task_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self, task_id: int, worker_id: str, result: dict, duration_s: float
+    ) -> bool:
+        """
+        Marks a task as done and stores its result, provided the worker still
+        owns the task. A worker whose lease was taken over cannot overwrite the
+        new owner's outcome.
+
+        Args:
+            task_id (int): The id of the claimed task.
+            worker_id (str): The identifier of the worker holding the lease.
+            result (dict): The result of the task.
+            duration_s (float): How long the task took.
+
+        Returns:
+            bool: True if the result was recorded.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires_at = NULL, "
+                "updated_at = ? WHERE task_id = ? AND lease_owner = ? "
+                "AND status = 'running'",
+                (now, task_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO results (task_id, worker_id, payload, "
+                "result, duration_s, finished_at) SELECT task_id, ?, payload, ?, ?, ? "
+                "FROM tasks WHERE task_id = ?",
+                (worker_id, json.dumps(result), duration_s, now, task_id),
+            )
+        return True
+
+    def fail(self, task_id: int, worker_id: str, error: str) -> None:
+        """
+        Releases a task after an error. It is retried after an exponential
+        backoff, or marked as failed once it has used all its attempts.
+
+        Args:
+            task_id (int): The id of the claimed task.
+            worker_id (str): The identifier of the worker holding the lease.
+            error (str): The error message to record.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM tasks "
+                "WHERE task_id = ? AND lease_owner = ? AND status = 'running'",
+                (task_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return
+            exhausted = row["attempts"] >= row["max_attempts"]
+            retry_at = now + self.retry_backoff_s * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, last_error = ?, updated_at = ? "
+                "WHERE task_id = ?",
+                ("failed" if exhausted else "pending", retry_at, error, now, task_id),
+            )
+
+    def status_counts(self) -> dict:
+        """
+        Counts the tasks in each status.
+
+        Returns:
+            dict: The number of tasks per status.
+        """
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS task_count FROM tasks GROUP BY status"
+            ).fetchall()
+        return {row["status"]: row["task_count"] for row in rows}
+
+    def results(self) -> list[dict]:
+        """
+        Reads every recorded result.
+
+        Returns:
+            list[dict]: The task payload and result of each finished task.
+        """
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT task_id, worker_id, payload, result, duration_s, finished_at "
+                "FROM results ORDER BY task_id"
+            ).fetchall()
+        return [
+            {
+                "task_id": row["task_id"],
+                "worker_id": row["worker_id"],
+                "payload": json.loads(row["payload"]),
+                "result": json.loads(row["result"]),
+                "duration_s": row["duration_s"],
+                "finished_at": row["finished_at"],
+            }
+            for row in rows
+        ]
@@ -0,0 +1,142 @@
+"""
+This module is a minimal inference runtime for the exported linear model. It
+imports only NumPy and the standard library, not pandas, sklearn, PyYAML or the
+project logger, so a worker that only scores starts in a fraction of the time of
+`ModelPrediction`. The model is exported with `python -m src.pipelines.model_export`.
+
+The runtime repeats the exact operations of the fitted sklearn objects (median
+imputation, standardization, then a dot product with the coefficients), in the
+same order and dtype, so its predictions are identical to `ModelPrediction`.
+"""
+
+import json
+from os.path import splitext
+
+import numpy as np
+
+# Version of the .npz + .json export format read by this runtime
+FORMAT_VERSION = 1
+
+
+class LiteModel:
+    """
+    A linear model with its numeric preprocessing, loaded from an export.
+
+    Args:
+        features (list): The feature names, in model input order.
+        impute_values (np.array): The value replacing a missing feature.
+        mean (np.array): The standardization means.
+        scale (np.array): The standardization scales.
+        coef (np.array): The model coefficients.
+        intercept (float): The model intercept.
+        metadata (dict): The export metadata.
+    """
+
+    def __init__(
+        self,
+        features: list,
+        impute_values: np.array,
+        mean: np.array,
+        scale: np.array,
+        coef: np.array,
+        intercept: float,
+        metadata: dict = None,
+    ):
+        self.features = list(features)
+        self.impute_values = impute_values
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, npz_path: str, metadata_path: str = None) -> "LiteModel":
+        """
+        Loads an exported model.
+
+        Args:
+            npz_path (str): The path of the `.npz` arrays.
+            metadata_path (str, optional): The path of the `.json` metadata.
+            Defaults to None, meaning the `.npz` path with a `.json` extension.
+
+        Raises:
+            ValueError: If the export format is not supported.
+
+        Returns:
+            LiteModel: The model.
+        """
+        metadata_path = metadata_path or splitext(npz_path)[0] + ".json"
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported export format {metadata.get('format_version')}, "
+                f"expected {FORMAT_VERSION}"
+            )
+        with np.load(npz_path, allow_pickle=False) as arrays:
+            return cls(
+                metadata["features"],
+                arrays["impute_values"],
+                arrays["mean"],
+                arrays["scale"],
+                arrays["coef"],
+                arrays["intercept"][()],
+                metadata,
+            )
+
+    def project(self) -> "LiteModel":
+        """
+        Drops the features whose coefficient is exactly zero, which never change
+        a prediction. A model with no nonzero coefficient keeps its first feature,
+        so the row count of the input stays known.
+
+        Returns:
+            LiteModel: The model restricted to its active features.
+        """
+        active = self.coef != 0
+        if not active.any():
+            active[0] = True
+        return LiteModel(
+            [name for name, keep in zip(self.features, active) if keep],
+            self.impute_values[active],
+            self.mean[active],
+            self.scale[active],
+            self.coef[active],
+            self.intercept,
+            self.metadata,
+        )
+
+    def to_array(self, data) -> np.array:
+        """
+        Arranges the input as a float64 matrix in model input order.
+
+        Args:
+            data: A mapping of feature name to values (a dict of lists or arrays,
+            or a pandas DataFrame), or an array already in model input order.
+
+        Returns:
+            np.array: The input matrix, one row per sample.
+        """
+        if hasattr(data, "keys"):
+            columns = [np.asarray(data[name], np.float64) for name in self.features]
+            return np.column_stack(columns)
+        return np.array(data, dtype=np.float64, ndmin=2)
+
+    def predict(self, data) -> np.array:
+        """
+        Predicts the quality of each sample.
+
+        Args:
+            data: The input features, as accepted by `to_array`.
+
+        Returns:
+            np.array: The predictions.
+        """
+        x = self.to_array(data)
+        missing = np.isnan(x)
+        if missing.any():
+            x = np.where(missing, self.impute_values, x)
+        x -= self.mean
+        x /= self.scale
+        return x @ self.coef + self.intercept
@@ -0,0 +1,386 @@
+"""
+This module provides a local model registry and the watcher that hot-swaps the
+model served by `ModelPrediction`.
+
+A registered version is a (preprocessor, model) bundle: both payloads are kept in
+the artifact store under their hashes, and `versions/v<n>.json` records the two
+hashes with the source fingerprints and metadata. Versions are immutable. Stage
+labels such as `staging` and `production` are pointer files in `stages/`, each
+naming one version and replaced atomically, so promoting or rolling back a model
+is a single rename.
+
+A serving process keeps the bundle of its stage in a `RegistryWatcher`. A
+background thread polls the stage pointer, loads a newly promoted bundle while
+the previous one keeps serving, then swaps the single bundle reference. Each
+request reads that reference once, so it is served entirely by one version: a
+preprocessor of one version is never paired with the model of another.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from os import listdir
+from os.path import exists, join, normpath
+from typing import Any
+
+from src.constants import CONFIGS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.artifact_store import ArtifactStore
+from src.utils.basic_utils import file_lock, read_yaml, write_atomically
+
+# One watcher per stage of the configured registry, shared by every
+# ModelPrediction instance, and the lock under which watchers are created
+WATCHERS = {}
+WATCHERS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    A preprocessor and the model trained on its output, served together.
+    """
+
+    version: str
+    preprocessor: Any
+    model: Any
+    manifest: dict = field(default_factory=dict)
+
+
+class ModelRegistry:
+    """
+    A local registry of versioned model bundles with stage pointers.
+
+    Attributes
+    ----------
+    root_dir : str
+        The directory holding the `versions/` and `stages/` directories.
+    store : ArtifactStore
+        The store holding the preprocessor and model payloads.
+    stages : list
+        The allowed stage names.
+    lock_timeout_s : float
+        The longest wait for the registry lock.
+
+    Methods
+    -------
+    register(preprocessor_path, model_path, metadata, stage):
+        Registers a preprocessor and model as a new version.
+    promote(version, stage):
+        Points a stage at a version.
+    stage_version(stage):
+        Returns the version a stage points at.
+    load_bundle(version):
+        Loads the preprocessor and model of a version.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        store: ArtifactStore,
+        stages: list = ("staging", "production"),
+        lock_timeout_s: float = 60,
+    ):
+        self.root_dir = normpath(root_dir)
+        self.store = store
+        self.stages = list(stages)
+        self.lock_path = join(self.root_dir, ".registry.lock")
+        self.lock_timeout_s = lock_timeout_s
+
+    @classmethod
+    def from_configs(cls, configs: dict = None) -> "ModelRegistry":
+        """
+        Creates the registry described by the `model_registry` configuration,
+        backed by the configured artifact store.
+
+        Args:
+            configs (dict, optional): The configuration. Defaults to None, meaning
+            it is read from the configuration file.
+
+        Returns:
+            ModelRegistry: The registry.
+        """
+        configs = configs or read_yaml(CONFIGS).model_registry
+        return cls(
+            configs.root_dir,
+            ArtifactStore.from_configs(),
+            configs.stages,
+            configs.lock_timeout_s,
+        )
+
+    def version_path(self, version: int) -> str:
+        """Returns the path of the manifest of a version."""
+        return join(self.root_dir, "versions", f"v{version}.json")
+
+    def stage_path(self, stage: str) -> str:
+        """Returns the path of the pointer of a stage."""
+        return join(self.root_dir, "stages", f"{stage}.json")
+
+    def versions(self) -> list:
+        """Returns the registered versions, oldest first."""
+        versions_dir = join(self.root_dir, "versions")
+        if not exists(versions_dir):
+            return []
+        return sorted(
+            int(name[1:-5])
+            for name in listdir(versions_dir)
+            if name.startswith("v") and name.endswith(".json")
+        )
+
+    def manifest(self, version: int) -> dict:
+        """
+        Reads the manifest of a version.
+
+        Args:
+            version (int): The version number.
+
+        Raises:
+            FileNotFoundError: If the version is not registered.
+
+        Returns:
+            dict: The manifest.
+        """
+        path = self.version_path(version)
+        if not exists(path):
+            raise FileNotFoundError(f"Model version v{version} is not registered")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def register(
+        self,
+        preprocessor_path: str,
+        model_path: str,
+        metadata: dict = None,
+        stage: str = None,
+    ) -> int:
+        """
+        Registers a fitted preprocessor and model as the next version. The files
+        are stored byte for byte, so a version loads exactly what was trained.
+
+        Args:
+            preprocessor_path (str): The path of the preprocessor joblib file.
+            model_path (str): The path of the model joblib file.
+            metadata (dict, optional): Free-form metadata, e.g. scores or the run
+            id. Defaults to None.
+            stage (str, optional): A stage to point at the new version.
+            Defaults to None.
+
+        Raises:
+            CustomException: If the files cannot be registered.
+
+        Returns:
+            int: The new version number.
+        """
+        try:
+            hashes = {}
+            sources = (("preprocessor", preprocessor_path), ("model", model_path))
+            for role, path in sources:
+                with open(path, "rb") as f:
+                    payload = f.read()
+                manifest = {"kind": "object", "role": role, "source": normpath(path)}
+                hashes[role] = self.store.put(None, payload, None, manifest)
+
+            with file_lock(self.lock_path, timeout_s=self.lock_timeout_s):
+                version = max(self.versions(), default=0) + 1
+                manifest = {
+                    "version": version,
+                    "preprocessor": hashes["preprocessor"],
+                    "model": hashes["model"],
+                    "model_version": hashes["model"][:12],
+                    "metadata": metadata or {},
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                write_atomically(
+                    self.version_path(version),
+                    json.dumps(manifest, indent=4).encode(),
+                )
+                if stage is not None:
+                    self.set_stage(version, stage)
+
+            logger.info("Model registered as v%s", version)
+            return version
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def set_stage(self, version: int, stage: str) -> None:
+        """
+        Atomically points a stage at a version, keeping the previous version for
+        a rollback. The caller holds the registry lock.
+        """
+        if stage not in self.stages:
+            raise ValueError(f"Unknown stage {stage}, expected one of {self.stages}")
+        self.manifest(version)
+        pointer = {
+            "stage": stage,
+            "version": version,
+            "previous": self.stage_version(stage),
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        write_atomically(self.stage_path(stage), json.dumps(pointer).encode())
+        logger.info("Stage %s points at v%s", stage, version)
+
+    def promote(self, version: int, stage: str) -> None:
+        """
+        Points a stage at a registered version. Serving processes watching the
+        stage switch to it at their next poll.
+
+        Args:
+            version (int): The version number.
+            stage (str): The stage name, e.g. `production`.
+
+        Raises:
+            CustomException: If the version or stage does not exist.
+        """
+        try:
+            with file_lock(self.lock_path, timeout_s=self.lock_timeout_s):
+                self.set_stage(version, stage)
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def stage_version(self, stage: str) -> int:
+        """
+        Returns the version a stage points at, or None if it was never set.
+
+        Args:
+            stage (str): The stage name.
+
+        Returns:
+            int: The version number.
+        """
+        path = self.stage_path(stage)
+        if not exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["version"]
+
+    def load_bundle(self, version: int) -> ModelBundle:
+        """
+        Loads the preprocessor and model of a version, checking both payloads
+        against their hashes.
+
+        Args:
+            version (int): The version number.
+
+        Raises:
+            CustomException: If the version cannot be loaded.
+
+        Returns:
+            ModelBundle: The bundle.
+        """
+        try:
+            manifest = self.manifest(version)
+            return ModelBundle(
+                f"v{version}",
+                self.store.get(manifest["preprocessor"], verify=True),
+                self.store.get(manifest["model"], verify=True),
+                manifest,
+            )
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+
+class RegistryWatcher:
+    """
+    Keeps the bundle of one stage loaded and switches to a newly promoted version
+    in the background.
+
+    Attributes
+    ----------
+    registry : ModelRegistry
+        The watched registry.
+    stage : str
+        The watched stage.
+    poll_interval_s : float
+        The time between two reads of the stage pointer.
+    bundle : ModelBundle
+        The bundle currently served. Read it once per request.
+
+    Methods
+    -------
+    refresh():
+        Loads and switches to the stage's version if it changed.
+    close():
+        Stops the background thread.
+    """
+
+    def __init__(self, registry: ModelRegistry, stage: str, poll_interval_s: float):
+        self.registry = registry
+        self.stage = stage
+        self.poll_interval_s = poll_interval_s
+
+        version = registry.stage_version(stage)
+        if version is None:
+            raise FileNotFoundError(f"No model version is promoted to {stage}")
+        self.bundle = registry.load_bundle(version)
+        self.loaded_version = version
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.watch, name=f"RegistryWatcher-{stage}", daemon=True
+        )
+        self.thread.start()
+
+    @classmethod
+    def from_configs(cls, stage: str) -> "RegistryWatcher":
+        """
+        Returns the watcher of a stage of the configured registry, creating it on
+        first use.
+
+        Args:
+            stage (str): The stage name.
+
+        Returns:
+            RegistryWatcher: The shared watcher.
+        """
+        watcher = WATCHERS.get(stage)
+        if watcher is not None:
+            return watcher
+        with WATCHERS_LOCK:
+            if stage not in WATCHERS:
+                configs = read_yaml(CONFIGS).model_registry
+                WATCHERS[stage] = cls(
+                    ModelRegistry.from_configs(configs), stage, configs.poll_interval_s
+                )
+            return WATCHERS[stage]
+
+    def refresh(self) -> bool:
+        """
+        Loads the version the stage points at, if it is not the one served, and
+        then replaces the served bundle. Requests keep using the previous bundle
+        until the new one is fully loaded.
+
+        Returns:
+            bool: Whether the served version changed.
+        """
+        version = self.registry.stage_version(self.stage)
+        if version is None or version == self.loaded_version:
+            return False
+        bundle = self.registry.load_bundle(version)
+        previous, self.bundle = self.bundle, bundle
+        self.loaded_version = version
+        logger.info(
+            "Serving %s from %s, previously %s",
+            bundle.version,
+            self.stage,
+            previous.version,
+        )
+        return True
+
+    def watch(self) -> None:
+        """Polls the stage pointer until closed, keeping the bundle on errors."""
+        while not self.stop_event.wait(self.poll_interval_s):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(
+                    "Model refresh failed, keeping %s: %s", self.bundle.version, e
+                )
+
+    def close(self) -> None:
+        """Stops the background thread."""
+        self.stop_event.set()
+        self.thread.join()
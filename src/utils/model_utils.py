@@ -2,14 +2,153 @@
 """
 
 import json
-import os
-from os.path import dirname, normpath
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from os.path import normpath
 
+import joblib
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 from src.exception import CustomException
 from src.logger import logger
+from src.utils.basic_utils import atomic_path
+
+# Model and memory-mapped array held by each chunk worker process
+WORKER_MODEL = None
+WORKER_ARRAY = None
+
+
+class RegressionMetricsAccumulator:
+    """
+    A mergeable accumulator of regression metrics. It is updated chunk by chunk
+    and keeps only running sums, so metrics can be computed over streams that
+    do not fit in memory. Partial accumulators from parallel workers can be
+    combined with `merge`.
+
+    The spread of the target needed for R2 is tracked as a running mean and sum
+    of squared deviations, combined with Chan's parallel update, which stays
+    numerically stable over long streams.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sum_error = 0.0
+        self.sum_abs_error = 0.0
+        self.sum_squared_error = 0.0
+        self.sum_pct_error = 0.0
+        self.sum_abs_pct_error = 0.0
+        self.target_mean = 0.0
+        self.target_m2 = 0.0
+
+    def combine_target_moments(self, count: int, mean: float, m2: float) -> None:
+        """
+        Folds the count, mean and sum of squared deviations of another set of
+        targets into the running ones.
+
+        Args:
+            count (int): The number of targets in the other set.
+            mean (float): The mean of the other set.
+            m2 (float): The sum of squared deviations from the mean of the other set.
+        """
+        total = self.count + count
+        if total == 0:
+            return
+        delta = mean - self.target_mean
+        self.target_mean += delta * count / total
+        self.target_m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def update(
+        self, y_true: np.array, y_pred: np.array
+    ) -> "RegressionMetricsAccumulator":
+        """
+        Adds a chunk of targets and predictions. The errors are computed once
+        and every running sum is derived from them.
+
+        Args:
+            y_true (np.array): Ground truth (correct) target values.
+            y_pred (np.array): Estimated target values.
+
+        Returns:
+            RegressionMetricsAccumulator: The updated accumulator.
+        """
+        y_true = np.asarray(y_true, dtype=float).ravel()
+        y_pred = np.asarray(y_pred, dtype=float).ravel()
+        if len(y_true) == 0:
+            return self
+
+        errors = y_true - y_pred
+        abs_errors = np.abs(errors)
+        self.sum_error += errors.sum()
+        self.sum_abs_error += abs_errors.sum()
+        self.sum_squared_error += errors @ errors
+        self.sum_pct_error += (errors / y_true).sum()
+        self.sum_abs_pct_error += (abs_errors / np.abs(y_true)).sum()
+
+        chunk_mean = y_true.mean()
+        deviations = y_true - chunk_mean
+        self.combine_target_moments(len(y_true), chunk_mean, deviations @ deviations)
+        return self
+
+    def merge(
+        self, other: "RegressionMetricsAccumulator"
+    ) -> "RegressionMetricsAccumulator":
+        """
+        Folds another accumulator into this one.
+
+        Args:
+            other (RegressionMetricsAccumulator): The accumulator to merge.
+
+        Returns:
+            RegressionMetricsAccumulator: The updated accumulator.
+        """
+        self.sum_error += other.sum_error
+        self.sum_abs_error += other.sum_abs_error
+        self.sum_squared_error += other.sum_squared_error
+        self.sum_pct_error += other.sum_pct_error
+        self.sum_abs_pct_error += other.sum_abs_pct_error
+        self.combine_target_moments(other.count, other.target_mean, other.target_m2)
+        return self
+
+    def compute(self, n_features: int, decimals: int | None = 2) -> dict:
+        """
+        Computes the regression metrics from the running sums.
+
+        Args:
+            n_features (int): The number of predictors, used by adjusted R2.
+            decimals (int | None, optional): The number of decimals kept.
+            Defaults to 2; None keeps full precision.
+
+        Raises:
+            ValueError: If no rows were accumulated.
+
+        Returns:
+            dict: The same metrics as `regression_metrics`.
+        """
+        n = self.count
+        if n == 0:
+            raise ValueError("Cannot compute regression metrics of zero rows")
+        mse = self.sum_squared_error / n
+
+        # R2 follows scikit-learn when the target is constant
+        if self.target_m2 > 0:
+            r2 = 1 - self.sum_squared_error / self.target_m2
+        else:
+            r2 = 1.0 if self.sum_squared_error == 0 else 0.0
+
+        adj_r2 = 1 - ((1 - r2) * (n - 1) / (n - n_features - 1))
+
+        metrics = {
+            "MAE": self.sum_abs_error / n,
+            "MSE": mse,
+            "RMSE": np.sqrt(mse),
+            "MPE": self.sum_pct_error / n * 100,
+            "MAPE": self.sum_abs_pct_error / n * 100,
+            "R2-Score": r2,
+            "Adjusted R2-Score": adj_r2,
+        }
+        if decimals is None:
+            return {name: float(value) for name, value in metrics.items()}
+        return {name: round(float(value), decimals) for name, value in metrics.items()}
 
 
 def regression_metrics(
@@ -33,41 +172,179 @@ def regression_metrics(
             - R2-Score (float): Coefficient of determination
             - Adjusted R2-Score (float): Accounts for the number of predictors
     """
+    accumulator = RegressionMetricsAccumulator().update(y_true, y_pred)
+    return accumulator.compute(n_features=features_shape[1])
 
-    # get MAE, MSE and R2 values
-    mae = mean_absolute_error(y_true, y_pred)
-    mse = mean_squared_error(y_true, y_pred)
-    r2 = r2_score(y_true, y_pred)
-
-    # calculate Root Mean Squared Error (RMSE)
-    rmse = np.sqrt(mse)
 
-    # calculate: Mean Percentage Error(MPE)
-    mpe = np.mean((y_true - y_pred) / y_true) * 100
+def batched_regression_metrics(
+    y_true: np.array, y_pred: np.array, n_features: int
+) -> dict:
+    """
+    This function calculates the regression metrics for many samples at once.
+    Each row of the inputs is one sample, and every metric is computed along the
+    rows with array operations.
 
-    # calculate: Mean Absolute Percentage Error (MAPE)
-    mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+    Args:
+        y_true (np.array): Ground truth values, one sample per row.
+        y_pred (np.array): Estimated values, one sample per row.
+        n_features (int): The number of predictors, used by adjusted R2.
 
-    # get number of observations (n)
-    n = features_shape[0]
+    Returns:
+        dict: The metric names of `regression_metrics`, each mapped to an array
+        with one unrounded value per sample.
+    """
+    n = y_true.shape[1]
+    errors = y_true - y_pred
+    abs_errors = np.abs(errors)
 
-    # get number of predictors/features (p)
-    p = features_shape[1]
+    mse = np.einsum("ij,ij->i", errors, errors) / n
+    deviations = y_true - y_true.mean(axis=1, keepdims=True)
+    sst = np.einsum("ij,ij->i", deviations, deviations)
 
-    # calculate adjusted-R2
-    adj_r2 = 1 - ((1 - r2) * (n - 1) / (n - p - 1))
+    # R2 follows scikit-learn when the target is constant
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(sst > 0, 1 - mse * n / sst, np.where(mse == 0, 1.0, 0.0))
 
-    regression_metrics_dict = {
-        "MAE": round(mae, 2),
-        "MSE": round(mse, 2),
-        "RMSE": round(rmse, 2),
-        "MPE": round(mpe, 2),
-        "MAPE": round(mape, 2),
-        "R2-Score": round(r2, 2),
-        "Adjusted R2-Score": round(adj_r2, 2),
+    return {
+        "MAE": abs_errors.mean(axis=1),
+        "MSE": mse,
+        "RMSE": np.sqrt(mse),
+        "MPE": (errors / y_true).mean(axis=1) * 100,
+        "MAPE": (abs_errors / np.abs(y_true)).mean(axis=1) * 100,
+        "R2-Score": r2,
+        "Adjusted R2-Score": 1 - ((1 - r2) * (n - 1) / (n - n_features - 1)),
     }
 
-    return regression_metrics_dict
+
+def bootstrap_metrics(
+    y_true: np.array,
+    y_pred: np.array,
+    n_features: int,
+    n_resamples: int = 10_000,
+    confidence_level: float = 0.95,
+    batch_memory_mb: float = 8,
+    n_jobs: int = 1,
+    random_seed: int = 42,
+) -> dict:
+    """
+    This function computes percentile bootstrap confidence intervals for every
+    metric of `regression_metrics`. The resample indices of a batch are drawn as
+    one matrix and the metrics of the whole batch are computed with array
+    operations. Batches can run on several threads; each batch has its own
+    seed, so the result does not depend on `n_jobs`.
+
+    Args:
+        y_true (np.array): Ground truth (correct) target values.
+        y_pred (np.array): Estimated target values.
+        n_features (int): The number of predictors, used by adjusted R2.
+        n_resamples (int, optional): The number of bootstrap resamples.
+        Defaults to 10,000.
+        confidence_level (float, optional): The confidence level of the
+        intervals. Defaults to 0.95.
+        batch_memory_mb (float, optional): The size of each (resamples, rows)
+        matrix of a batch, from which the number of resamples per batch is
+        derived. A batch holds about six such matrices at its peak, per thread.
+        Defaults to 8.
+        n_jobs (int, optional): The number of threads. Defaults to 1.
+        random_seed (int, optional): The seed for the resample indices.
+        Defaults to 42.
+
+    Returns:
+        dict: For each metric, the lower and upper bounds and the standard error.
+    """
+    y_true = np.asarray(y_true, dtype=float).ravel()
+    y_pred = np.asarray(y_pred, dtype=float).ravel()
+    n = len(y_true)
+
+    # One resample matrix of float64 values fits in the memory budget
+    batch_size = max(1, int(batch_memory_mb * 2**20) // (8 * n))
+    batch_starts = range(0, n_resamples, batch_size)
+    batch_sizes = [min(batch_size, n_resamples - start) for start in batch_starts]
+    seeds = np.random.SeedSequence(random_seed).spawn(len(batch_sizes))
+
+    def run_batch(size: int, seed: np.random.SeedSequence) -> dict:
+        indices = np.random.default_rng(seed).integers(0, n, size=(size, n))
+        return batched_regression_metrics(y_true[indices], y_pred[indices], n_features)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        batches = list(executor.map(run_batch, batch_sizes, seeds))
+
+    alpha = (1 - confidence_level) / 2
+    intervals = {}
+    for metric in batches[0]:
+        values = np.concatenate([batch[metric] for batch in batches])
+        lower, upper = np.nanquantile(values, [alpha, 1 - alpha])
+        intervals[metric] = {
+            "lower": round(float(lower), 2),
+            "upper": round(float(upper), 2),
+            "std_error": round(float(np.nanstd(values, ddof=1)), 4),
+        }
+    return intervals
+
+
+def init_chunk_worker(model_path: str, array_path: str) -> None:
+    """
+    Loads the model and memory-maps the array once per worker process.
+
+    Args:
+        model_path (str): The path to the trained model.
+        array_path (str): The path to the array of features followed by target.
+    """
+    global WORKER_MODEL, WORKER_ARRAY
+    WORKER_MODEL = joblib.load(normpath(model_path))
+    WORKER_ARRAY = np.load(normpath(array_path), mmap_mode="r")
+
+
+def accumulate_chunk(start: int, stop: int) -> RegressionMetricsAccumulator:
+    """
+    Predicts one chunk of rows in a worker process and accumulates its metrics.
+
+    Args:
+        start (int): The first row of the chunk.
+        stop (int): The row after the last row of the chunk.
+
+    Returns:
+        RegressionMetricsAccumulator: The metrics of the chunk.
+    """
+    chunk = np.asarray(WORKER_ARRAY[start:stop])
+    y_pred = WORKER_MODEL.predict(chunk[:, :-1])
+    return RegressionMetricsAccumulator().update(chunk[:, -1], y_pred)
+
+
+def streaming_regression_metrics(
+    model_path: str, array_path: str, chunk_size: int = 1_000_000, n_jobs: int = None
+) -> dict:
+    """
+    This function computes regression metrics over an array that does not fit in
+    memory. The array is memory-mapped and split into chunks which are predicted
+    and accumulated in a process pool, and the partial accumulators are merged.
+
+    Args:
+        model_path (str): The path to the trained model.
+        array_path (str): The path to the .npy array of features followed by target.
+        chunk_size (int, optional): The number of rows per chunk. Defaults to 1,000,000.
+        n_jobs (int, optional): The number of worker processes. Defaults to None,
+        meaning the number of CPUs.
+
+    Returns:
+        dict: The same metrics as `regression_metrics`.
+    """
+    array = np.load(normpath(array_path), mmap_mode="r")
+    row_count, column_count = array.shape
+    starts = list(range(0, row_count, chunk_size))
+    stops = [min(start + chunk_size, row_count) for start in starts]
+
+    total = RegressionMetricsAccumulator()
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=init_chunk_worker,
+        initargs=(model_path, array_path),
+    ) as executor:
+        for partial in executor.map(accumulate_chunk, starts, stops):
+            total.merge(partial)
+
+    logger.info("Metrics accumulated over %s rows in %s chunks", row_count, len(starts))
+    return total.compute(n_features=column_count - 1)
 
 
 def log_scores(
@@ -98,11 +375,10 @@ def log_scores(
     score.update(kwargs)
 
     save_path = normpath(filepath)
-    os.makedirs(dirname(save_path), exist_ok=True)
     try:
-        with open(save_path, "w", encoding="utf-8") as f:
-            score_json = json.dumps(score)
-            json.dump(score_json, f, indent=4)
+        with atomic_path(save_path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(score, f, indent=4)
         logger.info("json file saved at: %s", save_path)
     except Exception as e:
         logger.error(CustomException(e))
@@ -0,0 +1,271 @@
+"""
+This module provides a structured event log for the prediction path. A sampled
+fraction of requests is written as JSON lines with the input features, output,
+model version and latency; every request, sampled or not, updates in-memory
+counters which a background thread writes as a summary event every interval,
+including intervals without requests. Events go through a bounded queue to a
+background writer with size-based file rotation, so the request path never waits
+on disk I/O.
+"""
+
+import atexit
+import json
+import queue
+import random
+import threading
+import time
+from logging import INFO, Formatter, Logger
+from logging.handlers import QueueListener, RotatingFileHandler
+from os import makedirs
+from os.path import dirname, normpath
+
+import numpy as np
+import pandas as pd
+
+from src.logger import BoundedQueueHandler
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf"))
+
+# One event log per file, shared by every ModelPrediction instance
+EVENT_LOGS = {}
+
+
+class PredictionCounters:
+    """
+    Aggregate statistics of every request since the last summary.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.request_count = 0
+        self.sampled_count = 0
+        self.error_count = 0
+        self.row_count = 0
+        self.predicted_row_count = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS_MS)
+        self.prediction_sum = 0.0
+        self.prediction_sum_sq = 0.0
+        self.model_versions = {}
+
+    def update(
+        self,
+        row_count: int,
+        latency_ms: float,
+        predictions: np.array,
+        model_version: str,
+        sampled: bool,
+        failed: bool,
+    ) -> None:
+        """Adds one request to the counters."""
+        self.request_count += 1
+        self.sampled_count += sampled
+        self.error_count += failed
+        self.row_count += row_count
+        self.latency_sum_ms += latency_ms
+        self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+        bucket = int(np.searchsorted(LATENCY_BUCKETS_MS, latency_ms))
+        self.latency_histogram[bucket] += 1
+        if predictions is not None and len(predictions):
+            self.predicted_row_count += len(predictions)
+            self.prediction_sum += float(np.sum(predictions))
+            self.prediction_sum_sq += float(np.dot(predictions, predictions))
+        self.model_versions[model_version] = (
+            self.model_versions.get(model_version, 0) + 1
+        )
+
+    def to_event(self) -> dict:
+        """
+        Summarizes the counters as a summary event.
+
+        Returns:
+            dict: The summary event.
+        """
+        predicted_rows = self.predicted_row_count
+        mean = variance = None
+        if predicted_rows:
+            mean = self.prediction_sum / predicted_rows
+            variance = max(self.prediction_sum_sq / predicted_rows - mean**2, 0.0)
+        return {
+            "event": "summary",
+            "window_start": self.started_at,
+            "window_end": time.time(),
+            "request_count": self.request_count,
+            "sampled_count": self.sampled_count,
+            "error_count": self.error_count,
+            "row_count": self.row_count,
+            "latency_mean_ms": (
+                self.latency_sum_ms / self.request_count if self.request_count else None
+            ),
+            "latency_max_ms": self.latency_max_ms,
+            "latency_histogram_ms": {
+                str(bound): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_histogram)
+            },
+            "prediction_mean": mean,
+            "prediction_std": None if variance is None else float(np.sqrt(variance)),
+            "model_versions": self.model_versions,
+        }
+
+
+class PredictionEventLog:
+    """
+    A sampled JSON-lines log of prediction requests with aggregate counters.
+
+    Args:
+        path (str): The path of the event log file.
+        sample_rate (float): The fraction of requests written as events.
+        max_bytes (int): The size at which the file is rotated.
+        backup_count (int): The number of rotated files kept.
+        summary_interval_s (float): How often the counters are written.
+        max_rows_per_event (int): The most input rows written per event.
+        queue_size (int): The size of the event queue; sampled events are
+        dropped when it is full.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 0.01,
+        max_bytes: int = 10_000_000,
+        backup_count: int = 5,
+        summary_interval_s: float = 60,
+        max_rows_per_event: int = 10,
+        queue_size: int = 10_000,
+    ):
+        self.path = normpath(path)
+        self.sample_rate = sample_rate
+        self.summary_interval_s = summary_interval_s
+        self.max_rows_per_event = max_rows_per_event
+
+        makedirs(dirname(self.path) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(Formatter("%(message)s"))
+
+        # A standalone logger, so events never reach the project log handlers
+        self.queue_handler = BoundedQueueHandler(
+            queue.Queue(maxsize=queue_size), "drop", block_timeout_s=0
+        )
+        self.event_logger = Logger("PredictionEvents", level=INFO)
+        self.event_logger.addHandler(self.queue_handler)
+        self.listener = QueueListener(self.queue_handler.queue, file_handler)
+        self.listener.start()
+
+        self.lock = threading.Lock()
+        self.closed = False
+        self.counters = PredictionCounters()
+        self.next_summary_at = time.monotonic() + summary_interval_s
+        self.stop_event = threading.Event()
+        self.summary_thread = threading.Thread(
+            target=self.write_summaries, name="PredictionEventSummaries", daemon=True
+        )
+        self.summary_thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_configs(cls, configs: dict) -> "PredictionEventLog":
+        """
+        Returns the event log of the configured file, creating it on first use.
+
+        Args:
+            configs (dict): The `prediction_events` configuration.
+
+        Returns:
+            PredictionEventLog: The shared event log.
+        """
+        path = normpath(configs.path)
+        if path not in EVENT_LOGS:
+            EVENT_LOGS[path] = cls(
+                path,
+                sample_rate=configs.sample_rate,
+                max_bytes=configs.max_bytes,
+                backup_count=configs.backup_count,
+                summary_interval_s=configs.summary_interval_s,
+                max_rows_per_event=configs.max_rows_per_event,
+            )
+        return EVENT_LOGS[path]
+
+    def write(self, event: dict) -> None:
+        """Queues one event as a JSON line."""
+        self.event_logger.info(json.dumps(event, default=str))
+
+    def record(
+        self,
+        features: pd.DataFrame,
+        predictions: np.array,
+        latency_s: float,
+        model_version: str,
+        error: str = None,
+    ) -> None:
+        """
+        Records one prediction request. Only sampled requests and failures are
+        serialized; every request updates the counters.
+
+        Args:
+            features (pd.DataFrame): The input features.
+            predictions (np.array): The predictions, or None if the request failed.
+            latency_s (float): The time taken by the request.
+            model_version (str): The version of the model that served it.
+            error (str, optional): The error message of a failed request.
+        """
+        latency_ms = latency_s * 1000
+        sampled = error is not None or random.random() < self.sample_rate
+        with self.lock:
+            self.counters.update(
+                len(features),
+                latency_ms,
+                predictions,
+                model_version,
+                sampled,
+                error is not None,
+            )
+
+        if sampled:
+            event = {
+                "event": "prediction",
+                "timestamp": time.time(),
+                "model_version": model_version,
+                "latency_ms": latency_ms,
+                "row_count": len(features),
+                "features": features.head(self.max_rows_per_event).to_dict("records"),
+                "predictions": (
+                    None
+                    if predictions is None
+                    else np.asarray(predictions)[: self.max_rows_per_event].tolist()
+                ),
+            }
+            if error is not None:
+                event["error"] = error
+            self.write(event)
+
+    def write_summaries(self) -> None:
+        """
+        Writes the counters when each summary interval ends, whether or not
+        requests arrive, until closed.
+        """
+        while not self.stop_event.wait(
+            max(0.0, self.next_summary_at - time.monotonic())
+        ):
+            with self.lock:
+                summary = self.counters.to_event()
+                self.counters = PredictionCounters()
+                self.next_summary_at = time.monotonic() + self.summary_interval_s
+            self.write(summary)
+
+    def close(self) -> None:
+        """Writes the last summary and flushes the queue."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.stop_event.set()
+        self.summary_thread.join()
+        with self.lock:
+            if self.counters.request_count:
+                self.write(self.counters.to_event())
+                self.counters = PredictionCounters()
+        self.listener.stop()
@@ -0,0 +1,287 @@
+"""
+This module provides an opt-in profiling mode for the pipeline stages and the
+prediction path. It is switched on by setting the `WINE_PROFILE` environment
+variable (`python main.py --profile` sets it), and costs a single environment
+lookup per call otherwise.
+
+Each profiled section is measured two ways: cProfile gives exact call counts and
+times, and a sampling thread records the call stack of the profiled thread every
+few milliseconds. For each section the profiler writes
+`<section>.prof` (open it with pstats or snakeviz) and `<section>.collapsed`
+(one `frame;frame;frame count` line per stack, the input of flamegraph.pl and
+speedscope), and appends the top-N hotspots to `report.txt` in the run directory.
+Sections that run many times, such as predictions, are accumulated and written
+at exit.
+"""
+
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from os.path import basename, join, normpath
+
+import yaml
+
+from src.constants import CONFIGS
+from src.logger import get_logger
+
+logger = get_logger("profiling")
+
+PROFILE_ENV = "WINE_PROFILE"
+
+# Defaults used when the configuration file has no profiling section
+DEFAULT_PROFILING_CONFIGS = {
+    "output_dir": "profiles/",
+    "sample_interval_ms": 5,
+    "top_n": 20,
+}
+
+
+def profiling_enabled() -> bool:
+    """
+    Checks whether profiling mode is on.
+
+    Returns:
+        bool: True if `WINE_PROFILE` is set to a value other than 0 or false.
+    """
+    return os.getenv(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+def frame_label(frame) -> str:
+    """
+    Formats a frame as `function (file:line)` for collapsed stacks.
+
+    Args:
+        frame: The Python frame.
+
+    Returns:
+        str: The frame label.
+    """
+    code = frame.f_code
+    return f"{code.co_name} ({basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SectionProfile:
+    """
+    The cProfile statistics and sampled stacks collected for one section.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.profile_lock = threading.Lock()
+        self.stacks = Counter()
+        self.call_count = 0
+        self.wall_time_s = 0.0
+
+
+class Profiler:
+    """
+    Collects section profiles for one process and writes them to a run directory.
+
+    Args:
+        output_dir (str): The directory under which the run directory is created.
+        sample_interval_ms (float): The interval between stack samples.
+        top_n (int): The number of hotspots reported per section.
+    """
+
+    def __init__(self, output_dir: str, sample_interval_ms: float, top_n: int):
+        run_name = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + f"_{os.getpid()}"
+        self.run_dir = normpath(join(output_dir, run_name))
+        self.sample_interval_s = sample_interval_ms / 1000
+        self.top_n = top_n
+
+        self.sections = {}
+        self.active_threads = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(
+            target=self.sample_stacks, name="profiler-sampler", daemon=True
+        )
+        self.sampler.start()
+        atexit.register(self.close)
+
+    def section(self, name: str) -> SectionProfile:
+        """Returns the profile of a section, creating it on first use."""
+        with self.lock:
+            if name not in self.sections:
+                self.sections[name] = SectionProfile(name)
+            return self.sections[name]
+
+    def sample_stacks(self) -> None:
+        """
+        Records the current stack of every thread inside a profiled section,
+        until the profiler is closed.
+        """
+        while not self.stop_event.wait(self.sample_interval_s):
+            frames = sys._current_frames()
+            for thread_id, section in list(self.active_threads.items()):
+                frame = frames.get(thread_id)
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                if labels:
+                    section.stacks[";".join(reversed(labels))] += 1
+
+    def run(self, name: str, func, *args, **kwargs):
+        """
+        Runs a function inside a profiled section. cProfile is used by one
+        thread of a section at a time; concurrent calls are still sampled.
+
+        Args:
+            name (str): The section name.
+            func (callable): The function to run.
+
+        Returns:
+            The result of the function.
+        """
+        section = self.section(name)
+        thread_id = threading.get_ident()
+        outer = thread_id in self.active_threads
+        use_cprofile = not outer and section.profile_lock.acquire(blocking=False)
+        if not outer:
+            self.active_threads[thread_id] = section
+
+        start = time.perf_counter()
+        if use_cprofile:
+            section.profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if use_cprofile:
+                section.profile.disable()
+                section.profile_lock.release()
+            if not outer:
+                del self.active_threads[thread_id]
+                section.call_count += 1
+                section.wall_time_s += time.perf_counter() - start
+
+    def hotspots(self, section: SectionProfile) -> str:
+        """
+        Formats the top-N functions by own time and the most sampled leaf
+        frames of a section.
+
+        Args:
+            section (SectionProfile): The section.
+
+        Returns:
+            str: The hotspot summary.
+        """
+        lines = [
+            f"== {section.name}: {section.call_count} calls, "
+            f"{section.wall_time_s:.3f}s wall time =="
+        ]
+        stream = io.StringIO()
+        try:
+            stats = pstats.Stats(section.profile, stream=stream)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+        except TypeError:
+            # No call of the section ran under cProfile
+            pass
+        report = stream.getvalue()
+        if "ncalls" in report:
+            lines.append(report[report.find("ncalls") :].rstrip())
+
+        leaves = Counter()
+        for stack, count in section.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values())
+        if total:
+            lines.append(f"Sampled leaf frames ({total} samples):")
+            for label, count in leaves.most_common(self.top_n):
+                lines.append(f"{100 * count / total:6.1f}%  {label}")
+        return "\n".join(lines) + "\n\n"
+
+    def write_section(self, name: str) -> None:
+        """
+        Writes the profile, collapsed stacks and hotspots of a section, and
+        resets it.
+
+        Args:
+            name (str): The section name.
+        """
+        with self.lock:
+            section = self.sections.pop(name, None)
+        if section is None or not section.call_count:
+            return
+
+        os.makedirs(self.run_dir, exist_ok=True)
+        section.profile.dump_stats(join(self.run_dir, f"{name}.prof"))
+        with open(join(self.run_dir, f"{name}.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in section.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        summary = self.hotspots(section)
+        with open(join(self.run_dir, "report.txt"), "a", encoding="utf-8") as f:
+            f.write(summary)
+        logger.info("Profile of %s saved in: %s\n%s", name, self.run_dir, summary)
+
+    def close(self) -> None:
+        """Stops sampling and writes the sections still collecting."""
+        self.stop_event.set()
+        for name in list(self.sections):
+            self.write_section(name)
+
+
+PROFILER = None
+
+
+def get_profiler() -> Profiler:
+    """
+    Returns the profiler of this process, creating it on first use from the
+    `profiling` section of the configuration file.
+
+    Returns:
+        Profiler: The process profiler.
+    """
+    global PROFILER
+    if PROFILER is None:
+        try:
+            with open(CONFIGS, encoding="utf-8") as yaml_file:
+                configs = (yaml.safe_load(yaml_file) or {}).get("profiling") or {}
+        except OSError:
+            configs = {}
+        configs = {**DEFAULT_PROFILING_CONFIGS, **configs}
+        PROFILER = Profiler(
+            configs["output_dir"], configs["sample_interval_ms"], configs["top_n"]
+        )
+    return PROFILER
+
+
+def profiled(section: str, write_on_exit: bool = False):
+    """
+    Decorates a function so that it is profiled when profiling mode is on.
+
+    Args:
+        section (str): The name of the section and of its output files.
+        write_on_exit (bool, optional): Accumulate every call and write the
+        section at exit, for hot paths called many times. Defaults to False,
+        meaning the section is written after each call.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled():
+                return func(*args, **kwargs)
+            profiler = get_profiler()
+            try:
+                return profiler.run(section, func, *args, **kwargs)
+            finally:
+                if not write_on_exit:
+                    profiler.write_section(section)
+
+        return wrapper
+
+    return decorator
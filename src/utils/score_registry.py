@@ -0,0 +1,243 @@
+"""
+This module provides a local score registry: an append-only SQLite database with
+one row per model evaluation. Hyperparameters and metrics are also stored one
+value per row with indexes on (name, value), so queries such as "best test RMSE
+for l1_ratio > 0.5" are answered from the indexes over thousands of runs instead
+of opening one score file per model.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from os import makedirs
+from os.path import dirname, normpath
+
+from src.logger import logger
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    duration_s REAL,
+    eval_fingerprint TEXT,
+    model_fingerprint TEXT,
+    train_fingerprint TEXT,
+    test_fingerprint TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_fingerprint ON runs (eval_fingerprint);
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    name TEXT NOT NULL,
+    value REAL,
+    value_text TEXT,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_params_value ON run_params (name, value, run_id);
+CREATE INDEX IF NOT EXISTS idx_params_text ON run_params (name, value_text, run_id);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    split TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, split, name)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_value ON run_metrics (split, name, value);
+"""
+
+# Comparison operators allowed in parameter filters
+FILTER_OPERATORS = {"=", "!=", "<", "<=", ">", ">="}
+
+
+class ScoreRegistry:
+    """
+    An append-only registry of model evaluations stored in one SQLite file.
+
+    Args:
+        db_path (str): The path to the SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = normpath(db_path)
+
+        makedirs(dirname(self.db_path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA_SQL)
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens a connection to the registry.
+
+        Yields:
+            sqlite3.Connection: The open connection.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def split_value(value) -> tuple:
+        """
+        Splits a parameter value into its numeric and text forms, so numeric
+        parameters can be range-filtered and the others matched exactly.
+
+        Args:
+            value: The parameter value.
+
+        Returns:
+            tuple: The numeric value (or None) and the text value.
+        """
+        if isinstance(value, bool) or value is None:
+            return None, json.dumps(value)
+        if isinstance(value, (int, float)):
+            return float(value), str(value)
+        return None, value if isinstance(value, str) else json.dumps(value)
+
+    def record_run(
+        self,
+        model_name: str,
+        params: dict,
+        metrics: dict,
+        record: dict,
+        duration_s: float = None,
+        fingerprints: dict = None,
+    ) -> int:
+        """
+        Appends one evaluation to the registry.
+
+        Args:
+            model_name (str): The name of the model.
+            params (dict): The hyperparameters.
+            metrics (dict): The metrics of each split, e.g. {"test": {"RMSE": 0.8}}.
+            record (dict): The full score record, stored as JSON.
+            duration_s (float, optional): How long the evaluation took.
+            fingerprints (dict, optional): The `eval`, `model`, `train` and
+            `test` content fingerprints.
+
+        Returns:
+            int: The id of the new run.
+        """
+        fingerprints = fingerprints or {}
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (model_name, created_at, duration_s, "
+                "eval_fingerprint, model_fingerprint, train_fingerprint, "
+                "test_fingerprint, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    model_name,
+                    time.time(),
+                    duration_s,
+                    fingerprints.get("eval"),
+                    fingerprints.get("model"),
+                    fingerprints.get("train"),
+                    fingerprints.get("test"),
+                    json.dumps(record),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO run_params (run_id, name, value, value_text) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, name, *self.split_value(value))
+                    for name, value in params.items()
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO run_metrics (run_id, split, name, value) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, split, name, value)
+                    for split, split_metrics in metrics.items()
+                    for name, value in split_metrics.items()
+                ],
+            )
+            conn.commit()
+        logger.info("Run %s recorded in score registry: %s", run_id, self.db_path)
+        return run_id
+
+    def query_runs(
+        self,
+        metric: str = "RMSE",
+        split: str = "test",
+        filters: list[tuple] = None,
+        model_name: str = None,
+        ascending: bool = True,
+        limit: int = 10,
+    ) -> list[dict]:
+        """
+        Ranks runs by one metric, optionally keeping only runs whose parameters
+        match every filter.
+
+        Args:
+            metric (str, optional): The metric to rank by. Defaults to "RMSE".
+            split (str, optional): The split of the metric. Defaults to "test".
+            filters (list[tuple], optional): (parameter, operator, value)
+            conditions, e.g. [("l1_ratio", ">", 0.5)]. Defaults to None.
+            model_name (str, optional): Keep only runs of this model.
+            ascending (bool, optional): Rank the lowest value first, as for error
+            metrics. Defaults to True.
+            limit (int, optional): The number of runs returned. Defaults to 10.
+
+        Raises:
+            ValueError: If a filter uses an unsupported operator.
+
+        Returns:
+            list[dict]: The matching runs with their metric value and record.
+        """
+        sql = [
+            "SELECT r.run_id, r.model_name, r.created_at, r.duration_s, "
+            "r.eval_fingerprint, m.value AS metric_value, r.record "
+            "FROM run_metrics m JOIN runs r ON r.run_id = m.run_id"
+        ]
+        args = []
+        for idx, (name, operator, value) in enumerate(filters or []):
+            if operator not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            numeric, text = self.split_value(value)
+            column = "value" if numeric is not None else "value_text"
+            sql.append(
+                f"JOIN run_params p{idx} ON p{idx}.run_id = m.run_id "
+                f"AND p{idx}.name = ? AND p{idx}.{column} {operator} ?"
+            )
+            args.extend([name, numeric if numeric is not None else text])
+
+        sql.append("WHERE m.split = ? AND m.name = ?")
+        args.extend([split, metric])
+        if model_name is not None:
+            sql.append("AND r.model_name = ?")
+            args.append(model_name)
+        sql.append(f"ORDER BY m.value {'ASC' if ascending else 'DESC'} LIMIT ?")
+        args.append(limit)
+
+        with self.connect() as conn:
+            rows = conn.execute(" ".join(sql), args).fetchall()
+        return [dict(row, record=json.loads(row["record"])) for row in rows]
+
+    def best_run(self, metric: str = "RMSE", split: str = "test", **kwargs) -> dict:
+        """
+        Returns the best run for a metric; see `query_runs` for the arguments.
+
+        Returns:
+            dict | None: The best run, or None if no run matches.
+        """
+        runs = self.query_runs(metric, split, limit=1, **kwargs)
+        return runs[0] if runs else None
+
+    def run_count(self) -> int:
+        """
+        Counts the recorded runs.
+
+        Returns:
+            int: The number of runs.
+        """
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
@@ -0,0 +1,341 @@
+"""
+This module scores production traffic with a candidate model in shadow mode.
+
+`ModelPrediction.predict` hands each served request to a `ShadowScorer` with a
+non-blocking put on a bounded queue, and returns the production predictions. A
+background thread drains the queue in batches, scores each batch with the
+candidate bundle in one call, and keeps streaming statistics of the differences
+between the candidate and production predictions. The candidate predictions are
+never returned to callers. When the queue is full the request is not shadowed
+and counted as dropped, so a slow candidate never delays production.
+
+When the candidate and production bundles share the same preprocessor (the same
+payload hash), the candidate reuses the production's transformed features and
+only runs its model.
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.logger import logger
+from src.utils.model_registry import ModelBundle, RegistryWatcher
+from src.utils.sketches import KLLSketch
+
+# Quantiles of the absolute difference reported in the summaries
+DIFF_QUANTILES = (0.5, 0.9, 0.99)
+
+# One shadow scorer per candidate stage, shared by every ModelPrediction instance,
+# and the lock under which scorers are created
+SHADOW_SCORERS = {}
+SHADOW_SCORERS_LOCK = threading.Lock()
+
+
+class DiffStats:
+    """
+    Streaming statistics of the differences between candidate and production
+    predictions for one pair of versions.
+
+    Args:
+        disagreement_threshold (float): The absolute difference above which a
+        row counts as a disagreement.
+    """
+
+    def __init__(self, disagreement_threshold: float = 0.5):
+        self.disagreement_threshold = disagreement_threshold
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.abs_sum = 0.0
+        self.abs_max = 0.0
+        self.disagreement_count = 0
+        self.abs_diff_sketch = KLLSketch()
+
+    def update(self, diffs: np.array) -> None:
+        """
+        Adds a batch of differences, merging its mean and sum of squared
+        deviations with Chan's parallel update.
+
+        Args:
+            diffs (np.array): The candidate minus production predictions.
+        """
+        diffs = np.asarray(diffs, dtype=float).ravel()
+        if not len(diffs):
+            return
+        abs_diffs = np.abs(diffs)
+        batch_count = len(diffs)
+        batch_mean = float(diffs.mean())
+        batch_m2 = float(np.square(diffs - batch_mean).sum())
+
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * batch_count / total
+        self.m2 += batch_m2 + delta**2 * self.count * batch_count / total
+        self.count = total
+
+        self.abs_sum += float(abs_diffs.sum())
+        self.abs_max = max(self.abs_max, float(abs_diffs.max()))
+        self.disagreement_count += int(
+            np.count_nonzero(abs_diffs > self.disagreement_threshold)
+        )
+        self.abs_diff_sketch.update(abs_diffs)
+
+    def to_dict(self) -> dict:
+        """Summarizes the statistics."""
+        if not self.count:
+            return {"row_count": 0}
+        quantiles = self.abs_diff_sketch.quantile(DIFF_QUANTILES)
+        return {
+            "row_count": self.count,
+            "diff_mean": self.mean,
+            "diff_std": float(np.sqrt(self.m2 / self.count)),
+            "diff_rmse": float(np.sqrt(self.m2 / self.count + self.mean**2)),
+            "abs_diff_mean": self.abs_sum / self.count,
+            "abs_diff_max": self.abs_max,
+            **{
+                f"abs_diff_p{round(q * 100)}": float(value)
+                for q, value in zip(DIFF_QUANTILES, quantiles)
+            },
+            "disagreement_rate": self.disagreement_count / self.count,
+        }
+
+
+class ShadowScorer:
+    """
+    Scores served requests with a candidate bundle in a background thread.
+
+    Attributes
+    ----------
+    candidate : RegistryWatcher
+        The watcher of the candidate stage, which provides the candidate bundle.
+    max_batch : int
+        The most requests scored by the candidate in one call.
+    linger_s : float
+        The wait for more requests after the first of a batch, which trades
+        shadow freshness for fewer, larger candidate calls.
+    summary_interval_s : float
+        How often the statistics are written.
+    event_log : PredictionEventLog
+        The log receiving the summaries, or None to write them to the project log.
+    stats : dict
+        The statistics of each production and candidate version pair.
+
+    Methods
+    -------
+    submit(data, features, predictions, bundle):
+        Queues a served request for shadow scoring, without blocking.
+    summary():
+        Returns the statistics and counters.
+    close():
+        Scores the queued requests and writes the last summary.
+    """
+
+    def __init__(
+        self,
+        candidate: RegistryWatcher,
+        queue_size: int = 1_000,
+        max_batch: int = 64,
+        linger_s: float = 0.02,
+        summary_interval_s: float = 60,
+        disagreement_threshold: float = 0.5,
+        event_log=None,
+    ):
+        self.candidate = candidate
+        self.max_batch = max_batch
+        self.linger_s = linger_s
+        self.summary_interval_s = summary_interval_s
+        self.disagreement_threshold = disagreement_threshold
+        self.event_log = event_log
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.submitted_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+        self.scoring_time_s = 0.0
+        self.next_summary_at = time.monotonic() + summary_interval_s
+
+        self.closed = False
+        self.worker = threading.Thread(
+            target=self.run, name="ShadowScorer", daemon=True
+        )
+        self.worker.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_configs(cls, configs: dict, event_log=None) -> "ShadowScorer":
+        """
+        Returns the shadow scorer described by the `shadow_scoring` configuration,
+        creating it on first use.
+
+        Args:
+            configs (dict): The `shadow_scoring` configuration.
+            event_log (PredictionEventLog, optional): The log receiving the
+            summaries. Defaults to None.
+
+        Raises:
+            FileNotFoundError: If no version is promoted to the candidate stage.
+
+        Returns:
+            ShadowScorer: The shared shadow scorer.
+        """
+        stage = configs.candidate_stage
+        with SHADOW_SCORERS_LOCK:
+            if stage not in SHADOW_SCORERS:
+                SHADOW_SCORERS[stage] = cls(
+                    RegistryWatcher.from_configs(stage),
+                    queue_size=configs.queue_size,
+                    max_batch=configs.max_batch,
+                    linger_s=configs.linger_s,
+                    summary_interval_s=configs.summary_interval_s,
+                    disagreement_threshold=configs.disagreement_threshold,
+                    event_log=event_log,
+                )
+            return SHADOW_SCORERS[stage]
+
+    def submit(
+        self,
+        data: pd.DataFrame,
+        features: np.array,
+        predictions: np.array,
+        bundle: ModelBundle,
+    ) -> bool:
+        """
+        Queues a served request for shadow scoring. This is the only work done on
+        the request path, and it never blocks.
+
+        Args:
+            data (pd.DataFrame): The input rows, which must not be modified after
+            the request.
+            features (np.array): The rows transformed by the production
+            preprocessor.
+            predictions (np.array): The production predictions.
+            bundle (ModelBundle): The production bundle which served the request.
+
+        Returns:
+            bool: Whether the request was queued, rather than dropped.
+        """
+        try:
+            self.queue.put_nowait((data, features, predictions, bundle))
+        except queue.Full:
+            with self.lock:
+                self.dropped_count += 1
+            return False
+        with self.lock:
+            self.submitted_count += 1
+        return True
+
+    def score_batch(self, items: list) -> None:
+        """
+        Scores a batch of requests served by one production bundle with the
+        candidate bundle, and updates the statistics of the version pair.
+
+        Args:
+            items (list): The queued (data, features, predictions, bundle) tuples.
+        """
+        production = items[0][3]
+        candidate = self.candidate.bundle
+        start = time.perf_counter()
+        preprocessor_hash = production.manifest.get("preprocessor")
+        shared_preprocessor = preprocessor_hash is not None and (
+            preprocessor_hash == candidate.manifest.get("preprocessor")
+        )
+        if shared_preprocessor:
+            features = np.concatenate([item[1] for item in items])
+        else:
+            features = candidate.preprocessor.transform(
+                pd.concat([item[0] for item in items], ignore_index=True)
+            )
+        candidate_predictions = candidate.model.predict(features)
+        production_predictions = np.concatenate(
+            [np.ravel(item[2]) for item in items]
+        )
+
+        key = f"{production.version}->{candidate.version}"
+        with self.lock:
+            if key not in self.stats:
+                self.stats[key] = DiffStats(self.disagreement_threshold)
+            self.stats[key].update(candidate_predictions - production_predictions)
+            self.scoring_time_s += time.perf_counter() - start
+
+    def run(self) -> None:
+        """
+        Drains the queue in batches until a None item is received, and writes the
+        summary when each summary interval ends, even if no request arrives.
+        """
+        while True:
+            if time.monotonic() >= self.next_summary_at:
+                self.next_summary_at = time.monotonic() + self.summary_interval_s
+                self.write_summary()
+            try:
+                items = [
+                    self.queue.get(
+                        timeout=max(0.0, self.next_summary_at - time.monotonic())
+                    )
+                ]
+            except queue.Empty:
+                continue
+            if items[0] is not None and self.queue.qsize() < self.max_batch:
+                time.sleep(self.linger_s)
+            while len(items) < self.max_batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = items[-1] is None
+            items = [item for item in items if item is not None]
+
+            # Requests served across a hot-swap are split by production bundle
+            batches = {}
+            for item in items:
+                batches.setdefault(id(item[3]), []).append(item)
+            for batch in batches.values():
+                try:
+                    self.score_batch(batch)
+                except Exception as e:
+                    with self.lock:
+                        self.error_count += len(batch)
+                    logger.error("Shadow scoring failed: %s", e)
+
+            if stop:
+                return
+
+    def summary(self) -> dict:
+        """
+        Returns the statistics of each version pair and the request counters.
+
+        Returns:
+            dict: The shadow summary event.
+        """
+        with self.lock:
+            return {
+                "event": "shadow_summary",
+                "timestamp": time.time(),
+                "submitted_count": self.submitted_count,
+                "dropped_count": self.dropped_count,
+                "error_count": self.error_count,
+                "scoring_time_s": self.scoring_time_s,
+                "versions": {key: stats.to_dict() for key, stats in self.stats.items()},
+            }
+
+    def write_summary(self) -> None:
+        """Writes the summary to the event log, or to the project log."""
+        summary = self.summary()
+        if self.event_log is not None:
+            self.event_log.write(summary)
+        else:
+            logger.info("Shadow scoring summary: %s", summary)
+
+    def close(self) -> None:
+        """Scores the queued requests, stops the thread and writes the summary."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.worker.join()
+        self.write_summary()
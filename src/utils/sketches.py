@@ -0,0 +1,391 @@
+"""
+This module provides mergeable, constant-memory summaries of streaming data:
+
+    - KLLSketch: approximate quantiles and ranks of a numeric stream.
+    - HyperLogLog: approximate distinct counts of any stream.
+    - ReservoirSample: a uniform sample without replacement of a stream.
+
+Each sketch is updated with whole arrays, merged with another sketch of the same
+parameters (e.g. from another chunk, process or day), and serialized with
+`to_bytes`/`from_bytes` into a compact header plus raw array buffers.
+"""
+
+import struct
+
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    """
+    A KLL quantile sketch. Items are kept in levels of sorted compactors, where
+    an item at level h stands for 2**h stream items. When a level outgrows its
+    capacity, every other item is promoted to the next level. The rank error
+    is about 1.7 / k of the stream size with high probability.
+
+    Args:
+        k (int): The capacity of the top level, which sets the accuracy.
+        seed (int): The seed of the compaction coin flips.
+    """
+
+    HEADER = struct.Struct("<IIQdd")
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level: int) -> int:
+        """Returns the capacity of a level, 2/3 of the capacity of the level above."""
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def compress(self) -> None:
+        """Compacts the levels which are over capacity, from the bottom up."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the total weight is preserved
+                kept, items = items[: len(items) % 2], items[len(items) % 2 :]
+                promoted = items[self.rng.integers(2) :: 2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def update(self, values: np.array) -> None:
+        """
+        Adds values to the sketch; NaNs are ignored.
+
+        Args:
+            values (np.array): The values.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Merges another sketch into this one.
+
+        Args:
+            other (KLLSketch): A sketch with the same k.
+
+        Returns:
+            KLLSketch: This sketch.
+        """
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.compress()
+        return self
+
+    def weighted_items(self) -> tuple[np.array, np.array]:
+        """Returns the retained items in sorted order with their weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantile(self, q) -> np.array:
+        """
+        Estimates quantiles of the stream.
+
+        Args:
+            q (float | list): The quantiles, between 0 and 1.
+
+        Returns:
+            np.array: The estimated quantiles, NaN for an empty sketch.
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if not self.count:
+            return np.full(len(q), np.nan)
+        items, weights = self.weighted_items()
+        cumulative = np.cumsum(weights)
+        positions = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        quantiles = items[np.minimum(positions, len(items) - 1)]
+        quantiles[q <= 0] = self.min
+        quantiles[q >= 1] = self.max
+        return quantiles
+
+    def cdf(self, points) -> np.array:
+        """
+        Estimates the fraction of the stream at or below each point.
+
+        Args:
+            points (np.array): The points.
+
+        Returns:
+            np.array: The estimated fractions.
+        """
+        points = np.atleast_1d(np.asarray(points, dtype=float))
+        if not self.count:
+            return np.full(len(points), np.nan)
+        items, weights = self.weighted_items()
+        cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+        return cumulative[np.searchsorted(items, points, side="right")] / cumulative[-1]
+
+    def histogram(self, bins: int) -> tuple[np.array, np.array]:
+        """
+        Estimates the fraction of the stream in equal-width bins between the
+        minimum and the maximum.
+
+        Args:
+            bins (int): The number of bins.
+
+        Returns:
+            tuple[np.array, np.array]: The fractions and the bin edges.
+        """
+        edges = np.linspace(self.min, self.max, bins + 1)
+        fractions = np.diff(np.concatenate([[0.0], self.cdf(edges[1:])]))
+        return fractions, edges
+
+    def to_bytes(self) -> bytes:
+        """Serializes the sketch as a header, the level sizes and the items."""
+        sizes = np.array([len(level) for level in self.levels], dtype="<u4")
+        header = self.HEADER.pack(
+            self.k, len(self.levels), self.count, self.min, self.max
+        )
+        items = np.concatenate(self.levels).astype("<f8")
+        return header + sizes.tobytes() + items.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes, seed: int = None) -> "KLLSketch":
+        """
+        Restores a sketch serialized with `to_bytes`.
+
+        Args:
+            buffer (bytes): The serialized sketch.
+            seed (int, optional): The seed of future compactions.
+
+        Returns:
+            KLLSketch: The sketch.
+        """
+        k, level_count, count, minimum, maximum = cls.HEADER.unpack_from(buffer)
+        sketch = cls(k, seed)
+        sketch.count, sketch.min, sketch.max = count, minimum, maximum
+        offset = cls.HEADER.size
+        sizes = np.frombuffer(buffer, dtype="<u4", count=level_count, offset=offset)
+        items = np.frombuffer(buffer, dtype="<f8", offset=offset + 4 * level_count)
+        sketch.levels = list(np.split(items.copy(), np.cumsum(sizes)[:-1]))
+        return sketch
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog distinct count sketch with 2**precision one-byte registers.
+    The relative standard error is about 1.04 / sqrt(2**precision), i.e. 1.6%
+    with the default 4 KiB of registers.
+
+    Args:
+        precision (int): The number of hash bits which select a register.
+    """
+
+    HEADER = struct.Struct("<B")
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, values) -> None:
+        """
+        Adds values to the sketch; missing values are ignored. Values are hashed
+        by pandas, so equal values hash equally across chunks of one dtype.
+
+        Args:
+            values (array-like): The values.
+        """
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        suffix_bits = 64 - self.precision
+        registers = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        suffixes = hashes & np.uint64((1 << suffix_bits) - 1)
+
+        # The bit length of each suffix, by binary search over the shifts
+        bit_lengths = np.zeros(len(suffixes), dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = suffixes >= np.uint64(1 << shift)
+            bit_lengths[high] += shift
+            suffixes[high] >>= np.uint64(shift)
+        bit_lengths += (suffixes > 0).astype(np.uint8)
+
+        ranks = (suffix_bits - bit_lengths + 1).astype(np.uint8)
+        np.maximum.at(self.registers, registers, ranks)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Merges another sketch into this one.
+
+        Args:
+            other (HyperLogLog): A sketch with the same precision.
+
+        Returns:
+            HyperLogLog: This sketch.
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """
+        Estimates the number of distinct values, with linear counting for small
+        cardinalities.
+
+        Returns:
+            int: The estimated distinct count.
+        """
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size**2 / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * size and empty:
+            estimate = size * np.log(size / empty)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Serializes the sketch as its precision and registers."""
+        return self.HEADER.pack(self.precision) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> "HyperLogLog":
+        """
+        Restores a sketch serialized with `to_bytes`.
+
+        Args:
+            buffer (bytes): The serialized sketch.
+
+        Returns:
+            HyperLogLog: The sketch.
+        """
+        (precision,) = cls.HEADER.unpack_from(buffer)
+        sketch = cls(precision)
+        sketch.registers = np.frombuffer(
+            buffer, dtype=np.uint8, offset=cls.HEADER.size
+        ).copy()
+        return sketch
+
+
+class ReservoirSample:
+    """
+    A uniform sample without replacement of a stream of numeric values or rows.
+    Each item draws a random priority and the items with the smallest priorities
+    are kept, so two samples merge into a uniform sample of both streams.
+
+    Args:
+        size (int): The number of items kept.
+        seed (int): The seed of the priorities.
+    """
+
+    HEADER = struct.Struct("<IQI")
+
+    def __init__(self, size: int = 10_000, seed: int = None):
+        self.size = size
+        self.seen = 0
+        self.priorities = np.empty(0)
+        self.values = None
+        self.rng = np.random.default_rng(seed)
+
+    def keep(self, priorities: np.array, values: np.array) -> None:
+        """Keeps the items with the smallest priorities."""
+        if len(priorities) > self.size:
+            smallest = np.argpartition(priorities, self.size)[: self.size]
+            priorities, values = priorities[smallest], values[smallest]
+        self.priorities, self.values = priorities, values
+
+    def update(self, values: np.array) -> None:
+        """
+        Adds values, or rows of a 2D array, to the sample.
+
+        Args:
+            values (np.array): The values or rows.
+        """
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        self.seen += len(values)
+        priorities = self.rng.random(len(values))
+        if self.values is not None:
+            priorities = np.concatenate([self.priorities, priorities])
+            values = np.concatenate([self.values, values])
+        self.keep(priorities, values)
+
+    def merge(self, other: "ReservoirSample") -> "ReservoirSample":
+        """
+        Merges another sample into this one.
+
+        Args:
+            other (ReservoirSample): A sample of the same size.
+
+        Returns:
+            ReservoirSample: This sample.
+        """
+        if other.values is None:
+            return self
+        self.seen += other.seen
+        if self.values is None:
+            self.keep(other.priorities, other.values)
+        else:
+            self.keep(
+                np.concatenate([self.priorities, other.priorities]),
+                np.concatenate([self.values, other.values]),
+            )
+        return self
+
+    def sample(self) -> np.array:
+        """Returns the sampled values, or an empty array before any update."""
+        return np.empty(0) if self.values is None else self.values
+
+    def to_bytes(self) -> bytes:
+        """Serializes the sample as a header, the priorities and the values."""
+        values = self.sample()
+        width = 0 if values.ndim < 2 else values.shape[1]
+        header = self.HEADER.pack(self.size, self.seen, width)
+        return (
+            header
+            + self.priorities.astype("<f8").tobytes()
+            + values.astype("<f8").tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes, seed: int = None) -> "ReservoirSample":
+        """
+        Restores a sample serialized with `to_bytes`.
+
+        Args:
+            buffer (bytes): The serialized sample.
+            seed (int, optional): The seed of future priorities.
+
+        Returns:
+            ReservoirSample: The sample.
+        """
+        size, seen, width = cls.HEADER.unpack_from(buffer)
+        sample = cls(size, seed)
+        sample.seen = seen
+        arrays = np.frombuffer(buffer, dtype="<f8", offset=cls.HEADER.size)
+        count = len(arrays) // (1 + max(width, 1))
+        if count:
+            sample.priorities = arrays[:count].copy()
+            values = arrays[count:].copy()
+            sample.values = values.reshape(count, width) if width else values
+        return sample
@@ -0,0 +1,388 @@
+"""
+This module provides a non-blocking MLflow logger. Logging calls only put events
+on a queue; a background thread groups params, metrics and tags into `log_batch`
+calls, retries failed calls with exponential backoff, and spills a run to a local
+file-backed store when the tracking server cannot be reached. Pipeline latency
+therefore does not depend on the tracking backend.
+"""
+
+import atexit
+import os
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from os.path import join
+from urllib.parse import urlparse
+
+import mlflow.sklearn
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+from src.logger import get_logger
+
+logger = get_logger("tracking")
+
+# MLflow limits on the number of entries per log_batch call
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+
+
+@dataclass
+class RunState:
+    """
+    The state of one run as seen by the background thread.
+    """
+
+    run_name: str
+    backend: str = "remote"
+    run_id: str = None
+    pending: dict = field(
+        default_factory=lambda: {"params": [], "metrics": [], "tags": []}
+    )
+    history: dict = field(
+        default_factory=lambda: {"params": [], "metrics": [], "tags": [], "models": []}
+    )
+
+
+class AsyncMlflowLogger:
+    """
+    A background, batching MLflow logger with a local file-store fallback.
+
+    Args:
+        tracking_uri (str): The tracking server URI; None uses MLflow's default.
+        fallback_uri (str): The local file store URI used when the server fails.
+        experiment_name (str): The experiment where runs are created.
+        max_retries (int): The number of attempts per call on the tracking server.
+        retry_backoff_s (float): The delay before the first retry, doubled after
+        each attempt.
+        close_timeout_s (float): How long closing waits for pending writes before
+        sending the rest to the fallback store.
+        http_max_retries (int): The retries of a single MLflow HTTP request. Kept
+        low since this class does its own retrying.
+        http_timeout_s (float): The timeout of a single MLflow HTTP request.
+    """
+
+    def __init__(
+        self,
+        tracking_uri: str,
+        fallback_uri: str,
+        experiment_name: str = "Default",
+        max_retries: int = 3,
+        retry_backoff_s: float = 1.0,
+        close_timeout_s: float = 30.0,
+        http_max_retries: int = 0,
+        http_timeout_s: float = 10.0,
+    ):
+        self.tracking_uri = tracking_uri
+        self.fallback_uri = fallback_uri
+        self.experiment_name = experiment_name
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.close_timeout_s = close_timeout_s
+
+        # Values already set in the environment take precedence
+        os.environ.setdefault("MLFLOW_HTTP_REQUEST_MAX_RETRIES", str(http_max_retries))
+        os.environ.setdefault("MLFLOW_HTTP_REQUEST_TIMEOUT", str(int(http_timeout_s)))
+        # Recent MLflow versions refuse file stores unless explicitly allowed
+        if urlparse(fallback_uri).scheme == "file":
+            os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+
+        self.backend_uris = {"remote": tracking_uri, "fallback": fallback_uri}
+        self.clients = {}
+        self.experiment_ids = {}
+        self.spill_only = threading.Event()
+        self.events = queue.Queue()
+        self.worker = threading.Thread(
+            target=self.process_events, name="mlflow-logger", daemon=True
+        )
+        self.worker.start()
+        atexit.register(self.close)
+
+    def start_run(self, run_name: str = None) -> RunState:
+        """
+        Starts a run. The run is created on the backend when it is first flushed.
+
+        Args:
+            run_name (str, optional): The name of the run. Defaults to None.
+
+        Returns:
+            RunState: The handle used by the other logging calls.
+        """
+        return RunState(run_name=run_name)
+
+    def log_params(self, run: RunState, params: dict) -> None:
+        """Queues params for the run."""
+        self.events.put(("params", run, dict(params)))
+
+    def log_metrics(self, run: RunState, metrics: dict, step: int = 0) -> None:
+        """Queues metrics for the run."""
+        timestamp = int(time.time() * 1000)
+        self.events.put(
+            (
+                "metrics",
+                run,
+                {"values": dict(metrics), "step": step, "timestamp": timestamp},
+            )
+        )
+
+    def set_tags(self, run: RunState, tags: dict) -> None:
+        """Queues tags for the run."""
+        self.events.put(("tags", run, dict(tags)))
+
+    def log_model(
+        self,
+        run: RunState,
+        model,
+        artifact_path: str = "model",
+        registered_model_name: str = None,
+    ) -> None:
+        """Queues a scikit-learn model to be logged and, optionally, registered."""
+        self.events.put(
+            (
+                "model",
+                run,
+                {
+                    "model": model,
+                    "artifact_path": artifact_path,
+                    "registered_model_name": registered_model_name,
+                },
+            )
+        )
+
+    def end_run(self, run: RunState, status: str = "FINISHED") -> None:
+        """Queues the end of the run."""
+        self.events.put(("end", run, status))
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every queued event has been processed.
+
+        Args:
+            timeout (float, optional): The maximum wait in seconds. Defaults to
+            None, meaning no limit.
+
+        Returns:
+            bool: True if the queue was drained in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.events.all_tasks_done:
+            while self.events.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.events.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """
+        Flushes pending writes at shutdown. Writes still waiting after the close
+        timeout are sent to the fallback store instead of the tracking server.
+        """
+        if self.flush(self.close_timeout_s):
+            return
+        logger.warning("Tracking server is slow, spilling to: %s", self.fallback_uri)
+        self.spill_only.set()
+        if not self.flush(self.close_timeout_s):
+            logger.error("%s tracking events were not written", self.events.qsize())
+
+    def get_client(self, backend: str) -> MlflowClient:
+        """
+        Returns the MLflow client of a backend and its experiment id.
+
+        Args:
+            backend (str): Either `remote` or `fallback`.
+
+        Returns:
+            MlflowClient: The client of the backend.
+        """
+        if backend not in self.clients:
+            uri = self.backend_uris[backend]
+            client = MlflowClient(tracking_uri=uri, registry_uri=uri)
+            experiment = client.get_experiment_by_name(self.experiment_name)
+            self.experiment_ids[backend] = (
+                experiment.experiment_id
+                if experiment
+                else client.create_experiment(self.experiment_name)
+            )
+            self.clients[backend] = client
+        return self.clients[backend]
+
+    def call_with_retries(self, operation):
+        """
+        Calls an operation on the tracking server, retrying with exponential
+        backoff. Gives up early once the logger is spilling.
+
+        Args:
+            operation (callable): The operation, called with no arguments.
+
+        Returns:
+            The result of the operation.
+        """
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == self.max_retries or self.spill_only.is_set():
+                    raise
+                delay = self.retry_backoff_s * 2 ** (attempt - 1)
+                logger.warning("MLflow call failed (%s), retrying in %ss", e, delay)
+                time.sleep(delay)
+        return None
+
+    def write_entries(self, run: RunState, entries: dict) -> None:
+        """
+        Writes params, metrics and tags of a run with as few `log_batch` calls
+        as the MLflow batch limits allow, then logs any models.
+
+        Args:
+            run (RunState): The run the entries belong to.
+            entries (dict): Lists of params, metrics, tags and models.
+        """
+        client = self.get_client(run.backend)
+        if run.run_id is None:
+            run.run_id = client.create_run(
+                self.experiment_ids[run.backend], run_name=run.run_name
+            ).info.run_id
+
+        params, metrics, tags = entries["params"], entries["metrics"], entries["tags"]
+        while params or metrics or tags:
+            client.log_batch(
+                run.run_id,
+                metrics=metrics[:MAX_METRICS_PER_BATCH],
+                params=params[:MAX_PARAMS_PER_BATCH],
+                tags=tags[:MAX_TAGS_PER_BATCH],
+            )
+            params = params[MAX_PARAMS_PER_BATCH:]
+            metrics = metrics[MAX_METRICS_PER_BATCH:]
+            tags = tags[MAX_TAGS_PER_BATCH:]
+
+        for model_details in entries.get("models", []):
+            self.write_model(client, run, **model_details)
+
+    def write_model(
+        self,
+        client: MlflowClient,
+        run: RunState,
+        model,
+        artifact_path: str,
+        registered_model_name: str,
+    ) -> None:
+        """
+        Saves a model locally, uploads it as run artifacts and registers it when
+        the backend has a model registry.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = join(tmp_dir, artifact_path)
+            mlflow.sklearn.save_model(
+                model,
+                local_path,
+                serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE,
+            )
+            client.log_artifacts(run.run_id, local_path, artifact_path)
+
+        backend_uri = self.backend_uris[run.backend] or mlflow.get_tracking_uri()
+        if registered_model_name and urlparse(backend_uri).scheme != "file":
+            artifact_uri = client.get_run(run.run_id).info.artifact_uri
+            try:
+                client.create_registered_model(registered_model_name)
+            except Exception:
+                logger.info("Registered model %s exists", registered_model_name)
+            client.create_model_version(
+                registered_model_name,
+                f"{artifact_uri}/{artifact_path}",
+                run_id=run.run_id,
+            )
+
+    def dispatch(self, run: RunState, entries: dict, status: str = None) -> None:
+        """
+        Sends entries of a run to its backend. If the tracking server still fails
+        after the retries, the whole run is replayed to the fallback store and
+        continues there.
+
+        Args:
+            run (RunState): The run the entries belong to.
+            entries (dict): Lists of params, metrics, tags and models.
+            status (str, optional): The final status when the run ends.
+        """
+        if run.backend == "remote" and not self.spill_only.is_set():
+            try:
+                self.call_with_retries(lambda: self.write_entries(run, entries))
+                if status:
+                    self.call_with_retries(
+                        lambda: self.get_client(run.backend).set_terminated(
+                            run.run_id, status
+                        )
+                    )
+                return
+            except Exception as e:
+                logger.warning("MLflow tracking server unavailable: %s", e)
+
+        if run.backend == "remote":
+            # Replay everything logged so far into a new local run
+            run.backend, run.run_id = "fallback", None
+            entries = run.history
+            logger.warning("Run spilled to local store: %s", self.fallback_uri)
+
+        self.write_entries(run, entries)
+        if status:
+            self.get_client(run.backend).set_terminated(run.run_id, status)
+
+    def flush_run(self, run: RunState, models: list = None, status: str = None):
+        """
+        Moves the pending entries of a run into its history and dispatches them.
+        """
+        entries = dict(run.pending, models=models or [])
+        run.pending = {"params": [], "metrics": [], "tags": []}
+        for key, values in entries.items():
+            run.history[key].extend(values)
+        if any(entries.values()) or status:
+            self.dispatch(run, entries, status)
+
+    def process_events(self) -> None:
+        """
+        Processes queued events on the background thread. Params, metrics and
+        tags are only collected; they are sent together once the queue is empty,
+        before a model is logged, and when the run ends.
+        """
+        dirty_runs = {}
+        while True:
+            kind, run, payload = self.events.get()
+            try:
+                if kind == "params":
+                    run.pending["params"].extend(
+                        Param(key, str(value)) for key, value in payload.items()
+                    )
+                elif kind == "tags":
+                    run.pending["tags"].extend(
+                        RunTag(key, str(value)) for key, value in payload.items()
+                    )
+                elif kind == "metrics":
+                    run.pending["metrics"].extend(
+                        Metric(key, float(value), payload["timestamp"], payload["step"])
+                        for key, value in payload["values"].items()
+                    )
+
+                if kind in ("params", "tags", "metrics"):
+                    dirty_runs[id(run)] = run
+                elif kind == "model":
+                    self.safe_flush(run, models=[payload])
+                elif kind == "end":
+                    dirty_runs.pop(id(run), None)
+                    self.safe_flush(run, status=payload)
+
+                if self.events.empty():
+                    for dirty_run in dirty_runs.values():
+                        self.safe_flush(dirty_run)
+                    dirty_runs.clear()
+            finally:
+                self.events.task_done()
+
+    def safe_flush(self, run: RunState, models: list = None, status: str = None):
+        """Flushes a run and logs, rather than raises, any error."""
+        try:
+            self.flush_run(run, models=models, status=status)
+        except Exception as e:
+            logger.error("MLflow logging failed for run %s: %s", run.run_name, e)
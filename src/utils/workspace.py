@@ -0,0 +1,169 @@
+"""
+This module provides run-scoped workspaces, so several pipeline runs can execute
+in parallel on one host without overwriting each other's intermediate files.
+
+A run works in `runs/<run_id>/` with a snapshot of `conf/`, so each run keeps the
+configuration and hyperparameters it was started with. Its data splits, arrays,
+preprocessor and model are written inside the workspace. Directories that
+accumulate results across runs, such as the input dataset, the score registry
+and the artifact store, are symlinked to the shared copies. A new workspace
+starts from the currently published outputs, so stages which update the served
+model rather than replace it find it in place. When the run completes, the
+configured outputs are copied back to the shared locations under an exclusive
+lock, which readers of the shared model take in shared mode.
+"""
+
+import os
+import shutil
+from datetime import datetime
+from os.path import abspath, dirname, exists, isdir, join, lexists
+
+from src.constants import CONFIGS
+from src.exception import CustomException
+from src.logger import logger
+from src.utils.basic_utils import atomic_path, file_lock, read_yaml
+
+
+class RunWorkspace:
+    """
+    An isolated working directory for one pipeline run.
+
+    Attributes
+    ----------
+    base_dir : str
+        The project directory holding the shared files.
+    run_id : str
+        The identifier of the run.
+    run_dir : str
+        The workspace directory of the run.
+    shared_paths : list
+        The directories, relative to the project, linked into the workspace.
+    published_paths : list
+        The files, relative to the project, copied back when the run completes.
+    lock_path : str
+        The lock file guarding the published files.
+
+    Methods
+    -------
+    create():
+        Creates the workspace with its configuration snapshot, shared links and
+        a copy of the published outputs.
+    publish():
+        Copies the run's outputs to the shared locations.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        shared_paths: list,
+        published_paths: list,
+        lock_path: str,
+        lock_timeout_s: float = 60,
+        run_id: str = None,
+    ):
+        self.base_dir = os.getcwd()
+        self.run_id = run_id or (
+            datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + f"_{os.getpid()}"
+        )
+        self.run_dir = abspath(join(root_dir, self.run_id))
+        self.shared_paths = list(shared_paths)
+        self.published_paths = list(published_paths)
+        self.lock_path = join(self.base_dir, lock_path)
+        self.lock_timeout_s = lock_timeout_s
+
+    @classmethod
+    def from_configs(cls, run_id: str = None) -> "RunWorkspace":
+        """
+        Creates the workspace described by the `workspace` configuration.
+
+        Args:
+            run_id (str, optional): The run identifier. Defaults to None, meaning
+            a timestamp and the process id.
+
+        Returns:
+            RunWorkspace: The workspace, not yet created on disk.
+        """
+        configs = read_yaml(CONFIGS).workspace
+        return cls(
+            configs.root_dir,
+            configs.shared_paths,
+            configs.published_paths,
+            configs.lock_path,
+            configs.lock_timeout_s,
+            run_id,
+        )
+
+    def create(self) -> str:
+        """
+        Creates the workspace directory, snapshots the configuration into it,
+        links the shared directories and copies in the published outputs. An
+        existing workspace is reused, which resumes a run with its original
+        configuration and its own outputs.
+
+        Raises:
+            CustomException: If the workspace cannot be created.
+
+        Returns:
+            str: The workspace directory.
+        """
+        try:
+            os.makedirs(self.run_dir, exist_ok=True)
+            conf_dir = dirname(CONFIGS)
+            if not exists(join(self.run_dir, conf_dir)):
+                shutil.copytree(
+                    join(self.base_dir, conf_dir), join(self.run_dir, conf_dir)
+                )
+
+            for shared_path in self.shared_paths:
+                target = join(self.base_dir, shared_path)
+                link = join(self.run_dir, shared_path)
+                os.makedirs(target, exist_ok=True)
+                os.makedirs(dirname(link), exist_ok=True)
+                if not lexists(link):
+                    os.symlink(target, link, target_is_directory=True)
+
+            # Start from the published outputs, read as one consistent set
+            with file_lock(self.lock_path, shared=True, timeout_s=self.lock_timeout_s):
+                for path in self.published_paths:
+                    source = join(self.base_dir, path)
+                    target = join(self.run_dir, path)
+                    if exists(target) or not exists(source) or isdir(source):
+                        continue
+                    os.makedirs(dirname(target), exist_ok=True)
+                    with atomic_path(target) as temp_path:
+                        shutil.copyfile(source, temp_path)
+
+            logger.info("Run workspace created at: %s", self.run_dir)
+            return self.run_dir
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
+
+    def publish(self) -> list:
+        """
+        Copies the run's outputs to the shared locations. Each file is replaced
+        atomically, and the whole set is published under an exclusive lock so
+        that readers never load a model from one run with the preprocessor of
+        another.
+
+        Raises:
+            CustomException: If the outputs cannot be published.
+
+        Returns:
+            list: The published paths.
+        """
+        try:
+            published = []
+            with file_lock(self.lock_path, timeout_s=self.lock_timeout_s):
+                for path in self.published_paths:
+                    source = join(self.run_dir, path)
+                    if not exists(source) or isdir(source):
+                        continue
+                    with atomic_path(join(self.base_dir, path)) as temp_path:
+                        shutil.copyfile(source, temp_path)
+                    published.append(path)
+            logger.info("Run %s published: %s", self.run_id, published)
+            return published
+        except Exception as e:
+            logger.error(CustomException(e))
+            raise CustomException(e) from e
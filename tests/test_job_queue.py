@@ -0,0 +1,103 @@
+"""
+Tests of the SQLite job queue: idempotent enqueueing, exclusive claims, lease
+expiry and takeover, and retries with backoff.
+"""
+
+import time
+from os.path import join
+
+import pytest
+
+from src.utils.job_queue import JobQueue
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    return JobQueue(join(tmp_path, "queue.sqlite"), lease_s=60, retry_backoff_s=0)
+
+
+def test_enqueue_is_idempotent(job_queue):
+    assert job_queue.enqueue([{"alpha": 0.1}, {"alpha": 0.2}]) == 2
+    assert job_queue.enqueue([{"alpha": 0.2}, {"alpha": 0.3}]) == 1
+    assert job_queue.status_counts() == {"pending": 3}
+
+
+def test_claims_are_exclusive(job_queue):
+    job_queue.enqueue([{"alpha": 0.1}, {"alpha": 0.2}])
+
+    first = job_queue.claim("worker-1")
+    second = job_queue.claim("worker-2")
+
+    assert first["payload"] == {"alpha": 0.1}
+    assert second["payload"] == {"alpha": 0.2}
+    assert first["attempt"] == second["attempt"] == 1
+    assert job_queue.claim("worker-3") is None
+    assert job_queue.status_counts() == {"running": 2}
+
+
+def test_complete_records_result(job_queue):
+    job_queue.enqueue([{"alpha": 0.1}])
+    task = job_queue.claim("worker-1")
+
+    assert job_queue.complete(task["task_id"], "worker-1", {"rmse": 0.6}, 1.5)
+
+    (result,) = job_queue.results()
+    assert result["payload"] == {"alpha": 0.1}
+    assert result["result"] == {"rmse": 0.6}
+    assert result["worker_id"] == "worker-1"
+    assert job_queue.status_counts() == {"done": 1}
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    job_queue = JobQueue(join(tmp_path, "queue.sqlite"), lease_s=0.05)
+    job_queue.enqueue([{"alpha": 0.1}])
+    task = job_queue.claim("worker-1")
+    assert job_queue.claim("worker-2") is None
+
+    time.sleep(0.1)
+    takeover = job_queue.claim("worker-2")
+
+    assert takeover["task_id"] == task["task_id"]
+    assert takeover["attempt"] == 2
+    # The first worker lost the lease and cannot extend it or record a result
+    assert not job_queue.heartbeat(task["task_id"], "worker-1")
+    assert not job_queue.complete(task["task_id"], "worker-1", {"rmse": 0.7}, 1.0)
+    assert job_queue.complete(task["task_id"], "worker-2", {"rmse": 0.6}, 1.0)
+    assert [result["worker_id"] for result in job_queue.results()] == ["worker-2"]
+
+
+def test_expired_lease_without_attempts_left_fails(tmp_path):
+    job_queue = JobQueue(join(tmp_path, "queue.sqlite"), lease_s=0.05)
+    job_queue.enqueue([{"alpha": 0.1}], max_attempts=1)
+    job_queue.claim("worker-1")
+
+    time.sleep(0.1)
+
+    assert job_queue.claim("worker-2") is None
+    assert job_queue.status_counts() == {"failed": 1}
+
+
+def test_failed_task_is_retried_until_attempts_run_out(job_queue):
+    job_queue.enqueue([{"alpha": 0.1}], max_attempts=2)
+
+    task = job_queue.claim("worker-1")
+    job_queue.fail(task["task_id"], "worker-1", "diverged")
+    assert job_queue.status_counts() == {"pending": 1}
+
+    retry = job_queue.claim("worker-2")
+    assert retry["attempt"] == 2
+    job_queue.fail(retry["task_id"], "worker-2", "diverged")
+
+    assert job_queue.claim("worker-3") is None
+    assert job_queue.status_counts() == {"failed": 1}
+
+
+def test_retry_waits_for_backoff(tmp_path):
+    job_queue = JobQueue(join(tmp_path, "queue.sqlite"), retry_backoff_s=60)
+    job_queue.enqueue([{"alpha": 0.1}])
+    task = job_queue.claim("worker-1")
+
+    job_queue.fail(task["task_id"], "worker-1", "diverged")
+
+    assert job_queue.claim("worker-2") is None
+    assert job_queue.status_counts() == {"pending": 1}
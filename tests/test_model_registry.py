@@ -0,0 +1,121 @@
+"""
+Tests of the model registry: registering and promoting versions, rollbacks, and
+the watcher which hot-swaps the served bundle when a stage is promoted.
+"""
+
+import time
+from os.path import join
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.exception import CustomException
+from src.utils.artifact_store import ArtifactStore
+from src.utils.model_registry import ModelRegistry, RegistryWatcher
+
+
+@pytest.fixture
+def registry(tmp_path):
+    store = ArtifactStore(join(tmp_path, "artifacts"))
+    return ModelRegistry(join(tmp_path, "registry"), store)
+
+
+def save_model_files(directory, slope: float) -> tuple:
+    """Fits and saves a scaler and a linear model of the given slope."""
+    x = np.arange(20, dtype=float).reshape(-1, 1)
+    preprocessor = StandardScaler().fit(x)
+    model = LinearRegression().fit(preprocessor.transform(x), slope * x.ravel())
+    preprocessor_path = join(directory, f"preprocessor_{slope}.joblib")
+    model_path = join(directory, f"model_{slope}.joblib")
+    joblib.dump(preprocessor, preprocessor_path)
+    joblib.dump(model, model_path)
+    return preprocessor_path, model_path
+
+
+def predict(bundle, value: float) -> float:
+    features = bundle.preprocessor.transform(np.array([[value]]))
+    return float(bundle.model.predict(features)[0])
+
+
+def test_register_creates_versions(registry, tmp_path):
+    first = registry.register(*save_model_files(tmp_path, 1.0), {"rmse": 0.1})
+    second = registry.register(*save_model_files(tmp_path, 2.0))
+
+    assert (first, second) == (1, 2)
+    assert registry.versions() == [1, 2]
+    manifest = registry.manifest(1)
+    assert manifest["metadata"] == {"rmse": 0.1}
+    assert manifest["model_version"] == manifest["model"][:12]
+    assert registry.stage_version("production") is None
+
+
+def test_load_bundle_returns_registered_files(registry, tmp_path):
+    version = registry.register(*save_model_files(tmp_path, 3.0))
+
+    bundle = registry.load_bundle(version)
+
+    assert bundle.version == "v1"
+    assert predict(bundle, 10.0) == pytest.approx(30.0)
+
+
+def test_promote_and_roll_back(registry, tmp_path):
+    registry.register(*save_model_files(tmp_path, 1.0), stage="production")
+    registry.register(*save_model_files(tmp_path, 2.0))
+
+    registry.promote(2, "production")
+    assert registry.stage_version("production") == 2
+
+    registry.promote(1, "production")
+    assert registry.stage_version("production") == 1
+
+
+def test_promote_rejects_unknown_stage_and_version(registry, tmp_path):
+    registry.register(*save_model_files(tmp_path, 1.0))
+
+    with pytest.raises(CustomException):
+        registry.promote(1, "canary")
+    with pytest.raises(CustomException):
+        registry.promote(2, "production")
+    assert registry.stage_version("production") is None
+
+
+def test_watcher_requires_promoted_version(registry):
+    with pytest.raises(FileNotFoundError):
+        RegistryWatcher(registry, "production", poll_interval_s=60)
+
+
+def test_watcher_refresh_swaps_bundle(registry, tmp_path):
+    registry.register(*save_model_files(tmp_path, 1.0), stage="production")
+    watcher = RegistryWatcher(registry, "production", poll_interval_s=60)
+    try:
+        assert not watcher.refresh()
+        served = watcher.bundle
+
+        registry.register(*save_model_files(tmp_path, 2.0), stage="production")
+        assert watcher.refresh()
+
+        # The previous bundle stays whole for requests still holding it
+        assert predict(served, 10.0) == pytest.approx(10.0)
+        assert watcher.bundle.version == "v2"
+        assert predict(watcher.bundle, 10.0) == pytest.approx(20.0)
+    finally:
+        watcher.close()
+
+
+def test_watcher_picks_up_promotion_in_background(registry, tmp_path):
+    registry.register(*save_model_files(tmp_path, 1.0), stage="production")
+    registry.register(*save_model_files(tmp_path, 2.0))
+    watcher = RegistryWatcher(registry, "production", poll_interval_s=0.01)
+    try:
+        registry.promote(2, "production")
+        deadline = time.monotonic() + 10
+        while watcher.bundle.version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert watcher.bundle.version == "v2"
+        assert predict(watcher.bundle, 10.0) == pytest.approx(20.0)
+    finally:
+        watcher.close()
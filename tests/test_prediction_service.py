@@ -0,0 +1,140 @@
+"""
+Tests of the prediction service: a full queue and requests which would miss
+their deadline are rejected on arrival, queued requests past their deadline are
+shed, and closing serves the queued requests.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.components.prediction_service import (
+    DeadlineExceeded,
+    PredictionService,
+    ServiceOverloaded,
+)
+
+
+class BlockingModel:
+    """A model whose predictions wait until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def predict(self, data):
+        self.started.set()
+        assert self.release.wait(10)
+        return [data]
+
+
+@pytest.fixture
+def model():
+    model = BlockingModel()
+    yield model
+    model.release.set()
+
+
+def make_service(model, **overrides) -> PredictionService:
+    settings = {
+        "max_concurrency": 1,
+        "queue_size": 1,
+        "default_timeout_s": 5.0,
+        "admission_control": False,
+        "shed_expired": True,
+    }
+    return PredictionService(model, **{**settings, **overrides})
+
+
+def test_full_queue_rejects_requests(model):
+    service = make_service(model)
+    in_flight = service.submit(1)
+    assert model.started.wait(5)
+    queued = service.submit(2)
+
+    with pytest.raises(ServiceOverloaded):
+        service.submit(3)
+
+    model.release.set()
+    assert in_flight.result(5) == [1]
+    assert queued.result(5) == [2]
+    service.close()
+    metrics = service.metrics()
+    assert metrics["accepted_count"] == 2
+    assert metrics["rejected_full_count"] == 1
+    assert metrics["completed_count"] == 2
+
+
+def test_admission_control_rejects_requests_missing_their_deadline(model):
+    service = make_service(model, admission_control=True)
+    service.service_time_s = 1.0
+
+    with pytest.raises(ServiceOverloaded):
+        service.submit(1, timeout_s=0.1)
+
+    accepted = service.submit(2, timeout_s=2.0)
+    model.release.set()
+    assert accepted.result(5) == [2]
+    service.close()
+    assert service.metrics()["rejected_deadline_count"] == 1
+
+
+def test_expected_wait_counts_queued_and_in_flight_requests(model):
+    service = make_service(model)
+    service.service_time_s = 1.0
+    in_flight = service.submit(1)
+    assert model.started.wait(5)
+    queued = service.submit(2)
+
+    assert service.expected_wait_s() == pytest.approx(3.0)
+
+    model.release.set()
+    assert in_flight.result(5) == [1]
+    assert queued.result(5) == [2]
+    service.close()
+    assert service.expected_wait_s() == pytest.approx(service.service_time_s)
+    assert service.metrics()["in_flight_count"] == 0
+
+
+def test_expired_requests_are_shed(model):
+    service = make_service(model)
+    in_flight = service.submit(1)
+    assert model.started.wait(5)
+    expired = service.submit(2, timeout_s=0.01)
+
+    time.sleep(0.05)
+    model.release.set()
+
+    assert in_flight.result(5) == [1]
+    with pytest.raises(DeadlineExceeded):
+        expired.result(5)
+    service.close()
+    metrics = service.metrics()
+    assert metrics["shed_count"] == 1
+    assert metrics["completed_count"] == 1
+    assert metrics["in_flight_count"] == 0
+
+
+def test_predict_waits_at_most_until_deadline(model):
+    service = make_service(model)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        service.predict(1, timeout_s=0.1)
+
+    assert time.monotonic() - start < 2
+    model.release.set()
+    service.close()
+
+
+def test_close_serves_queued_requests_and_rejects_new_ones(model):
+    service = make_service(model, queue_size=10)
+    futures = [service.submit(value) for value in range(5)]
+
+    model.release.set()
+    service.close()
+
+    assert [future.result(0) for future in futures] == [[value] for value in range(5)]
+    with pytest.raises(RuntimeError):
+        service.submit(5)
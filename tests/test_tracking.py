@@ -0,0 +1,59 @@
+"""
+Tests of the asynchronous MLflow logger against a local file store, and of its
+fallback when the tracking server cannot be reached.
+"""
+
+from pathlib import Path
+
+import pytest
+from mlflow.tracking import MlflowClient
+
+from src.utils.tracking import AsyncMlflowLogger
+
+# A port nothing listens on, so every call to the tracking server fails at once
+UNREACHABLE_URI = "http://127.0.0.1:9"
+
+
+@pytest.fixture
+def fallback_uri(tmp_path):
+    return Path(tmp_path, "mlruns").as_uri()
+
+
+def logged_runs(uri: str) -> list:
+    client = MlflowClient(tracking_uri=uri)
+    experiment = client.get_experiment_by_name("tests")
+    return client.search_runs([experiment.experiment_id])
+
+
+def log_run(tracking: AsyncMlflowLogger) -> None:
+    run = tracking.start_run("run")
+    tracking.log_params(run, {"alpha": 0.5, "l1_ratio": 0.7})
+    tracking.log_metrics(run, {"rmse": 0.65})
+    tracking.set_tags(run, {"stage": "test"})
+    tracking.end_run(run)
+    assert tracking.flush(timeout=60)
+
+
+def test_logs_run_to_file_store(fallback_uri):
+    tracking = AsyncMlflowLogger(fallback_uri, fallback_uri, "tests")
+
+    log_run(tracking)
+
+    (run,) = logged_runs(fallback_uri)
+    assert run.data.params == {"alpha": "0.5", "l1_ratio": "0.7"}
+    assert run.data.metrics == {"rmse": 0.65}
+    assert run.data.tags["stage"] == "test"
+    assert run.info.status == "FINISHED"
+
+
+def test_unreachable_server_spills_run_to_fallback(fallback_uri):
+    tracking = AsyncMlflowLogger(
+        UNREACHABLE_URI, fallback_uri, "tests", max_retries=2, retry_backoff_s=0
+    )
+
+    log_run(tracking)
+
+    (run,) = logged_runs(fallback_uri)
+    assert run.data.params == {"alpha": "0.5", "l1_ratio": "0.7"}
+    assert run.data.metrics == {"rmse": 0.65}
+    assert run.info.status == "FINISHED"
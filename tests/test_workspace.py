@@ -0,0 +1,78 @@
+"""
+Tests of the run workspace: a new workspace starts from the published outputs
+and links the shared directories, and publishing copies the outputs back.
+"""
+
+import os
+from os.path import islink, join
+
+import pytest
+
+from src.utils.workspace import RunWorkspace
+
+PUBLISHED_PATHS = ["models/trained/model.joblib", "models/preprocessors/prep.joblib"]
+
+
+def write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write(join(tmp_path, "conf", "configs.yaml"), "workspace: {}\n")
+    return tmp_path
+
+
+def make_workspace(run_id: str) -> RunWorkspace:
+    return RunWorkspace(
+        "runs", ["models/incremental"], PUBLISHED_PATHS, "models/.lock", 5, run_id
+    )
+
+
+def test_new_workspace_starts_from_published_outputs(project):
+    write(join(project, PUBLISHED_PATHS[0]), "model v1")
+    write(join(project, PUBLISHED_PATHS[1]), "preprocessor v1")
+
+    run_dir = make_workspace("run1").create()
+
+    assert read(join(run_dir, PUBLISHED_PATHS[0])) == "model v1"
+    assert read(join(run_dir, PUBLISHED_PATHS[1])) == "preprocessor v1"
+    assert islink(join(run_dir, "models/incremental"))
+    assert read(join(run_dir, "conf/configs.yaml")) == "workspace: {}\n"
+
+
+def test_resumed_workspace_keeps_its_own_outputs(project):
+    write(join(project, PUBLISHED_PATHS[0]), "model v1")
+    workspace = make_workspace("run1")
+    run_dir = workspace.create()
+    write(join(run_dir, PUBLISHED_PATHS[0]), "model v2")
+
+    workspace.create()
+
+    assert read(join(run_dir, PUBLISHED_PATHS[0])) == "model v2"
+
+
+def test_workspace_without_published_outputs(project):
+    run_dir = make_workspace("run1").create()
+
+    assert not os.path.exists(join(run_dir, PUBLISHED_PATHS[0]))
+
+
+def test_publish_copies_outputs_back(project):
+    write(join(project, PUBLISHED_PATHS[0]), "model v1")
+    workspace = make_workspace("run1")
+    run_dir = workspace.create()
+    write(join(run_dir, PUBLISHED_PATHS[0]), "model v2")
+
+    published = workspace.publish()
+
+    assert published == [PUBLISHED_PATHS[0]]
+    assert read(join(project, PUBLISHED_PATHS[0])) == "model v2"